@@ -0,0 +1,258 @@
+"""Synthetic business cards with known ground truth, rendered with OpenCV
+
+    python -m benchmarks.corpus cards/ --count 200 --seed 7
+
+writes the card images plus truth.json, which the other benchmarks accept
+through --truth.
+"""
+import argparse
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import cv2
+import numpy as np
+
+from bizscan.extraction import CONTACT_FIELDS
+
+FIRST_NAMES = (
+    "Alice Brian Carmen David Elena Farid Grace Hector Irene Jamal Keiko Liam "
+    "Maria Nathan Olivia Pedro Quinn Rosa Samuel Tara Victor Wendy Yusuf Zoe"
+).split()
+LAST_NAMES = (
+    "Anderson Baker Chen Diaz Evans Fischer Garcia Hughes Ibrahim Johnson Kim "
+    "Lopez Miller Nguyen Okafor Patel Reyes Smith Turner Walker"
+).split()
+TITLES = [
+    "Software Engineer",
+    "Sales Manager",
+    "Marketing Director",
+    "Data Scientist",
+    "Product Designer",
+    "Chief Executive Officer",
+    "Senior Consultant",
+    "Account Executive",
+    "Operations Lead",
+    "Financial Analyst",
+]
+COMPANY_WORDS = (
+    "Acme Bluebird Cedar Northwind Brightline Summit Redwood Ironclad Silverleaf "
+    "Pinnacle Greenfield Orbit"
+).split()
+COMPANY_SUFFIXES = "Inc LLC Labs Group Solutions Systems Corp".split()
+STREET_NAMES = "Main Oak Market Mission Lake Hill Park Elm Sunset Harbor Maple".split()
+STREET_TYPES = "Street Avenue Road Boulevard Drive Lane".split()
+CITIES = [
+    ("San Francisco", "CA"),
+    ("Austin", "TX"),
+    ("Seattle", "WA"),
+    ("Denver", "CO"),
+    ("Boston", "MA"),
+    ("Chicago", "IL"),
+    ("Portland", "OR"),
+    ("Atlanta", "GA"),
+    ("Phoenix", "AZ"),
+    ("Madison", "WI"),
+]
+
+CARD_SIZE = (1050, 600)  # 3.5 x 2 inches at 300 dpi
+FONT = cv2.FONT_HERSHEY_DUPLEX
+
+
+@dataclass
+class SyntheticCard:
+    """Encoded card image, its expected fields and where each line was drawn"""
+
+    name: str
+    data: bytes
+    truth: Dict[str, str]
+    lines: List[Tuple[str, list]] = field(default_factory=list)
+
+    @property
+    def detections(self) -> list:
+        """Perfect-OCR (coords, text, prob) triples, for extraction-only runs"""
+        return [(box, text, 1.0) for text, box in self.lines]
+
+
+def random_contact(rng: random.Random) -> Dict[str, str]:
+    first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+    company = rng.choice(COMPANY_WORDS)
+    domain = company.lower() + rng.choice([".com", ".io", ".co"])
+    city, state = rng.choice(CITIES)
+    area, exchange = rng.randint(201, 989), rng.randint(200, 999)
+    line = rng.randint(1000, 9999)
+    return {
+        "full_name": f"{first} {last}",
+        "organization": f"{company} {rng.choice(COMPANY_SUFFIXES)}",
+        "job_title": rng.choice(TITLES),
+        "contact_number": f"{area}{exchange}{line}",
+        "business_email": f"{first.lower()}.{last.lower()}@{domain}",
+        "business_url": f"www.{domain}",
+        "street_address": (
+            f"{rng.randint(1, 9999)} {rng.choice(STREET_NAMES)} "
+            f"{rng.choice(STREET_TYPES)}"
+        ),
+        "location_city": city,
+        "location_state": state,
+        "postal_code": f"{rng.randint(10000, 99999)}",
+    }
+
+
+def _phone_text(digits: str, rng: random.Random) -> str:
+    area, exchange, line = digits[:3], digits[3:6], digits[6:]
+    return rng.choice(
+        [
+            f"({area}) {exchange}-{line}",
+            f"{area}-{exchange}-{line}",
+            f"{area}.{exchange}.{line}",
+            f"Tel: {area} {exchange} {line}",
+        ]
+    )
+
+
+def card_lines(
+    contact: Dict[str, str], rng: random.Random
+) -> List[Tuple[str, float, int]]:
+    """(text, font scale, thickness) per line, top to bottom"""
+    lines = [
+        (contact["full_name"], 1.6, 3),
+        (contact["job_title"], 0.9, 1),
+        (contact["organization"], 1.1, 2),
+    ]
+    details = [
+        _phone_text(contact["contact_number"], rng),
+        contact["business_email"],
+        contact["business_url"],
+        contact["street_address"],
+        f"{contact['location_city']}, {contact['location_state']} "
+        f"{contact['postal_code']}",
+    ]
+    lines.extend((text, 0.8, 1) for text in details)
+    return lines
+
+
+def render_card(
+    lines: List[Tuple[str, float, int]], rng: random.Random
+) -> Tuple[np.ndarray, List[Tuple[str, list]]]:
+    """Draw lines on a blank card; returns the image and each line's box"""
+    width, height = CARD_SIZE
+    tint = rng.randint(225, 255)
+    card = np.full((height, width, 3), tint, dtype=np.uint8)
+    ink = tuple(rng.randint(0, 70) for _ in range(3))
+    x, y = 60, 40
+    boxes = []
+    for index, (text, scale, thickness) in enumerate(lines):
+        (text_width, text_height), baseline = cv2.getTextSize(
+            text, FONT, scale, thickness
+        )
+        # Leave a gap between the name/title/organization block and details
+        y += text_height + (50 if index == 3 else 22)
+        cv2.putText(card, text, (x, y), FONT, scale, ink, thickness, cv2.LINE_AA)
+        top, bottom = y - text_height, y + baseline
+        right = x + text_width
+        boxes.append((text, [[x, top], [right, top], [right, bottom], [x, bottom]]))
+    return card, boxes
+
+
+def photograph(
+    card: np.ndarray, boxes: List[Tuple[str, list]], rng: random.Random
+) -> Tuple[np.ndarray, List[Tuple[str, list]]]:
+    """Place the card in perspective on a noisy backdrop, like a phone photo"""
+    height, width = card.shape[:2]
+    canvas_width, canvas_height = int(width * 1.4), int(height * 1.6)
+    jitter = 0.06 * width
+    corners = np.array(
+        [[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float32
+    )
+    offset = np.array(
+        [(canvas_width - width) / 2, (canvas_height - height) / 2], dtype=np.float32
+    )
+    shifts = [
+        [rng.uniform(-jitter, jitter), rng.uniform(-jitter, jitter)] for _ in range(4)
+    ]
+    target = corners + offset + np.array(shifts, dtype=np.float32)
+    transform = cv2.getPerspectiveTransform(corners, target)
+
+    backdrop = rng.randint(60, 140)
+    canvas = np.full((canvas_height, canvas_width, 3), backdrop, dtype=np.uint8)
+    canvas = cv2.warpPerspective(
+        card,
+        transform,
+        (canvas_width, canvas_height),
+        dst=canvas,
+        borderMode=cv2.BORDER_TRANSPARENT,
+    )
+    noise = np.random.default_rng(rng.randint(0, 2**32 - 1)).normal(
+        0, 6, canvas.shape
+    )
+    canvas = np.clip(canvas + noise, 0, 255).astype(np.uint8)
+    canvas = cv2.GaussianBlur(canvas, (3, 3), 0)
+
+    mapped = []
+    for text, box in boxes:
+        points = np.asarray(box, dtype=np.float32).reshape(-1, 1, 2)
+        warped = cv2.perspectiveTransform(points, transform)
+        mapped.append((text, np.rint(warped).astype(int).reshape(-1, 2).tolist()))
+    return canvas, mapped
+
+
+def generate_card(index: int, seed: int = 0, photo: bool = False) -> SyntheticCard:
+    """Card number index of the corpus for seed; the same inputs give the same card"""
+    rng = random.Random(f"{seed}:{index}")
+    contact = random_contact(rng)
+    image, boxes = render_card(card_lines(contact, rng), rng)
+    if photo:
+        image, boxes = photograph(image, boxes, rng)
+    ok, encoded = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    if not ok:
+        raise RuntimeError(f"Could not encode synthetic card {index}")
+    name = f"card-{index:04d}{'-photo' if photo else ''}.jpg"
+    return SyntheticCard(name, encoded.tobytes(), contact, boxes)
+
+
+def generate_corpus(
+    count: int, seed: int = 0, photo_ratio: float = 0.5
+) -> List[SyntheticCard]:
+    """count cards: flat scans first, then photo_ratio of them as photos"""
+    flat = count - int(round(count * photo_ratio))
+    return [generate_card(index, seed, photo=index >= flat) for index in range(count)]
+
+
+def write_corpus(cards: List[SyntheticCard], out_dir: str) -> str:
+    """Write card images and truth.json to out_dir; returns the truth path"""
+    os.makedirs(out_dir, exist_ok=True)
+    for card in cards:
+        with open(os.path.join(out_dir, card.name), "wb") as f:
+            f.write(card.data)
+    truth_path = os.path.join(out_dir, "truth.json")
+    with open(truth_path, "w") as f:
+        truth = {
+            card.name: {name: card.truth[name] for name in CONTACT_FIELDS}
+            for card in cards
+        }
+        json.dump(truth, f, indent=2)
+    return truth_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out_dir", help="Directory for the images and truth.json")
+    parser.add_argument("--count", type=int, default=100, help="Cards to generate")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument(
+        "--photo-ratio",
+        type=float,
+        default=0.5,
+        help="Share of cards rendered as perspective photos",
+    )
+    args = parser.parse_args()
+
+    cards = generate_corpus(args.count, args.seed, args.photo_ratio)
+    truth_path = write_corpus(cards, args.out_dir)
+    print(f"Wrote {len(cards)} cards and {truth_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Per-stage and end-to-end benchmark of the scan pipeline on synthetic cards
+
+    python -m benchmarks.pipeline --count 50 --json pipeline.json
+    python -m benchmarks.pipeline --count 50 --compare pipeline.json
+
+Runs offline: cards come from benchmarks.corpus and contacts go to an
+in-memory SQLite database. The OCR stage needs the EasyOCR weights already
+on disk; --skip-ocr feeds the rendered text boxes to extraction instead.
+The JSON report keeps the same layout between runs, so reports from two
+commits can be diffed or passed to --compare.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+from benchmarks.corpus import SyntheticCard, generate_corpus
+from benchmarks.preprocess import normalize_field
+from bizscan import storage
+from bizscan.extraction import CONTACT_FIELDS, extract_fields, extract_layout_fields
+from bizscan.imaging import decode_image
+from bizscan.ocr import OCR_LANGUAGES, create_reader, run_ocr
+from bizscan.preprocess import PreprocessConfig, find_cards, preprocess
+from bizscan.recognizers import RecognizerConfig
+from bizscan.storage.sql import SQLiteBackend
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Summary of latency samples in milliseconds"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def at(share: float) -> float:
+        return round(ordered[int(share * (len(ordered) - 1))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": at(0.5),
+        "p90": at(0.9),
+        "p99": at(0.99),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def field_scores(
+    predicted: Dict[str, Dict[str, str]], expected: Dict[str, Dict[str, str]]
+) -> Dict[str, Dict[str, float]]:
+    """Precision, recall and F1 per contact field, plus a micro-averaged total
+
+    An extracted value that differs from the truth counts as both a false
+    positive and a false negative.
+    """
+    counts = {name: [0, 0, 0] for name in CONTACT_FIELDS + ["overall"]}
+    for card, truth in expected.items():
+        for name in CONTACT_FIELDS:
+            want = normalize_field(truth.get(name))
+            got = normalize_field(predicted.get(card, {}).get(name))
+            for key in (name, "overall"):
+                tp_fp_fn = counts[key]
+                if got and got == want:
+                    tp_fp_fn[0] += 1
+                    continue
+                if got:
+                    tp_fp_fn[1] += 1
+                if want:
+                    tp_fp_fn[2] += 1
+
+    scores = {}
+    for name, (tp, fp, fn) in counts.items():
+        precision = tp / (tp + fp) if tp + fp else 0.0
+        recall = tp / (tp + fn) if tp + fn else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if tp else 0.0
+        scores[name] = {
+            "precision": round(precision, 4),
+            "recall": round(recall, 4),
+            "f1": round(f1, 4),
+        }
+    return scores
+
+
+def time_each(func: Callable, inputs: Iterable, repeat: int = 1) -> List[float]:
+    """Milliseconds per call of func on every input, repeat times over"""
+    inputs = list(inputs)
+    samples = []
+    for _ in range(repeat):
+        for value in inputs:
+            start = time.perf_counter()
+            func(value)
+            samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run_stages(
+    cards: List[SyntheticCard], repeat: int, config: PreprocessConfig, reader
+) -> Dict[str, Dict[str, float]]:
+    """Each stage on its own, fed with the output of the stage before it"""
+    images = [decode_image(card.data) for card in cards]
+    prepared = [preprocess(image, config).image for image in images]
+    stages = {
+        "decode": time_each(decode_image, [card.data for card in cards], repeat),
+        "preprocess": time_each(
+            lambda image: preprocess(image, config), images, repeat
+        ),
+        "segment": time_each(find_cards, images, repeat),
+        "extract_lines": time_each(
+            lambda card: extract_fields([text for text, _ in card.lines]),
+            cards,
+            repeat,
+        ),
+        "extract_layout": time_each(
+            lambda card: extract_layout_fields(card.detections), cards, repeat
+        ),
+        "store": time_each(
+            lambda card: storage.insert_contacts([card.truth]), cards, repeat
+        ),
+    }
+    if reader is not None:
+        stages["ocr"] = time_each(reader.readtext, prepared, repeat)
+    return {name: percentiles(samples) for name, samples in sorted(stages.items())}
+
+
+def run_pipeline(
+    cards: List[SyntheticCard], config: PreprocessConfig, reader
+) -> Dict:
+    """decode -> OCR -> extract -> store per card, timing every step"""
+    samples: Dict[str, List[float]] = {
+        name: [] for name in ("decode", "ocr", "extract", "store", "total")
+    }
+    predicted = {}
+    started = time.perf_counter()
+    for card in cards:
+        marks = [time.perf_counter()]
+        image = decode_image(card.data)
+        marks.append(time.perf_counter())
+        if reader is not None:
+            detections = run_ocr(reader, image, config).detections
+        else:
+            detections = card.detections
+        marks.append(time.perf_counter())
+        contact = extract_layout_fields(detections).to_dict()
+        marks.append(time.perf_counter())
+        storage.insert_contacts([contact])
+        marks.append(time.perf_counter())
+
+        predicted[card.name] = contact
+        for name, begin, end in zip(samples, marks, marks[1:]):
+            samples[name].append((end - begin) * 1000)
+        samples["total"].append((marks[-1] - marks[0]) * 1000)
+    elapsed = time.perf_counter() - started
+
+    truth = {card.name: card.truth for card in cards}
+    return {
+        "stages": {name: percentiles(values) for name, values in samples.items()},
+        "cards_per_s": round(len(cards) / elapsed, 2),
+        "accuracy": field_scores(predicted, truth),
+    }
+
+
+def run_bulk_store(cards: List[SyntheticCard], batch_size: int = 500) -> Dict:
+    start = time.perf_counter()
+    outcomes = storage.bulk_write_contacts(
+        [card.truth for card in cards], batch_size=batch_size
+    )
+    elapsed = time.perf_counter() - start
+    return {
+        "rows": len(outcomes),
+        "failed": sum(not outcome.ok for outcome in outcomes),
+        "rows_per_s": round(len(outcomes) / elapsed, 1),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run(
+    count: int, seed: int, photo_ratio: float, repeat: int, skip_ocr: bool, gpu: bool
+) -> Dict:
+    preprocess_config = PreprocessConfig.from_env()
+    recognizer_config = RecognizerConfig.from_env()
+    storage.set_backend(SQLiteBackend(":memory:"))
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "preprocess": preprocess_config.to_dict(),
+            "recognizer": None if skip_ocr else recognizer_config.to_dict(),
+        },
+        "corpus": {"count": count, "seed": seed, "photo_ratio": photo_ratio},
+        "peak_rss_mb": {},
+    }
+    cards = generate_corpus(count, seed, photo_ratio)
+    report["peak_rss_mb"]["corpus"] = peak_rss_mb()
+
+    reader = None
+    if not skip_ocr:
+        start = time.perf_counter()
+        reader = create_reader(OCR_LANGUAGES, gpu=gpu, config=recognizer_config)
+        report["ocr_load_s"] = round(time.perf_counter() - start, 2)
+        # Warm up so lazy initialization is not charged to the first card
+        reader.readtext(decode_image(cards[0].data))
+    report["peak_rss_mb"]["model"] = peak_rss_mb()
+
+    report["stages"] = run_stages(cards, repeat, preprocess_config, reader)
+    report["peak_rss_mb"]["stages"] = peak_rss_mb()
+    report["pipeline"] = run_pipeline(cards, preprocess_config, reader)
+    report["peak_rss_mb"]["pipeline"] = peak_rss_mb()
+    report["bulk_store"] = run_bulk_store(cards)
+
+    # Extraction on perfect OCR isolates extractor changes from OCR noise
+    truth = {card.name: card.truth for card in cards}
+    perfect = {
+        card.name: extract_layout_fields(card.detections).to_dict() for card in cards
+    }
+    report["accuracy"] = {"perfect_ocr": field_scores(perfect, truth)}
+    if reader is not None:
+        report["accuracy"]["pipeline"] = report["pipeline"]["accuracy"]
+    return report
+
+
+def _change(new: float, old: float) -> str:
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old:+.1%}"
+
+
+def compare(report: Dict, baseline: Dict):
+    """Print p50 latency and F1 changes against an earlier report"""
+    print(f"\ncompared with {baseline['meta'].get('commit') or 'baseline'}:")
+    sections = [("stage", report["stages"], baseline.get("stages", {}))]
+    sections.append(
+        ("pipeline", report["pipeline"]["stages"], baseline["pipeline"]["stages"])
+    )
+    for label, current, previous in sections:
+        for name, row in current.items():
+            old = previous.get(name, {}).get("p50")
+            if old is not None and "p50" in row:
+                print(
+                    f"  {label} {name:<15} p50 {old:>9.3f} -> "
+                    f"{row['p50']:>9.3f} ms ({_change(row['p50'], old)})"
+                )
+    for kind, scores in report["accuracy"].items():
+        previous = baseline.get("accuracy", {}).get(kind)
+        if previous:
+            print(
+                f"  {kind:<21} F1  {previous['overall']['f1']:>9.4f} -> "
+                f"{scores['overall']['f1']:>9.4f}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=50, help="Synthetic cards")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument(
+        "--photo-ratio",
+        type=float,
+        default=0.5,
+        help="Share of cards rendered as perspective photos",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Runs per card for single stages"
+    )
+    parser.add_argument(
+        "--skip-ocr", action="store_true", help="Use the rendered text instead of OCR"
+    )
+    parser.add_argument("--gpu", action="store_true", help="Run OCR on the GPU")
+    parser.add_argument("--json", help="Write the report to this file")
+    parser.add_argument("--compare", help="Earlier report to compare against")
+    args = parser.parse_args()
+
+    report = run(
+        args.count, args.seed, args.photo_ratio, args.repeat, args.skip_ocr, args.gpu
+    )
+    print(f"{'stage':<16} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    rows = list(report["stages"].items())
+    rows += [(f"e2e {name}", row) for name, row in report["pipeline"]["stages"].items()]
+    for name, row in rows:
+        print(
+            f"{name:<16} {row['p50']:>9.3f} {row['p90']:>9.3f} "
+            f"{row['p99']:>9.3f} {row['max']:>9.3f}"
+        )
+    print(
+        f"\n{report['pipeline']['cards_per_s']} cards/s end to end, "
+        f"{report['bulk_store']['rows_per_s']} rows/s bulk store, "
+        f"peak RSS {report['peak_rss_mb']['pipeline']} MB"
+    )
+    for kind, scores in report["accuracy"].items():
+        print(f"\nfield accuracy ({kind}):")
+        print(f"  {'field':<16} {'precision':>9} {'recall':>9} {'f1':>9}")
+        for name, row in scores.items():
+            print(
+                f"  {name:<16} {row['precision']:>9.1%} {row['recall']:>9.1%} "
+                f"{row['f1']:>9.1%}"
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+if __name__ == "__main__":
+    main()
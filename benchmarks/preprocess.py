@@ -0,0 +1,133 @@
+"""Latency/accuracy tradeoff of the OCR preprocessing settings
+
+    python -m benchmarks.preprocess cards/ --truth truth.json --json out.json
+
+truth.json maps image file names to expected contact fields. Without it,
+accuracy is measured as agreement with the full-resolution run.
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+from typing import Dict, List, Optional
+
+from bizscan.batch import IMAGE_EXTENSIONS
+from bizscan.extraction import CONTACT_FIELDS, extract_layout_fields
+from bizscan.imaging import decode_image
+from bizscan.ocr import create_reader, run_ocr
+from bizscan.preprocess import PreprocessConfig
+
+SETTINGS = {
+    "full-res": PreprocessConfig(max_side=None),
+    "2400": PreprocessConfig(max_side=2400),
+    "1600": PreprocessConfig(max_side=1600),
+    "1280": PreprocessConfig(max_side=1280),
+    "960": PreprocessConfig(max_side=960),
+    "1600+gray": PreprocessConfig(max_side=1600, grayscale=True),
+    "1600+contrast": PreprocessConfig(max_side=1600, normalize_contrast=True),
+    "1600+crop": PreprocessConfig(max_side=1600, crop_card=True),
+    "1280+crop+contrast": PreprocessConfig(
+        max_side=1280, crop_card=True, normalize_contrast=True
+    ),
+}
+
+
+def normalize_field(value: Optional[str]) -> str:
+    return " ".join(str(value or "").lower().split())
+
+
+def field_accuracy(
+    predicted: Dict[str, Dict[str, str]], expected: Dict[str, Dict[str, str]]
+) -> float:
+    """Share of expected non-empty fields that were extracted exactly"""
+    hits = total = 0
+    for name, fields in expected.items():
+        for field_name in CONTACT_FIELDS:
+            if not normalize_field(fields.get(field_name)):
+                continue
+            total += 1
+            value = predicted.get(name, {}).get(field_name)
+            hits += normalize_field(value) == normalize_field(fields.get(field_name))
+    return hits / total if total else 0.0
+
+
+def load_images(image_dir: str) -> Dict:
+    images = {}
+    for name in sorted(os.listdir(image_dir)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            with open(os.path.join(image_dir, name), "rb") as f:
+                images[name] = decode_image(f.read())
+    return images
+
+
+def run(
+    image_dir: str, truth_path: Optional[str], repeat: int, gpu: bool
+) -> List[Dict]:
+    images = load_images(image_dir)
+    reader = create_reader(gpu=gpu)
+    # Warm up so model loading is not charged to the first setting
+    run_ocr(reader, next(iter(images.values())), SETTINGS["960"])
+
+    expected = None
+    if truth_path:
+        with open(truth_path) as f:
+            expected = json.load(f)
+
+    report = []
+    for label, config in SETTINGS.items():
+        latencies = []
+        predicted = {}
+        for name, image in images.items():
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = run_ocr(reader, image, config)
+                predicted[name] = extract_layout_fields(result.detections).to_dict()
+                latencies.append((time.perf_counter() - start) * 1000)
+        if expected is None:
+            # The full-resolution run is the reference for the others
+            expected = predicted
+        latencies.sort()
+        report.append(
+            {
+                "setting": label,
+                "config": config.to_dict(),
+                "images": len(images),
+                "median_ms": round(statistics.median(latencies), 1),
+                "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1),
+                "field_accuracy": round(field_accuracy(predicted, expected), 3),
+            }
+        )
+
+    baseline = report[0]["median_ms"]
+    for row in report:
+        row["speedup"] = round(baseline / max(row["median_ms"], 0.1), 2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("image_dir", help="Directory of card images")
+    parser.add_argument("--truth", help="JSON file of expected fields per image")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per image")
+    parser.add_argument("--gpu", action="store_true", help="Run OCR on the GPU")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.image_dir, args.truth, args.repeat, args.gpu)
+    print(
+        f"{'setting':<20} {'median ms':>10} {'p95 ms':>10} "
+        f"{'speedup':>8} {'accuracy':>9}"
+    )
+    for row in report:
+        print(
+            f"{row['setting']:<20} {row['median_ms']:>10} {row['p95_ms']:>10} "
+            f"{row['speedup']:>8} {row['field_accuracy']:>9.1%}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
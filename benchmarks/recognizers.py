@@ -0,0 +1,120 @@
+"""Throughput/accuracy comparison of the OCR recognizer backends
+
+    python -m benchmarks.recognizers cards/ --truth truth.json --json out.json
+
+The onnx backends need the exported models (python -m bizscan export-onnx);
+backends that fail to load are reported and skipped. Without --truth,
+accuracy is measured as agreement with the unquantized EasyOCR run.
+"""
+import argparse
+import json
+import statistics
+import time
+from dataclasses import replace
+from typing import Dict, List, Optional
+
+from benchmarks.preprocess import field_accuracy, load_images
+from bizscan.extraction import extract_layout_fields
+from bizscan.ocr import OCR_LANGUAGES, create_reader, run_ocr
+from bizscan.preprocess import PreprocessConfig
+from bizscan.recognizers import RecognizerConfig
+
+BACKENDS = {
+    "easyocr": RecognizerConfig(quantize=False),
+    "easyocr-int8": RecognizerConfig(quantize=True),
+    "int8+batch8": RecognizerConfig(quantize=True, batch_size=8),
+    "int8+canvas1280": RecognizerConfig(quantize=True, canvas_size=1280),
+    "int8+paragraph": RecognizerConfig(quantize=True, paragraph=True),
+    "onnx": RecognizerConfig(backend="onnx"),
+    "onnx+batch8": RecognizerConfig(backend="onnx", batch_size=8),
+}
+
+
+def run(
+    image_dir: str,
+    truth_path: Optional[str],
+    repeat: int,
+    gpu: bool,
+    onnx_dir: Optional[str],
+) -> List[Dict]:
+    images = load_images(image_dir)
+    preprocess = PreprocessConfig.from_env()
+    expected = None
+    if truth_path:
+        with open(truth_path) as f:
+            expected = json.load(f)
+
+    report = []
+    for label, config in BACKENDS.items():
+        if onnx_dir:
+            config = replace(config, onnx_dir=onnx_dir)
+        start = time.perf_counter()
+        try:
+            reader = create_reader(OCR_LANGUAGES, gpu=gpu, config=config)
+            load_s = time.perf_counter() - start
+            # Warm up so lazy initialization is not charged to the first card
+            run_ocr(reader, next(iter(images.values())), preprocess)
+        except Exception as e:
+            report.append({"backend": label, "error": str(e)})
+            continue
+
+        latencies = []
+        predicted = {}
+        started = time.perf_counter()
+        for name, image in images.items():
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = run_ocr(reader, image, preprocess)
+                predicted[name] = extract_layout_fields(result.detections).to_dict()
+                latencies.append((time.perf_counter() - start) * 1000)
+        elapsed = time.perf_counter() - started
+        if expected is None:
+            # The unquantized EasyOCR run is the reference for the others
+            expected = predicted
+        latencies.sort()
+        report.append(
+            {
+                "backend": label,
+                "config": config.to_dict(),
+                "images": len(images),
+                "load_s": round(load_s, 2),
+                "cards_per_s": round(len(latencies) / elapsed, 2),
+                "median_ms": round(statistics.median(latencies), 1),
+                "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))], 1),
+                "field_accuracy": round(field_accuracy(predicted, expected), 3),
+            }
+        )
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("image_dir", help="Directory of card images")
+    parser.add_argument("--truth", help="JSON file of expected fields per image")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per image")
+    parser.add_argument("--gpu", action="store_true", help="Run OCR on the GPU")
+    parser.add_argument("--onnx-dir", help="Directory of the exported ONNX models")
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.image_dir, args.truth, args.repeat, args.gpu, args.onnx_dir)
+    print(
+        f"{'backend':<18} {'load s':>7} {'cards/s':>8} {'median ms':>10} "
+        f"{'p95 ms':>8} {'accuracy':>9}"
+    )
+    for row in report:
+        if "error" in row:
+            print(f"{row['backend']:<18} skipped: {row['error']}")
+            continue
+        print(
+            f"{row['backend']:<18} {row['load_s']:>7} {row['cards_per_s']:>8} "
+            f"{row['median_ms']:>10} {row['p95_ms']:>8} "
+            f"{row['field_accuracy']:>9.1%}"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
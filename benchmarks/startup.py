@@ -0,0 +1,183 @@
+"""Cold-start cost: import time of the app's modules and OCR model load
+
+    python -m benchmarks.startup --repeat 5 --json startup.json
+
+Every measurement runs in a fresh interpreter so nothing is already cached
+in sys.modules. Heavy dependencies that show up on an import path are
+reported, and --budget-ms makes the run fail when imports get slower.
+"""
+import argparse
+import json
+import os
+import pkgutil
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, List, Optional
+
+import bizscan
+
+# Every module of the package, so new ones are timed without editing this list,
+# plus the Streamlit app itself; __main__ runs the CLI when imported
+APP_MODULES = sorted(
+    module.name
+    for module in pkgutil.walk_packages(bizscan.__path__, "bizscan.")
+    if not module.name.endswith(".__main__")
+) + ["business_card_scanner"]
+
+# Dependencies that must only be imported when they are actually used
+HEAVY_MODULES = [
+    "easyocr",
+    "torch",
+    "onnxruntime",
+    "matplotlib",
+    "supabase",
+    "psycopg2",
+    "pandas",
+    "cv2",
+]
+
+MARKER = "-- benchmark start --"
+
+IMPORT_SCRIPT = """
+import json, sys, time
+sys.stderr.write({marker!r} + "\\n")
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"ms": elapsed * 1000, "heavy": heavy}}))
+"""
+
+MODEL_SCRIPT = """
+import json, time
+start = time.perf_counter()
+from bizscan.ocr import BackgroundReader
+reader = BackgroundReader(device={device!r})
+returned = time.perf_counter() - start
+reader.wait()
+ready = time.perf_counter() - start
+print(json.dumps({{"returned_ms": returned * 1000, "ready_ms": ready * 1000,
+                  "gpu": reader.gpu}}))
+"""
+
+
+def _run(script: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    # The app module opens its storage backend on import; point it at a
+    # throwaway SQLite file so no database or credentials are needed
+    env = dict(
+        os.environ,
+        STORAGE_BACKEND="sqlite",
+        SQLITE_PATH=os.path.join(tempfile.gettempdir(), "bizscan-startup.sqlite3"),
+    )
+    return subprocess.run(
+        command + ["-c", script], capture_output=True, text=True, check=True, env=env
+    )
+
+
+def slowest_imports(stderr: str, limit: int = 5) -> List[Dict]:
+    """Top-level imports after the marker, by cumulative microseconds"""
+    lines = stderr.split(MARKER, 1)[-1].splitlines()
+    rows = []
+    for line in lines:
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|", 2)
+        # Nested imports are indented under the module that pulled them in
+        if name.startswith("  "):
+            continue
+        rows.append({"module": name.strip(), "ms": int(cumulative) / 1000})
+    rows.sort(key=lambda row: row["ms"], reverse=True)
+    return rows[:limit]
+
+
+def measure_imports(modules: List[str], repeat: int) -> Dict:
+    script = IMPORT_SCRIPT.format(
+        marker=MARKER,
+        imports="\n".join(f"import {module}" for module in modules),
+        heavy=HEAVY_MODULES,
+    )
+    timings = []
+    for _ in range(repeat):
+        timings.append(json.loads(_run(script).stdout)["ms"])
+    profile = _run(script, importtime=True)
+    return {
+        "median_ms": round(statistics.median(timings), 1),
+        "max_ms": round(max(timings), 1),
+        "heavy": json.loads(profile.stdout)["heavy"],
+        "slowest": slowest_imports(profile.stderr),
+    }
+
+
+def measure_model(device: str) -> Dict:
+    result = json.loads(_run(MODEL_SCRIPT.format(device=device)).stdout)
+    for key in ("returned_ms", "ready_ms"):
+        result[key] = round(result[key], 1)
+    return result
+
+
+def run(repeat: int, model_device: Optional[str]) -> Dict:
+    report = {"modules": {}}
+    for module in APP_MODULES:
+        report["modules"][module] = measure_imports([module], repeat)
+    report["app"] = measure_imports(APP_MODULES, repeat)
+    if model_device:
+        report["model"] = measure_model(model_device)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per import")
+    parser.add_argument(
+        "--model",
+        metavar="DEVICE",
+        help="Also time the background OCR model load on auto, cpu or cuda",
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="Exit non-zero if importing the app modules takes longer than this",
+    )
+    parser.add_argument("--json", help="Also write the report to this file")
+    args = parser.parse_args()
+
+    report = run(args.repeat, args.model)
+    print(f"{'module':<22} {'median ms':>10} {'max ms':>8}  heavy imports")
+    rows = list(report["modules"].items()) + [("(app total)", report["app"])]
+    for module, row in rows:
+        print(
+            f"{module:<22} {row['median_ms']:>10} {row['max_ms']:>8}  "
+            f"{', '.join(row['heavy']) or '-'}"
+        )
+    print("\nslowest imports for the app:")
+    for row in report["app"]["slowest"]:
+        print(f"  {row['module']:<30} {row['ms']:>8.1f} ms")
+    if "model" in report:
+        model = report["model"]
+        print(
+            f"\nOCR model: constructor returned in {model['returned_ms']} ms, "
+            f"ready after {model['ready_ms']} ms (gpu={model['gpu']})"
+        )
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failures = []
+    if report["app"]["heavy"]:
+        failures.append(f"heavy modules imported: {report['app']['heavy']}")
+    if args.budget_ms and report["app"]["median_ms"] > args.budget_ms:
+        failures.append(
+            f"app imports took {report['app']['median_ms']} ms, "
+            f"budget is {args.budget_ms} ms"
+        )
+    if failures:
+        sys.exit("; ".join(failures))
+
+
+if __name__ == "__main__":
+    main()
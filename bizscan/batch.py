@@ -0,0 +1,168 @@
+import io
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from bizscan.extraction import extract_layout_fields
+from bizscan.imaging import decode_image
+from bizscan.ocr import OCR_LANGUAGES, OCRResult, ReaderPool, create_reader, run_ocr
+from bizscan.preprocess import PreprocessConfig
+from bizscan.recognizers import RecognizerConfig
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+# One reader per worker process, built by the pool initializer
+_worker_reader = None
+_worker_preprocess: Optional[PreprocessConfig] = None
+
+
+@dataclass
+class BatchResult:
+    """Outcome of scanning one card in a batch"""
+
+    index: int
+    name: str
+    contact: Dict[str, Any] = field(default_factory=dict)
+    ocr: Optional[OCRResult] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def iter_card_files(
+    uploads: Iterable[Tuple[str, bytes]]
+) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, bytes) for every card image, expanding zip archives"""
+    for name, data in uploads:
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as archive:
+                for member in archive.infolist():
+                    member_name = os.path.basename(member.filename)
+                    if member.is_dir() or member_name.startswith("."):
+                        continue
+                    if member_name.lower().endswith(IMAGE_EXTENSIONS):
+                        yield member.filename, archive.read(member)
+        elif name.lower().endswith(IMAGE_EXTENSIONS):
+            yield name, data
+
+
+def iter_card_paths(paths: Iterable[str]) -> Iterator[Tuple[str, bytes]]:
+    """Yield (name, bytes) for card images and zip archives under paths"""
+
+    def read(path: str) -> Iterator[Tuple[str, bytes]]:
+        if not path.lower().endswith(IMAGE_EXTENSIONS + (".zip",)):
+            return
+        with open(path, "rb") as f:
+            yield from iter_card_files([(path, f.read())])
+
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for filename in sorted(files):
+                    yield from read(os.path.join(root, filename))
+        else:
+            yield from read(path)
+
+
+def _init_worker(
+    languages: List[str],
+    gpu: bool,
+    threads: int,
+    preprocess: PreprocessConfig,
+    recognizer: RecognizerConfig,
+    auto_languages: Sequence[str],
+):
+    global _worker_reader, _worker_preprocess
+    import cv2
+    import torch
+
+    # Keep each worker on its own cores so throughput scales with processes
+    torch.set_num_threads(threads)
+    cv2.setNumThreads(threads)
+    if auto_languages:
+        _worker_reader = ReaderPool(
+            languages,
+            device="cuda" if gpu else "cpu",
+            recognizer=recognizer,
+            auto_languages=auto_languages,
+            warm_up=False,
+            wait_for_readers=True,
+        )
+    else:
+        _worker_reader = create_reader(languages, gpu=gpu, config=recognizer)
+    _worker_preprocess = preprocess
+
+
+def scan_card(
+    index: int,
+    name: str,
+    data: bytes,
+    reader=None,
+    preprocess: Optional[PreprocessConfig] = None,
+) -> BatchResult:
+    """Decode, OCR and extract one card"""
+    reader = reader or _worker_reader
+    preprocess = preprocess or _worker_preprocess
+    try:
+        image = decode_image(data)
+        if image is None:
+            return BatchResult(index, name, error="Could not decode image")
+        ocr = run_ocr(reader, image, preprocess)
+        contact = extract_layout_fields(ocr.detections).to_dict()
+        return BatchResult(index, name, contact=contact, ocr=ocr)
+    except Exception as e:
+        return BatchResult(index, name, error=str(e))
+
+
+def scan_batch(
+    cards: Iterable[Tuple[str, bytes]],
+    workers: Optional[int] = None,
+    languages: Optional[List[str]] = None,
+    gpu: bool = False,
+    max_pending: Optional[int] = None,
+    preprocess: Optional[PreprocessConfig] = None,
+    recognizer: Optional[RecognizerConfig] = None,
+    auto_languages: Sequence[str] = (),
+) -> Iterator[BatchResult]:
+    """Scan cards on a process pool, yielding results as they complete
+
+    At most max_pending cards are in flight at once so large archives are
+    never held in memory all together. With auto_languages, every worker
+    keeps a ReaderPool and picks the language set per card.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or workers * 2
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    context = multiprocessing.get_context("spawn")
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(
+            languages or OCR_LANGUAGES,
+            gpu,
+            threads,
+            preprocess or PreprocessConfig.from_env(),
+            recognizer or RecognizerConfig.from_env(),
+            list(auto_languages),
+        ),
+    ) as pool:
+        pending = set()
+        for index, (name, data) in enumerate(cards):
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(pool.submit(scan_card, index, name, data))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
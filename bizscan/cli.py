@@ -0,0 +1,332 @@
+import argparse
+import csv
+import json
+import sys
+import time
+from dataclasses import asdict, replace
+from typing import List, Optional
+
+from bizscan.batch import BatchResult, iter_card_paths, scan_batch
+from bizscan.dedup import DEFAULT_THRESHOLD
+from bizscan.export import EXPORT_FORMATS
+from bizscan.extraction import CONTACT_FIELDS
+from bizscan.languages import LANGUAGE_SETS, auto_language_sets
+from bizscan.ocr import OCR_LANGUAGES, describe_reader, reader_config
+from bizscan.preprocess import PreprocessConfig
+from bizscan.recognizers import RECOGNIZER_BACKENDS, RecognizerConfig
+
+OUTPUT_FIELDS = ["file"] + CONTACT_FIELDS + ["error"]
+
+
+class ResultWriter:
+    """Stream batch results to a JSONL or CSV file"""
+
+    def __init__(self, stream, output_format: str):
+        self.stream = stream
+        self.output_format = output_format
+        self._csv = None
+        if output_format == "csv":
+            self._csv = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS)
+            self._csv.writeheader()
+
+    def write(self, result: BatchResult):
+        row = {"file": result.name, **result.contact, "error": result.error or ""}
+        if self._csv is not None:
+            self._csv.writerow(row)
+        else:
+            self.stream.write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.stream.flush()
+
+
+def _output_format(path: str, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _flush_to_database(
+    pending: List[BatchResult], reader: str, args: argparse.Namespace
+) -> int:
+    from bizscan import storage
+    from bizscan.reextract import save_scan_ocr
+
+    outcomes = storage.bulk_write_contacts(
+        [result.contact for result in pending],
+        batch_size=args.db_batch_size,
+        concurrency=args.db_concurrency,
+        upsert_on=args.db_upsert_on,
+    )
+    for outcome in outcomes:
+        if not outcome.ok:
+            print(f"Database write failed: {outcome.error}", file=sys.stderr)
+    try:
+        save_scan_ocr(outcomes, pending, reader)
+    except Exception as e:
+        # The contacts are saved; only later re-extraction misses these cards
+        print(f"Saving OCR output failed: {e}", file=sys.stderr)
+    pending.clear()
+    return sum(outcome.ok for outcome in outcomes)
+
+
+def scan_command(args: argparse.Namespace) -> int:
+    output_format = _output_format(args.out, args.format)
+    stream = (
+        sys.stdout
+        if args.out == "-"
+        else open(args.out, "w", newline="", encoding="utf-8")
+    )
+    writer = ResultWriter(stream, output_format)
+    pending: List[BatchResult] = []
+    scanned = failed = stored = 0
+    recognizer = RecognizerConfig.from_env()
+    if args.backend:
+        recognizer = replace(recognizer, backend=args.backend)
+    auto_languages = args.auto_languages
+    if auto_languages is None:
+        auto_languages = auto_language_sets()
+    reader = describe_reader(
+        reader_config(
+            args.languages, "cuda" if args.gpu else "cpu", recognizer, auto_languages
+        ),
+        PreprocessConfig.from_env(),
+    )
+
+    try:
+        for result in scan_batch(
+            iter_card_paths(args.paths),
+            workers=args.workers,
+            languages=args.languages,
+            gpu=args.gpu,
+            recognizer=recognizer,
+            auto_languages=auto_languages,
+        ):
+            scanned += 1
+            writer.write(result)
+            if not result.ok:
+                failed += 1
+                print(f"{result.name}: {result.error}", file=sys.stderr)
+            elif args.db:
+                pending.append(result)
+                if len(pending) >= args.db_batch_size * args.db_concurrency:
+                    stored += _flush_to_database(pending, reader, args)
+        if args.db and pending:
+            stored += _flush_to_database(pending, reader, args)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+
+    summary = f"Scanned {scanned} cards ({failed} failed)"
+    if args.db:
+        summary += f", saved {stored} to database"
+    print(summary, file=sys.stderr)
+    return 1 if failed else 0
+
+
+def _export_format(path: str, requested: Optional[str]) -> str:
+    if requested:
+        return requested
+    path = path.lower()
+    path = path[: -len(".gz")] if path.endswith(".gz") else path
+    if path.endswith(".csv"):
+        return "csv"
+    if path.endswith(".vcf"):
+        return "vcard3"
+    return "jsonl"
+
+
+def export_command(args: argparse.Namespace) -> int:
+    from bizscan.export import export_contacts
+
+    export_format = _export_format(args.out, args.format)
+    compress = args.gzip or args.out.lower().endswith(".gz")
+    stream = sys.stdout.buffer if args.out == "-" else open(args.out, "wb")
+    try:
+        count = export_contacts(
+            stream, export_format, compress, page_size=args.page_size
+        )
+    finally:
+        if stream is not sys.stdout.buffer:
+            stream.close()
+    print(f"Exported {count} contacts", file=sys.stderr)
+    return 0
+
+
+def dedup_command(args: argparse.Namespace) -> int:
+    from bizscan import storage
+    from bizscan.dedup import find_duplicates
+
+    start = time.perf_counter()
+    groups = find_duplicates(
+        storage.iter_contacts(args.page_size), args.threshold, args.max_block
+    )
+    elapsed = time.perf_counter() - start
+    stream = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    try:
+        for group in groups:
+            stream.write(json.dumps(asdict(group), ensure_ascii=False) + "\n")
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    print(f"Found {len(groups)} duplicate groups in {elapsed:.1f}s", file=sys.stderr)
+    return 0
+
+
+def reextract_command(args: argparse.Namespace) -> int:
+    from bizscan.reextract import reextract_contacts
+
+    report = reextract_contacts(
+        page_size=args.page_size, dry_run=args.dry_run, concurrency=args.concurrency
+    )
+    verb = "would update" if args.dry_run else "updated"
+    print(
+        f"Re-extracted {report.with_ocr} of {report.scanned} contacts in "
+        f"{report.seconds:.1f}s, {verb} {report.changed}",
+        file=sys.stderr,
+    )
+    for name, count in sorted(report.fields.items()):
+        print(f"  {name}: {count}", file=sys.stderr)
+    return 0
+
+
+def export_onnx_command(args: argparse.Namespace) -> int:
+    from bizscan.recognizers import export_onnx
+
+    for name, path in export_onnx(args.languages, args.out).items():
+        print(f"Wrote {name} to {path}", file=sys.stderr)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="bizscan", description="Headless business card scanning"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser(
+        "scan", help="Scan card images, directories or zip archives"
+    )
+    scan.add_argument("paths", nargs="+", help="Images, zip archives or directories")
+    scan.add_argument(
+        "--out", default="-", help="Output file (.jsonl or .csv), '-' for stdout"
+    )
+    scan.add_argument(
+        "--format",
+        choices=["jsonl", "csv"],
+        help="Output format (default: by extension)",
+    )
+    scan.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes (default: all cores)",
+    )
+    scan.add_argument(
+        "--languages", nargs="+", default=OCR_LANGUAGES, help="EasyOCR language codes"
+    )
+    scan.add_argument(
+        "--auto-languages",
+        nargs="*",
+        choices=list(LANGUAGE_SETS),
+        help="Language sets to try on cards --languages reads poorly "
+        "(default: OCR_AUTO_LANGUAGES)",
+    )
+    scan.add_argument("--gpu", action="store_true", help="Run OCR on the GPU")
+    scan.add_argument(
+        "--backend",
+        choices=RECOGNIZER_BACKENDS,
+        help="OCR recognizer backend (default: OCR_BACKEND or easyocr)",
+    )
+    scan.add_argument(
+        "--db",
+        action="store_true",
+        help="Also save scanned contacts to the configured storage backend",
+    )
+    scan.add_argument(
+        "--db-batch-size", type=int, default=100, help="Contacts per database insert"
+    )
+    scan.add_argument(
+        "--db-concurrency",
+        type=int,
+        default=4,
+        help="Database batches written in parallel",
+    )
+    scan.add_argument(
+        "--db-upsert-on",
+        choices=["business_email", "contact_number"],
+        help="Update existing contacts matching on this column instead of inserting",
+    )
+    scan.set_defaults(func=scan_command)
+
+    export_contacts = commands.add_parser(
+        "export", help="Stream every stored contact to a file"
+    )
+    export_contacts.add_argument(
+        "--out",
+        default="-",
+        help="Output file (.csv, .jsonl, .vcf, optionally .gz), '-' for stdout",
+    )
+    export_contacts.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        help="Output format (default: by extension, vCard 3.0 for .vcf)",
+    )
+    export_contacts.add_argument(
+        "--gzip", action="store_true", help="Compress the output with gzip"
+    )
+    export_contacts.add_argument(
+        "--page-size", type=int, default=1000, help="Contacts fetched per query"
+    )
+    export_contacts.set_defaults(func=export_command)
+
+    dedup = commands.add_parser(
+        "dedup", help="List groups of stored contacts that look like duplicates"
+    )
+    dedup.add_argument("--out", default="-", help="Output JSONL file, '-' for stdout")
+    dedup.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Minimum match score between 0 and 1",
+    )
+    dedup.add_argument(
+        "--max-block",
+        type=int,
+        default=200,
+        help="Skip blocking keys shared by more contacts than this",
+    )
+    dedup.add_argument(
+        "--page-size", type=int, default=1000, help="Contacts fetched per query"
+    )
+    dedup.set_defaults(func=dedup_command)
+
+    reextract = commands.add_parser(
+        "reextract",
+        help="Re-run field extraction on stored OCR output without rescanning",
+    )
+    reextract.add_argument(
+        "--dry-run", action="store_true", help="Report changes without writing them"
+    )
+    reextract.add_argument(
+        "--page-size", type=int, default=500, help="Contacts processed per query"
+    )
+    reextract.add_argument(
+        "--concurrency", type=int, default=4, help="Update batches written in parallel"
+    )
+    reextract.set_defaults(func=reextract_command)
+
+    export = commands.add_parser(
+        "export-onnx", help="Export the EasyOCR models for the onnx backend"
+    )
+    export.add_argument(
+        "--languages", nargs="+", default=OCR_LANGUAGES, help="EasyOCR language codes"
+    )
+    export.add_argument(
+        "--out", default="models/onnx", help="Directory for the .onnx files"
+    )
+    export.set_defaults(func=export_onnx_command)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
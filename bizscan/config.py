@@ -0,0 +1,11 @@
+import os
+
+TRUTHY = ("1", "true", "yes", "on")
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Boolean setting from the environment; unset means default"""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() in TRUTHY
@@ -0,0 +1,337 @@
+import bisect
+import itertools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bizscan import storage
+from bizscan.dedup import (
+    DEFAULT_THRESHOLD,
+    DedupIndex,
+    DuplicateGroup,
+    DuplicateMatch,
+    find_duplicates,
+    match_in_storage,
+)
+from bizscan.metrics import METRICS
+from bizscan.search import ContactSearchIndex
+from bizscan.storage import ContactPage
+
+logger = logging.getLogger(__name__)
+
+
+def _sort_key(row: Dict[str, Any]) -> Tuple[str, Any]:
+    return (row.get("created_at") or "", row["id"])
+
+
+def fetch_rows(
+    page_size: int = 1000, max_rows: Optional[int] = None
+) -> Optional[List[Dict[str, Any]]]:
+    """Every contact through the paged storage API
+
+    Returns None without loading further pages when the table holds more
+    than max_rows contacts.
+    """
+    rows: List[Dict[str, Any]] = []
+    offset = 0
+    while True:
+        page = storage.fetch_contacts_page(limit=page_size, offset=offset)
+        if max_rows is not None and page.total > max_rows:
+            return None
+        rows.extend(page.rows)
+        offset += page_size
+        if len(page.rows) < page_size:
+            break
+    return rows
+
+
+class ContactSnapshot:
+    """In-memory copy of the contact table with an incrementally updated index
+
+    Pages are served newest first, matching storage.fetch_contacts_page.
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, Any]] = ()):
+        self._rows: Dict[Any, Dict[str, Any]] = {row["id"]: row for row in rows}
+        self._keys: List[Tuple[str, Any]] = sorted(map(_sort_key, self._rows.values()))
+        self._lock = threading.RLock()
+        self.index = ContactSearchIndex.build(self._rows.values())
+        self.dedup = DedupIndex.build(self._rows.values())
+
+    @classmethod
+    def load(
+        cls, page_size: int = 1000, max_rows: Optional[int] = None
+    ) -> Optional["ContactSnapshot"]:
+        """Load every contact through the paged storage API
+
+        Returns None without loading further pages when the table holds more
+        than max_rows contacts.
+        """
+        rows = fetch_rows(page_size, max_rows)
+        return None if rows is None else cls(rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def sync(self, rows: Iterable[Dict[str, Any]]) -> int:
+        """Bring the snapshot in line with rows, touching only what changed
+
+        Returns the number of rows added, updated or removed; the search and
+        dedup indexes are patched for those rows only.
+        """
+        fresh = {row["id"]: row for row in rows}
+        changed = 0
+        with self._lock:
+            for contact_id in [cid for cid in self._rows if cid not in fresh]:
+                self.remove(contact_id)
+                changed += 1
+            for contact_id, row in fresh.items():
+                if self._rows.get(contact_id) != row:
+                    self.upsert(row)
+                    changed += 1
+        return changed
+
+    def upsert(self, row: Dict[str, Any]):
+        with self._lock:
+            self.remove(row["id"])
+            self._rows[row["id"]] = row
+            bisect.insort(self._keys, _sort_key(row))
+            self.index.add(row)
+            self.dedup.add(row)
+
+    def remove(self, contact_id: Any):
+        with self._lock:
+            row = self._rows.pop(contact_id, None)
+            if row is None:
+                return
+            position = bisect.bisect_left(self._keys, _sort_key(row))
+            del self._keys[position]
+            self.index.remove(contact_id)
+            self.dedup.remove(contact_id)
+
+    def page(self, limit: int = 50, offset: int = 0, search: str = "") -> ContactPage:
+        """One page of rows, newest first, optionally filtered by search"""
+        with self._lock:
+            if search.strip():
+                ids = self.index.search(search)
+                total = len(ids)
+                if total * 8 < len(self._keys):
+                    # Few matches: sorting them beats walking the whole table
+                    matches = sorted(
+                        (_sort_key(self._rows[cid]) for cid in ids), reverse=True
+                    )
+                    keys = matches[offset : offset + limit]
+                else:
+                    matches = (key for key in reversed(self._keys) if key[1] in ids)
+                    keys = list(itertools.islice(matches, offset, offset + limit))
+            else:
+                total = len(self._keys)
+                end = max(total - offset, 0)
+                keys = self._keys[max(end - limit, 0) : end][::-1]
+            rows = [self._rows[key[1]] for key in keys]
+        return ContactPage(rows, total, limit, offset)
+
+    def duplicates(
+        self, row: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD, limit: int = 5
+    ) -> List[DuplicateMatch]:
+        with self._lock:
+            return self.dedup.match(row, threshold, limit)
+
+    def find_duplicates(
+        self, threshold: float = DEFAULT_THRESHOLD
+    ) -> List[DuplicateGroup]:
+        with self._lock:
+            return self.dedup.find_duplicates(threshold)
+
+
+class ContactCache:
+    """Shared contact snapshot with a TTL, write-through patching and refresh
+
+    Expired snapshots keep serving reads while a background thread reloads
+    them. A reload diffs the fetched rows against the snapshot and patches
+    only the changed rows into it and its indexes; writes made during the
+    reload are replayed afterwards. Loads are single-flight: concurrent
+    misses wait for one load and share its snapshot instead of each reading
+    the whole table. Tables over max_rows are never snapshotted and reads go
+    to storage.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 60.0,
+        max_rows: int = 50000,
+        background_refresh: bool = True,
+        fetcher: Optional[Callable[..., Optional[List[Dict[str, Any]]]]] = None,
+    ):
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.background_refresh = background_refresh
+        self.fetcher = fetcher or fetch_rows
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.synced_rows = 0
+        self.errors = 0
+        self._snapshot: Optional[ContactSnapshot] = None
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._refreshing = False
+        self._pending_writes: List[Tuple[str, Dict[str, Any]]] = []
+
+    def _load(self) -> Optional[ContactSnapshot]:
+        with self._lock:
+            self._refreshing = True
+            self._pending_writes = []
+            current = self._snapshot
+        try:
+            rows = self.fetcher(max_rows=self.max_rows)
+            # Build from scratch only the first time; later reloads are diffs
+            snapshot = None
+            if rows is not None and current is None:
+                snapshot = ContactSnapshot(rows)
+        except Exception:
+            with self._lock:
+                self._refreshing = False
+                self.errors += 1
+            raise
+
+        with self._lock:
+            if rows is not None and current is not None:
+                snapshot = current
+                with snapshot._lock:
+                    self.synced_rows += snapshot.sync(rows)
+                    self._replay(snapshot)
+            elif snapshot is not None:
+                self._replay(snapshot)
+            self._snapshot = snapshot
+            self._loaded_at = time.monotonic()
+            self._refreshing = False
+            self._pending_writes = []
+            self.refreshes += 1
+        return snapshot
+
+    def _replay(self, snapshot: ContactSnapshot):
+        for action, row in self._pending_writes:
+            if action == "upsert":
+                snapshot.upsert(row)
+            else:
+                snapshot.remove(row["id"])
+
+    def _load_once(self, seen: Optional[float]) -> Optional[ContactSnapshot]:
+        """Load unless another thread did since loaded_at was seen"""
+        with self._load_lock:
+            with self._lock:
+                if self._loaded_at is not None and self._loaded_at != seen:
+                    return self._snapshot
+            return self._load()
+
+    def _refresh_in_background(self):
+        def run():
+            try:
+                with self._load_lock:
+                    self._load()
+            except Exception as e:
+                logger.error("Contact cache refresh failed: %s", e, exc_info=e)
+                METRICS.increment("stage_errors", stage="contact_cache_refresh")
+
+        threading.Thread(target=run, name="contact-cache-refresh", daemon=True).start()
+
+    def snapshot(self) -> Optional[ContactSnapshot]:
+        """Current snapshot, loading or refreshing it as the TTL requires"""
+        with self._lock:
+            loaded_at = self._loaded_at
+            refreshing = self._refreshing
+            snapshot = self._snapshot
+
+        if loaded_at is None:
+            with self._lock:
+                self.misses += 1
+            return self._load_once(loaded_at)
+
+        if time.monotonic() - loaded_at <= self.ttl:
+            with self._lock:
+                self.hits += 1
+            return snapshot
+
+        if not self.background_refresh:
+            with self._lock:
+                self.misses += 1
+            return self._load_once(loaded_at)
+
+        with self._lock:
+            self.stale_hits += 1
+        if not refreshing:
+            self._refresh_in_background()
+        return snapshot
+
+    def page(self, limit: int = 50, offset: int = 0, search: str = "") -> ContactPage:
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return storage.fetch_contacts_page(
+                limit=limit, offset=offset, search=search
+            )
+        return snapshot.page(limit=limit, offset=offset, search=search)
+
+    def duplicates(
+        self, row: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD, limit: int = 5
+    ) -> List[DuplicateMatch]:
+        """Stored contacts that row probably duplicates, best first"""
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return match_in_storage(row, threshold, limit)
+        return snapshot.duplicates(row, threshold, limit)
+
+    def find_duplicates(
+        self, threshold: float = DEFAULT_THRESHOLD
+    ) -> List[DuplicateGroup]:
+        """Every group of probable duplicates among the stored contacts"""
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return find_duplicates(threshold=threshold)
+        return snapshot.find_duplicates(threshold)
+
+    def _apply(self, action: str, rows: Iterable[Dict[str, Any]]):
+        with self._lock:
+            snapshot = self._snapshot
+            for row in rows:
+                if self._refreshing:
+                    self._pending_writes.append((action, row))
+                if snapshot is None:
+                    continue
+                if action == "upsert":
+                    snapshot.upsert(row)
+                else:
+                    snapshot.remove(row["id"])
+
+    def apply_upserts(self, rows: Iterable[Dict[str, Any]]):
+        """Patch inserted or updated rows into the cached snapshot"""
+        self._apply("upsert", rows)
+
+    def apply_deletes(self, rows: Iterable[Dict[str, Any]]):
+        """Drop deleted rows from the cached snapshot"""
+        self._apply("delete", rows)
+
+    def invalidate(self):
+        """Force the next read to reload from storage"""
+        with self._lock:
+            self._loaded_at = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            age = None
+            if self._loaded_at is not None:
+                age = round(time.monotonic() - self._loaded_at, 1)
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "refreshes": self.refreshes,
+                "synced_rows": self.synced_rows,
+                "errors": self.errors,
+                "age_seconds": age,
+                "stale": age is not None and age > self.ttl,
+                "rows": len(self._snapshot) if self._snapshot is not None else None,
+            }
@@ -0,0 +1,345 @@
+import difflib
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from bizscan import storage
+from bizscan.extraction import PHONE_STRIP_PATTERN
+
+# Shared mailbox providers say nothing about where someone works
+FREE_EMAIL_DOMAINS = set(
+    "aol.com gmail.com gmx.com googlemail.com hotmail.com icloud.com live.com "
+    "mail.com me.com outlook.com proton.me protonmail.com yahoo.com".split()
+)
+# Legal suffixes that vary between cards of the same company
+COMPANY_SUFFIXES = set("co company corp corporation gmbh inc llc llp ltd plc".split())
+NON_WORD_PATTERN = re.compile(r"[^\w\s]")
+
+DEFAULT_THRESHOLD = 0.85
+
+
+def normalize_email(value: Any) -> str:
+    return str(value or "").strip().lower()
+
+
+def normalize_phone(value: Any) -> str:
+    """Phone digits as extract_phone keeps them, minus a leading US/CA country code"""
+    digits = PHONE_STRIP_PATTERN.sub("", str(value or "")).replace("+", "")
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits if len(digits) >= 7 else ""
+
+
+def normalize_domain(value: Any) -> str:
+    """Host of a website or email address, without scheme, port, path or www."""
+    text = str(value or "").strip().lower()
+    if "@" in text:
+        text = text.rsplit("@", 1)[1]
+    text = text.split("://", 1)[-1].split("/", 1)[0].split(":", 1)[0]
+    return text[4:] if text.startswith("www.") else text
+
+
+def _tokens(value: Any) -> List[str]:
+    text = unicodedata.normalize("NFKD", str(value or ""))
+    text = text.encode("ascii", "ignore").decode().lower()
+    return NON_WORD_PATTERN.sub(" ", text).split()
+
+
+def normalize_name(value: Any) -> str:
+    """Lowercase ASCII name tokens in sorted order, so 'Doe, Jane' == 'Jane Doe'"""
+    return " ".join(sorted(_tokens(value)))
+
+
+def normalize_organization(value: Any) -> str:
+    return " ".join(
+        token for token in _tokens(value) if token not in COMPANY_SUFFIXES
+    )
+
+
+def blocking_keys(
+    name: str, email: str, phone: str, domain: str, organization: str
+) -> Tuple[str, ...]:
+    """Keys of the blocks a contact joins; only block mates are ever compared"""
+    keys = []
+    if email:
+        keys.append(f"e:{email}")
+    if phone:
+        keys.append(f"p:{phone}")
+    company = domain or organization
+    if company:
+        # The name prefix splits big companies into comparable blocks
+        keys.append(f"c:{company}:{name[:2]}")
+    if name:
+        keys.append(f"n:{name}")
+    return tuple(keys)
+
+
+@dataclass(frozen=True)
+class _Record:
+    """Normalized matching keys of one contact"""
+
+    id: Any
+    name: str
+    email: str
+    phone: str
+    domain: str
+    organization: str
+    label: str
+    keys: Tuple[str, ...]
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "_Record":
+        email = normalize_email(row.get("business_email"))
+        domain = normalize_domain(row.get("business_url"))
+        if not domain and email:
+            domain = normalize_domain(email)
+        if domain in FREE_EMAIL_DOMAINS:
+            domain = ""
+        name = normalize_name(row.get("full_name"))
+        phone = normalize_phone(row.get("contact_number"))
+        organization = normalize_organization(row.get("organization"))
+        label = " · ".join(
+            str(part)
+            for part in (row.get("full_name"), row.get("business_email"))
+            if part
+        )
+        return cls(
+            id=row.get("id"),
+            name=name,
+            email=email,
+            phone=phone,
+            domain=domain,
+            organization=organization,
+            label=label or f"Contact #{row.get('id')}",
+            keys=blocking_keys(name, email, phone, domain, organization),
+        )
+
+
+@dataclass
+class DuplicateMatch:
+    """A pair of contacts that probably describe the same person"""
+
+    contact_id: Any
+    duplicate_id: Any
+    score: float
+    reasons: List[str] = field(default_factory=list)
+    label: str = ""
+
+
+@dataclass
+class DuplicateGroup:
+    """Contacts linked by duplicate matches, lowest id first"""
+
+    ids: List[Any]
+    labels: List[str]
+    score: float
+    matches: List[DuplicateMatch] = field(default_factory=list)
+
+
+def score_pair(
+    a: _Record, b: _Record, threshold: float = 0.0
+) -> Tuple[float, List[str]]:
+    """Duplicate likelihood of two contacts in [0, 1] and the evidence for it
+
+    An identical email or phone is strong evidence that only a clearly
+    different name outweighs (shared inboxes, switchboards); a shared
+    company needs near-identical names, and a name alone never reaches 0.85.
+    Returns 0 early when the score cannot reach threshold.
+    """
+    reasons = []
+    if a.email and a.email == b.email:
+        reasons.append("email")
+        base, weight = 0.7, 0.3
+    elif a.phone and a.phone == b.phone:
+        reasons.append("phone")
+        base, weight = 0.6, 0.4
+    elif (a.domain and a.domain == b.domain) or (
+        a.organization and a.organization == b.organization
+    ):
+        reasons.append("company")
+        base, weight = 0.0, 0.9
+    else:
+        base, weight = 0.0, 0.7
+
+    if not a.name or not b.name:
+        # Unknown name: neither evidence for nor against
+        return base + weight * 0.5, reasons
+    if a.name == b.name:
+        similarity = 1.0
+    else:
+        # Cheap upper bounds first; most candidate pairs stop here
+        shorter, longer = sorted((len(a.name), len(b.name)))
+        if base + weight * 2 * shorter / (shorter + longer) < threshold:
+            return 0.0, reasons
+        matcher = difflib.SequenceMatcher(None, a.name, b.name)
+        if base + weight * matcher.quick_ratio() < threshold:
+            return 0.0, reasons
+        similarity = matcher.ratio()
+    if similarity >= 0.9:
+        reasons.append("name")
+    return base + weight * similarity, reasons
+
+
+class DedupIndex:
+    """Blocking index over normalized contact keys for duplicate detection
+
+    Contacts are only compared with others that share a block (same email,
+    same phone, same company and name initial, or same normalized name), so
+    a lookup costs a few comparisons and a full scan stays near linear.
+    Blocks bigger than max_block carry little signal and are skipped.
+    """
+
+    def __init__(self, max_block: int = 200):
+        self.max_block = max_block
+        self._records: Dict[Any, _Record] = {}
+        self._blocks: Dict[str, Set[Any]] = defaultdict(set)
+
+    @classmethod
+    def build(
+        cls, rows: Iterable[Dict[str, Any]], max_block: int = 200
+    ) -> "DedupIndex":
+        index = cls(max_block)
+        for row in rows:
+            index.add(row)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, row: Dict[str, Any]):
+        self.remove(row["id"])
+        record = _Record.from_row(row)
+        self._records[record.id] = record
+        for key in record.keys:
+            self._blocks[key].add(record.id)
+
+    def remove(self, contact_id: Any):
+        record = self._records.pop(contact_id, None)
+        if record is None:
+            return
+        for key in record.keys:
+            block = self._blocks.get(key)
+            if block is not None:
+                block.discard(contact_id)
+                if not block:
+                    del self._blocks[key]
+
+    def match(
+        self,
+        row: Dict[str, Any],
+        threshold: float = DEFAULT_THRESHOLD,
+        limit: int = 5,
+    ) -> List[DuplicateMatch]:
+        """Indexed contacts that row probably duplicates, best first"""
+        record = _Record.from_row(row)
+        candidates: Set[Any] = set()
+        for key in record.keys:
+            block = self._blocks.get(key, ())
+            if len(block) <= self.max_block:
+                candidates.update(block)
+        candidates.discard(record.id)
+
+        matches = []
+        for candidate_id in candidates:
+            other = self._records[candidate_id]
+            score, reasons = score_pair(record, other, threshold)
+            if score >= threshold:
+                matches.append(
+                    DuplicateMatch(
+                        record.id, candidate_id, round(score, 3), reasons, other.label
+                    )
+                )
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches[:limit]
+
+    def find_duplicates(
+        self, threshold: float = DEFAULT_THRESHOLD
+    ) -> List[DuplicateGroup]:
+        """Every group of probable duplicates in the index, best scores first"""
+        parent: Dict[Any, Any] = {}
+
+        def root(contact_id: Any) -> Any:
+            while parent.get(contact_id, contact_id) != contact_id:
+                # Path halving keeps the trees flat
+                parent[contact_id] = parent.get(parent[contact_id], parent[contact_id])
+                contact_id = parent[contact_id]
+            return contact_id
+
+        usable = {
+            key
+            for key, block in self._blocks.items()
+            if 1 < len(block) <= self.max_block
+        }
+        matches = []
+        for key in usable:
+            ordered = sorted(self._blocks[key])
+            for i, a_id in enumerate(ordered):
+                a = self._records[a_id]
+                for b_id in ordered[i + 1 :]:
+                    b = self._records[b_id]
+                    # Score each pair once: in the first usable block it shares
+                    shared = next(k for k in a.keys if k in b.keys and k in usable)
+                    if shared != key:
+                        continue
+                    score, reasons = score_pair(a, b, threshold)
+                    if score < threshold:
+                        continue
+                    matches.append(
+                        DuplicateMatch(a_id, b_id, round(score, 3), reasons, b.label)
+                    )
+                    parent[root(b_id)] = root(a_id)
+
+        groups: Dict[Any, List[DuplicateMatch]] = defaultdict(list)
+        for match in matches:
+            groups[root(match.contact_id)].append(match)
+        result = []
+        for group_matches in groups.values():
+            ids = sorted(
+                {m.contact_id for m in group_matches}
+                | {m.duplicate_id for m in group_matches}
+            )
+            result.append(
+                DuplicateGroup(
+                    ids=ids,
+                    labels=[self._records[contact_id].label for contact_id in ids],
+                    score=max(m.score for m in group_matches),
+                    matches=group_matches,
+                )
+            )
+        result.sort(key=lambda group: (-group.score, group.ids[0]))
+        return result
+
+
+def find_duplicates(
+    rows: Optional[Iterable[Dict[str, Any]]] = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    max_block: int = 200,
+) -> List[DuplicateGroup]:
+    """Batch duplicate scan over rows, by default every stored contact"""
+    if rows is None:
+        rows = storage.iter_contacts()
+    return DedupIndex.build(rows, max_block).find_duplicates(threshold)
+
+
+def match_in_storage(
+    row: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD, limit: int = 5
+) -> List[DuplicateMatch]:
+    """Duplicates of row among stored contacts, using database search
+
+    For tables too large to hold in memory: candidates are fetched by
+    email, phone and name, then scored exactly like DedupIndex.match.
+    """
+    terms = [
+        row.get("business_email"),
+        normalize_phone(row.get("contact_number")),
+        row.get("full_name"),
+    ]
+    candidates: Dict[Any, Dict[str, Any]] = {}
+    for term in terms:
+        if term:
+            page = storage.fetch_contacts_page(limit=50, search=str(term))
+            candidates.update((candidate["id"], candidate) for candidate in page.rows)
+    index = DedupIndex.build(candidates.values())
+    return index.match(row, threshold, limit)
@@ -0,0 +1,208 @@
+import csv
+import io
+import json
+import os
+import time
+import zlib
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from bizscan import storage
+from bizscan.extraction import CONTACT_FIELDS
+
+EXPORT_COLUMNS = ["id"] + CONTACT_FIELDS + ["created_at", "last_modified"]
+EXPORT_FORMATS = ("csv", "jsonl", "vcard3", "vcard4")
+EXTENSIONS = {"csv": ".csv", "jsonl": ".jsonl", "vcard3": ".vcf", "vcard4": ".vcf"}
+ADDRESS_FIELDS = ("street_address", "location_city", "location_state", "postal_code")
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+    "vcard3": "text/vcard",
+    "vcard4": "text/vcard",
+}
+
+
+def iter_csv(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """CSV text, one chunk per row after the header"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def iter_jsonl(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        record = {name: row.get(name) for name in EXPORT_COLUMNS}
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def _escape(value: Any) -> str:
+    """vCard text value with backslash, comma, semicolon and newline escaped"""
+    text = str(value or "")
+    for char, escaped in (("\\", "\\\\"), (",", "\\,"), (";", "\\;")):
+        text = text.replace(char, escaped)
+    return text.replace("\r\n", "\\n").replace("\n", "\\n")
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets as RFC 6350 requires"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    start = 0
+    limit = 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split inside a multi-byte character
+        while end < len(encoded) and encoded[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode("utf-8"))
+        start = end
+        # Continuation lines start with a space, which counts towards the 75
+        limit = 74
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def vcard(row: Dict[str, Any], version: str = "3.0") -> str:
+    """One contact as a vCard 3.0 or 4.0 entry"""
+    name = str(row.get("full_name") or "").strip()
+    given, _, family = name.rpartition(" ") if " " in name else ("", "", name)
+    lines = [
+        "BEGIN:VCARD",
+        f"VERSION:{version}",
+        f"FN:{_escape(name)}",
+        f"N:{_escape(family)};{_escape(given)};;;",
+    ]
+    if row.get("organization"):
+        lines.append(f"ORG:{_escape(row['organization'])}")
+    if row.get("job_title"):
+        lines.append(f"TITLE:{_escape(row['job_title'])}")
+    if row.get("contact_number"):
+        number = str(row["contact_number"])
+        if version == "4.0":
+            lines.append(f'TEL;VALUE=uri;TYPE="work,voice":tel:{number}')
+        else:
+            lines.append(f"TEL;TYPE=WORK,VOICE:{_escape(number)}")
+    if row.get("business_email"):
+        kind = "work" if version == "4.0" else "INTERNET,WORK"
+        lines.append(f"EMAIL;TYPE={kind}:{_escape(row['business_email'])}")
+    if row.get("business_url"):
+        url = str(row["business_url"])
+        if "://" not in url:
+            url = f"https://{url}"
+        lines.append(f"URL:{url}")
+    address = [row.get(name) for name in ADDRESS_FIELDS]
+    if any(address):
+        kind = "work" if version == "4.0" else "WORK"
+        parts = ";".join(_escape(part) for part in address)
+        lines.append(f"ADR;TYPE={kind}:;;{parts};")
+    if row.get("id") is not None:
+        lines.append(f"UID:bizscan-contact-{row['id']}")
+    lines.append("END:VCARD")
+    return "".join(_fold(line) for line in lines)
+
+
+def iter_vcard(rows: Iterable[Dict[str, Any]], version: str = "3.0") -> Iterator[str]:
+    for row in rows:
+        yield vcard(row, version)
+
+
+WRITERS: Dict[str, Callable[[Iterable[Dict[str, Any]]], Iterator[str]]] = {
+    "csv": iter_csv,
+    "jsonl": iter_jsonl,
+    "vcard3": lambda rows: iter_vcard(rows, "3.0"),
+    "vcard4": lambda rows: iter_vcard(rows, "4.0"),
+}
+
+
+def export_filename(export_format: str, compress: bool = False) -> str:
+    return f"contacts{EXTENSIONS[export_format]}" + (".gz" if compress else "")
+
+
+def iter_export(
+    export_format: str,
+    compress: bool = False,
+    rows: Optional[Iterable[Dict[str, Any]]] = None,
+    page_size: int = 1000,
+    chunk_size: int = 64 * 1024,
+) -> Iterator[bytes]:
+    """Encoded export of every contact as a stream of byte chunks
+
+    Rows are read with storage.iter_contacts unless given, so memory use is
+    one page of rows plus one output chunk however large the table is.
+    """
+    if export_format not in WRITERS:
+        raise ValueError(f"Export format must be one of {', '.join(EXPORT_FORMATS)}")
+    if rows is None:
+        rows = storage.iter_contacts(page_size)
+    # wbits=31 produces a gzip container rather than a raw zlib stream
+    compressor = zlib.compressobj(wbits=31) if compress else None
+
+    pending = []
+    size = 0
+    for text in WRITERS[export_format](rows):
+        pending.append(text.encode("utf-8"))
+        size += len(pending[-1])
+        if size >= chunk_size:
+            data = b"".join(pending)
+            pending, size = [], 0
+            data = compressor.compress(data) if compressor else data
+            if data:
+                yield data
+    data = b"".join(pending)
+    if compressor:
+        data = compressor.compress(data) + compressor.flush()
+    if data:
+        yield data
+
+
+def export_contacts(
+    stream,
+    export_format: str,
+    compress: bool = False,
+    rows: Optional[Iterable[Dict[str, Any]]] = None,
+    page_size: int = 1000,
+) -> int:
+    """Write the export to a binary stream and return the number of contacts"""
+    count = 0
+
+    def counted(source: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        nonlocal count
+        for row in source:
+            count += 1
+            yield row
+
+    if rows is None:
+        rows = storage.iter_contacts(page_size)
+    for chunk in iter_export(export_format, compress, rows=counted(rows)):
+        stream.write(chunk)
+    return count
+
+
+def sweep_export_files(directory: str, max_age: float) -> int:
+    """Delete exports in directory older than max_age seconds; returns the count
+
+    Exports that were prepared but never downloaded, e.g. by an abandoned
+    session, would otherwise stay on disk.
+    """
+    removed = 0
+    cutoff = time.time() - max_age
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            # Already served and removed by its session
+            continue
+    return removed
@@ -0,0 +1,331 @@
+import re
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence
+
+from bizscan.metrics import timed
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+CONTACT_FIELDS = [
+    "full_name",
+    "organization",
+    "job_title",
+    "contact_number",
+    "business_email",
+    "business_url",
+    "street_address",
+    "location_city",
+    "location_state",
+    "postal_code",
+]
+
+EMAIL_PATTERN = re.compile(r"[\w\.-]+@[\w\.-]+\.\w+")
+PHONE_PATTERN = re.compile(r"(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}")
+PHONE_STRIP_PATTERN = re.compile(r"[^\d+]")
+WEBSITE_PATTERN = re.compile(
+    r"(?:www\.)?[a-zA-Z0-9][a-zA-Z0-9-]+\.[a-zA-Z]{2,}(?:\.[a-zA-Z]{2,})?"
+)
+ADDRESS_PATTERN = re.compile(
+    r"\d+\s+[A-Za-z\s,]+"
+    r"(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr)\b"
+)
+CITY_STATE_ZIP_PATTERN = re.compile(
+    r"(?P<city>[A-Za-z][A-Za-z .'-]*?),?\s+(?P<state>[A-Z]{2})\.?\s+"
+    r"(?P<postal>\d{5}(?:-\d{4})?)\b"
+)
+DIGIT_PATTERN = re.compile(r"\d")
+
+TITLE_KEYWORDS = set(
+    "analyst architect assistant associate ceo cfo chief consultant coordinator cto "
+    "designer developer director engineer executive founder head lead manager "
+    "officer owner partner president principal representative sales scientist "
+    "specialist vp".split()
+)
+ORGANIZATION_KEYWORDS = set(
+    "agency associates bank co company consulting corp corporation group inc "
+    "industries institute labs llc llp ltd partners solutions studio systems "
+    "technologies university".split()
+)
+
+# How much each rule is trusted on its own, before OCR confidence is applied
+RULE_CONFIDENCE = {
+    "business_email": 0.95,
+    "contact_number": 0.9,
+    "business_url": 0.8,
+    "street_address": 0.7,
+    "location_city": 0.7,
+    "location_state": 0.8,
+    "postal_code": 0.85,
+    "full_name": 0.5,
+    "job_title": 0.4,
+}
+
+
+def extract_email(text: str) -> Optional[str]:
+    """Extract email address from text"""
+    if "@" not in text:
+        return None
+    email_match = EMAIL_PATTERN.search(text)
+    return email_match.group(0).strip() if email_match else None
+
+
+def extract_phone(text: str) -> Optional[str]:
+    """Extract phone number from text"""
+    phone_match = PHONE_PATTERN.search(text)
+    if phone_match:
+        return PHONE_STRIP_PATTERN.sub("", phone_match.group(0))
+    return None
+
+
+def extract_website(text: str) -> Optional[str]:
+    """Extract website from text"""
+    if "@" in text or "." not in text:  # Skip email addresses
+        return None
+    website_match = WEBSITE_PATTERN.search(text.lower())
+    if website_match:
+        website = website_match.group(0)
+        return f"www.{website}" if not website.startswith("www.") else website
+    return None
+
+
+def extract_address(text: str) -> Optional[str]:
+    """Extract street address from text"""
+    address_match = ADDRESS_PATTERN.search(text)
+    return address_match.group(0) if address_match else None
+
+
+def extract_city_state_zip(text: str) -> Optional[Dict[str, str]]:
+    """Extract city, two-letter state and ZIP code from a 'City, ST 12345' line"""
+    location_match = CITY_STATE_ZIP_PATTERN.search(text)
+    if location_match:
+        return {
+            "location_city": location_match.group("city").strip(" ,"),
+            "location_state": location_match.group("state"),
+            "postal_code": location_match.group("postal"),
+        }
+    return None
+
+
+@dataclass
+class FieldMatch:
+    """A field value together with where it came from and how sure we are"""
+
+    value: str
+    line: int
+    confidence: float
+
+
+@dataclass
+class CardExtraction:
+    """Structured result of extracting contact fields from OCR lines"""
+
+    fields: Dict[str, FieldMatch] = field(default_factory=dict)
+
+    def set(self, name: str, value: str, line: int, ocr_confidence: float = 1.0):
+        self.fields[name] = FieldMatch(
+            value, line, round(RULE_CONFIDENCE.get(name, 0.5) * ocr_confidence, 3)
+        )
+
+    def to_dict(self) -> Dict[str, str]:
+        info = {name: "" for name in CONTACT_FIELDS}
+        info.update({name: match.value for name, match in self.fields.items()})
+        return info
+
+    def to_frame(self) -> "pd.DataFrame":
+        # pandas is only needed here; keep it off the import path of OCR workers
+        import pandas as pd
+
+        return pd.DataFrame([self.to_dict()])
+
+
+@timed("extract", method="lines")
+def extract_fields(
+    lines: Sequence[str], confidences: Optional[Sequence[float]] = None
+) -> CardExtraction:
+    """Extract contact fields from OCR lines in a single pass
+
+    The first email wins; for phone, website, address and city/state/ZIP the
+    last matching line wins. Name and title come from the first two lines.
+    """
+    result = CardExtraction()
+    email = None
+
+    for idx, text in enumerate(lines):
+        text = text.strip()
+        if not text:
+            continue
+        ocr_confidence = confidences[idx] if confidences is not None else 1.0
+
+        if email is None:
+            email = extract_email(text)
+            if email:
+                result.set("business_email", email, idx, ocr_confidence)
+
+        # Skip if this line was already identified as email
+        if text == email:
+            continue
+
+        has_digit = DIGIT_PATTERN.search(text) is not None
+        if has_digit:
+            phone = extract_phone(text)
+            if phone:
+                result.set("contact_number", phone, idx, ocr_confidence)
+                continue
+
+        website = extract_website(text)
+        if website:
+            result.set("business_url", website, idx, ocr_confidence)
+            continue
+
+        if has_digit:
+            address = extract_address(text)
+            location = extract_city_state_zip(
+                text.split(address, 1)[-1] if address else text
+            )
+            if location:
+                for name, value in location.items():
+                    result.set(name, value, idx, ocr_confidence)
+            if address:
+                result.set("street_address", address, idx, ocr_confidence)
+            if address or location:
+                continue
+
+        # Handle name and title
+        if idx == 0 and not has_digit:
+            result.set("full_name", text, idx, ocr_confidence)
+        elif idx == 1 and not any(
+            domain in text.lower() for domain in [".com", ".org", ".net"]
+        ):
+            result.set("job_title", text, idx, ocr_confidence)
+
+    return result
+
+
+def extract_card_info(ocr_result: list) -> "pd.DataFrame":
+    """Extract information from OCR result"""
+    return extract_fields(ocr_result).to_frame()
+
+
+@dataclass
+class _TextLine:
+    index: int
+    text: str
+    confidence: float
+    top: float
+    bottom: float
+
+    @property
+    def height(self) -> float:
+        return self.bottom - self.top
+
+
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z]+", text.lower())
+
+
+def _name_shape(text: str) -> float:
+    """How much a line looks like a person's name"""
+    words = text.split()
+    if not all(re.fullmatch(r"[A-Za-z][A-Za-z.'-]*", word) for word in words):
+        return 0.0
+    if 2 <= len(words) <= 4 and all(word[0].isupper() for word in words):
+        return 1.0
+    return 0.3 if len(words) == 1 else 0.0
+
+
+@timed("extract", method="layout")
+def extract_layout_fields(detections: list) -> CardExtraction:
+    """Extract contact fields from readtext (coords, text, prob) triples
+
+    Pattern fields are found as in extract_fields. Name, title and
+    organization are then ranked using box height (font size), vertical
+    position relative to the name, keywords and OCR confidence, rather than
+    assuming the first two lines.
+    """
+    lines = [
+        _TextLine(
+            idx,
+            text.strip(),
+            float(prob),
+            min(y for _, y in coords),
+            max(y for _, y in coords),
+        )
+        for idx, (coords, text, prob) in enumerate(detections)
+    ]
+    result = extract_fields(
+        [line.text for line in lines], [line.confidence for line in lines]
+    )
+    for name in ("full_name", "job_title", "organization"):
+        result.fields.pop(name, None)
+
+    used = {match.line for match in result.fields.values()}
+    candidates = [
+        line
+        for line in lines
+        if line.text
+        and line.index not in used
+        and not DIGIT_PATTERN.search(line.text)
+        and "@" not in line.text
+    ]
+    if not candidates:
+        return result
+
+    max_height = max(line.height for line in candidates) or 1.0
+
+    def keyword_hits(line: _TextLine, keywords: set) -> float:
+        return 1.0 if keywords.intersection(_words(line.text)) else 0.0
+
+    def name_score(line: _TextLine) -> float:
+        return (
+            0.5 * line.height / max_height
+            + 0.3 * _name_shape(line.text)
+            + 0.2 * line.confidence
+            - 0.5 * keyword_hits(line, TITLE_KEYWORDS)
+            - 0.5 * keyword_hits(line, ORGANIZATION_KEYWORDS)
+        )
+
+    name = max(candidates, key=name_score)
+    if name_score(name) >= 0.4:
+        result.fields["full_name"] = FieldMatch(
+            name.text, name.index, round(min(name_score(name), 1.0), 3)
+        )
+        candidates.remove(name)
+    else:
+        name = None
+
+    def title_score(line: _TextLine) -> float:
+        proximity = 0.0
+        if name is not None and line.top >= name.top:
+            gap = max(line.top - name.bottom, 0.0)
+            proximity = 1.0 / (1.0 + gap / max(name.height, 1.0))
+        return (
+            0.5 * keyword_hits(line, TITLE_KEYWORDS)
+            + 0.3 * proximity
+            + 0.2 * line.confidence
+            - 0.4 * keyword_hits(line, ORGANIZATION_KEYWORDS)
+        )
+
+    def organization_score(line: _TextLine) -> float:
+        return (
+            0.4 * keyword_hits(line, ORGANIZATION_KEYWORDS)
+            + 0.3 * line.height / max_height
+            + 0.1 * (1.0 if line.text.isupper() else 0.0)
+            + 0.2 * line.confidence
+            - 0.4 * keyword_hits(line, TITLE_KEYWORDS)
+        )
+
+    for field_name, score, threshold in (
+        ("job_title", title_score, 0.45),
+        ("organization", organization_score, 0.45),
+    ):
+        if not candidates:
+            break
+        best = max(candidates, key=score)
+        if score(best) >= threshold:
+            result.fields[field_name] = FieldMatch(
+                best.text, best.index, round(min(score(best), 1.0), 3)
+            )
+            candidates.remove(best)
+
+    return result
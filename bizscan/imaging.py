@@ -0,0 +1,94 @@
+import hashlib
+import os
+from typing import Optional
+
+import numpy as np
+
+from bizscan.metrics import timed
+
+PREVIEW_COLOR = (0, 255, 0)
+
+
+@timed("decode")
+def decode_image(data) -> Optional[np.ndarray]:
+    """Decode an uploaded image buffer into a BGR array without touching disk"""
+    # OpenCV is imported on first use, keeping it off the app's startup path
+    import cv2
+
+    buffer = np.frombuffer(data, dtype=np.uint8)
+    if buffer.size == 0:
+        return None
+    return cv2.imdecode(buffer, cv2.IMREAD_COLOR)
+
+
+def save_card_image(data, filename: str, upload_dir: str = "scanned_cards") -> str:
+    """Persist an uploaded card image under a content-addressed name"""
+    os.makedirs(upload_dir, exist_ok=True)
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    file_path = os.path.join(upload_dir, f"{digest}_{os.path.basename(filename)}")
+    if not os.path.exists(file_path):
+        with open(file_path, "wb") as f:
+            f.write(data)
+    return file_path
+
+
+@timed("preview")
+def render_preview(
+    image: np.ndarray,
+    detections: list,
+    max_side: int = 1280,
+    image_format: str = ".jpg",
+    quality: int = 85,
+    numbered: bool = False,
+) -> bytes:
+    """Draw detected boxes and confidences on a downscaled copy and encode it
+
+    With numbered each box is labelled with its 1-based position instead.
+    Labels are never the detected text: OpenCV's fonts only cover ASCII.
+    The input image is left untouched.
+    """
+    import cv2
+
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    scale = min(1.0, max_side / max(image.shape[:2]))
+    if scale < 1.0:
+        preview = cv2.resize(
+            image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+    else:
+        preview = image.copy()
+
+    for number, (coords, _, prob) in enumerate(detections, 1):
+        points = (np.asarray(coords, dtype=np.float32) * scale).astype(np.int32)
+        cv2.polylines(preview, [points], True, PREVIEW_COLOR, 2)
+
+        label = str(number) if numbered else f"{prob:.0%}"
+        (width, height), baseline = cv2.getTextSize(label, font, 0.45, 1)
+        x = int(points[:, 0].min())
+        y = max(int(points[:, 1].min()), height + baseline + 2)
+        cv2.rectangle(
+            preview,
+            (x, y - height - baseline - 2),
+            (x + width + 2, y),
+            PREVIEW_COLOR,
+            -1,
+        )
+        cv2.putText(
+            preview,
+            label,
+            (x + 1, y - baseline),
+            font,
+            0.45,
+            (0, 0, 0),
+            1,
+            cv2.LINE_AA,
+        )
+
+    if image_format == ".webp":
+        params = [cv2.IMWRITE_WEBP_QUALITY, quality]
+    else:
+        params = [cv2.IMWRITE_JPEG_QUALITY, quality]
+    ok, encoded = cv2.imencode(image_format, preview, params)
+    if not ok:
+        raise ValueError(f"Could not encode preview as {image_format}")
+    return encoded.tobytes()
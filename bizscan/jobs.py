@@ -0,0 +1,223 @@
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+from bizscan.metrics import METRICS
+from bizscan.ocr import OCRCache, OCRResult, ReaderLoading
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+
+class QueueFull(Exception):
+    """Raised when the OCR job queue is at its configured depth"""
+
+
+@dataclass
+class OCRJob:
+    """An image waiting for, undergoing or finished with OCR"""
+
+    id: str
+    owner: str
+    status: str = QUEUED
+    submitted_at: float = field(default_factory=time.monotonic)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[OCRResult] = None
+    error: Optional[str] = None
+    languages: Optional[List[str]] = None
+    image: Optional[np.ndarray] = field(default=None, repr=False)
+    # The reader a parked job waits for; it stays queued until that is ready
+    waiting_on: Any = field(default=None, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+
+class OCRJobQueue:
+    """Bounded OCR job queue served by a fixed pool of worker threads
+
+    Jobs are keyed by the OCR cache key, so resubmitting an image that is
+    queued, running or cached returns the existing job instead of queueing
+    more work. Owners (e.g. browser sessions) are served round-robin so one
+    large upload burst cannot starve everyone else. A job whose reader is
+    still loading is parked in its queue and the worker moves on to jobs
+    that can run. submit() raises QueueFull once max_queue jobs are waiting.
+    """
+
+    def __init__(
+        self,
+        cache: OCRCache,
+        workers: int = 1,
+        max_queue: int = 16,
+        max_finished: int = 256,
+    ):
+        self.cache = cache
+        self.max_queue = max_queue
+        self.max_finished = max_finished
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self._jobs: "OrderedDict[str, OCRJob]" = OrderedDict()
+        self._queues: "OrderedDict[str, Deque[OCRJob]]" = OrderedDict()
+        self._depth = 0
+        self._condition = threading.Condition()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"ocr-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(
+        self,
+        image: np.ndarray,
+        owner: str = "",
+        cache_key: Optional[str] = None,
+        languages: Optional[List[str]] = None,
+    ) -> OCRJob:
+        """Queue image for OCR, or return the job already tracking it
+
+        languages picks the reader's language set; None lets the reader pick.
+        """
+        job_id = cache_key or self.cache.key(image, languages)
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is not None and job.status != FAILED and not self._stale(job):
+                return job
+
+        cached = self.cache.get(job_id)
+        with self._condition:
+            if cached is not None:
+                now = time.monotonic()
+                job = OCRJob(job_id, owner, DONE, now, now, now, result=cached)
+                self._track(job)
+                return job
+
+            if self._depth >= self.max_queue:
+                self.rejected += 1
+                raise QueueFull(
+                    f"OCR queue is full ({self.max_queue} jobs waiting), try again"
+                )
+            job = OCRJob(job_id, owner, languages=languages, image=image)
+            self._track(job)
+            self._queues.setdefault(owner, deque()).append(job)
+            self._depth += 1
+            self._condition.notify()
+            return job
+
+    def get(self, job_id: str) -> Optional[OCRJob]:
+        with self._condition:
+            return self._jobs.get(job_id)
+
+    def position(self, job_id: str) -> int:
+        """Jobs that will be started before job_id (0 when it is next or running)"""
+        with self._condition:
+            job = self._jobs.get(job_id)
+            if job is None or job.status != QUEUED:
+                return 0
+            # Round-robin order: each owner gets one job per turn, in rotation
+            owners = list(self._queues)
+            mine = owners.index(job.owner)
+            turn = self._queues[job.owner].index(job)
+            ahead = turn
+            for i, owner in enumerate(owners):
+                if owner != job.owner:
+                    ahead += min(len(self._queues[owner]), turn + (i < mine))
+            return ahead
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "queued": self._depth,
+                "running": sum(job.status == RUNNING for job in self._jobs.values()),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+                "owners_waiting": len(self._queues),
+            }
+
+    @staticmethod
+    def _runnable(job: OCRJob) -> bool:
+        return job.waiting_on is None or job.waiting_on.ready
+
+    def _stale(self, job: OCRJob) -> bool:
+        """Whether a provisional result can be improved now its readers loaded"""
+        return (
+            job.result is not None
+            and job.result.provisional
+            and not getattr(self.cache.reader, "loading", False)
+        )
+
+    def _track(self, job: OCRJob):
+        self._jobs[job.id] = job
+        self._jobs.move_to_end(job.id)
+        # Forget the oldest finished jobs; their results stay in the OCR cache
+        finished = [j.id for j in self._jobs.values() if j.finished]
+        for job_id in finished[: max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job_id]
+
+    def _next_job(self) -> OCRJob:
+        with self._condition:
+            while True:
+                job = None
+                for owner, queue in self._queues.items():
+                    job = next((j for j in queue if self._runnable(j)), None)
+                    if job is not None:
+                        break
+                if job is not None:
+                    break
+                # Parked jobs are rechecked as their readers finish loading
+                self._condition.wait(0.25 if self._depth else None)
+            queue.remove(job)
+            job.waiting_on = None
+            # Move this owner to the back of the rotation
+            del self._queues[owner]
+            if queue:
+                self._queues[owner] = queue
+            self._depth -= 1
+            job.status = RUNNING
+            job.started_at = time.monotonic()
+            return job
+
+    def _park(self, job: OCRJob, reader: Any):
+        """Put job back at the head of its owner's queue until reader is ready"""
+        with self._condition:
+            job.status = QUEUED
+            job.started_at = None
+            job.waiting_on = reader
+            self._queues.setdefault(job.owner, deque()).appendleft(job)
+            self._depth += 1
+
+    def _work(self):
+        while True:
+            job = self._next_job()
+            METRICS.observe("ocr_queue_wait", job.started_at - job.submitted_at)
+            try:
+                result = self.cache.readtext(
+                    job.image, cache_key=job.id, languages=job.languages
+                )
+                error = None
+            except ReaderLoading as e:
+                self._park(job, e.reader)
+                continue
+            except Exception as e:
+                result = None
+                error = str(e)
+            with self._condition:
+                job.result = result
+                job.error = error
+                job.status = FAILED if error else DONE
+                job.finished_at = time.monotonic()
+                job.image = None
+                if error:
+                    self.failed += 1
+                else:
+                    self.completed += 1
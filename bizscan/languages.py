@@ -0,0 +1,89 @@
+import os
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Set
+
+# EasyOCR language sets, one per script; CJK, Cyrillic and Devanagari models
+# only combine with English, so each set is its script plus "en"
+LANGUAGE_SETS: Dict[str, List[str]] = {
+    "en": ["en"],
+    "ja": ["ja", "en"],
+    "ch_sim": ["ch_sim", "en"],
+    "ch_tra": ["ch_tra", "en"],
+    "ko": ["ko", "en"],
+    "ru": ["ru", "en"],
+    "hi": ["hi", "en"],
+}
+LANGUAGE_LABELS = {
+    "en": "English",
+    "ja": "Japanese",
+    "ch_sim": "Chinese (simplified)",
+    "ch_tra": "Chinese (traditional)",
+    "ko": "Korean",
+    "ru": "Russian (Cyrillic)",
+    "hi": "Hindi (Devanagari)",
+}
+# Scripts a language set reads that English cannot
+SET_SCRIPTS: Dict[str, Set[str]] = {
+    "en": {"latin"},
+    "ja": {"han", "kana"},
+    "ch_sim": {"han"},
+    "ch_tra": {"han"},
+    "ko": {"hangul"},
+    "ru": {"cyrillic"},
+    "hi": {"devanagari"},
+}
+# Unicode character name prefixes of each script
+SCRIPT_PREFIXES = (
+    ("CJK", "han"),
+    ("HIRAGANA", "kana"),
+    ("KATAKANA", "kana"),
+    ("HANGUL", "hangul"),
+    ("CYRILLIC", "cyrillic"),
+    ("DEVANAGARI", "devanagari"),
+    ("LATIN", "latin"),
+)
+
+
+def char_script(char: str) -> Optional[str]:
+    """Script of a letter, or None for digits, punctuation and unknown scripts"""
+    name = unicodedata.name(char, "")
+    for prefix, script in SCRIPT_PREFIXES:
+        if name.startswith(prefix):
+            return script
+    return None
+
+
+def script_score(detections: list, scripts: Optional[Set[str]] = None) -> float:
+    """Confidence-weighted share of letters in scripts, over all letters
+
+    With scripts None every letter counts, which gives the mean confidence
+    per letter. Digits and punctuation read the same in every script and
+    are ignored.
+    """
+    total = matched = 0.0
+    for _, text, confidence in detections:
+        for char in text:
+            script = char_script(char)
+            if script is None:
+                continue
+            total += 1
+            if scripts is None or script in scripts:
+                matched += confidence
+    return matched / total if total else 0.0
+
+
+def parse_language_sets(names: Sequence[str]) -> List[str]:
+    """Validated language set names, e.g. from OCR_AUTO_LANGUAGES"""
+    names = [name.strip() for name in names if name.strip()]
+    unknown = [name for name in names if name not in LANGUAGE_SETS]
+    if unknown:
+        raise ValueError(
+            f"Unknown language sets {', '.join(unknown)}; "
+            f"use {', '.join(LANGUAGE_SETS)}"
+        )
+    return names
+
+
+def auto_language_sets() -> List[str]:
+    """Candidate sets for script detection from OCR_AUTO_LANGUAGES (default none)"""
+    return parse_language_sets(os.getenv("OCR_AUTO_LANGUAGES", "").split(","))
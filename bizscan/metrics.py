@@ -0,0 +1,266 @@
+import bisect
+import logging
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Deque, Dict, Iterator, List, Tuple
+
+from bizscan.config import env_flag
+
+# Histogram bucket bounds in seconds, from a regex pass up to a cold OCR call
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+logger = logging.getLogger(__name__)
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: LabelKey, **extra: str) -> str:
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (
+        (name, value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for name, value in pairs
+    )
+    return "{" + ",".join(f'{name}="{value}"' for name, value in escaped) + "}"
+
+
+@dataclass
+class Timing:
+    """One recorded stage duration, kept for the debug panel"""
+
+    stage: str
+    seconds: float
+    ok: bool
+    at: float
+    labels: Dict[str, str] = field(default_factory=dict)
+
+
+class _Histogram:
+    __slots__ = ("buckets", "sum", "count")
+
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float):
+        self.sum += seconds
+        self.count += 1
+        index = bisect.bisect_left(BUCKETS, seconds)
+        if index < len(BUCKETS):
+            self.buckets[index] += 1
+
+
+class Metrics:
+    """Stage timings and counters, exported as Prometheus text
+
+    When BIZSCAN_OTEL is set and the opentelemetry API is installed, every
+    timed stage is also an OpenTelemetry span, nested like the calls are.
+    Collectors are callables polled at export time, for components such as
+    caches that already keep their own counters.
+    """
+
+    def __init__(self, namespace: str = "bizscan", recent: int = 500):
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, LabelKey], _Histogram] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = defaultdict(float)
+        self._recent: Deque[Timing] = deque(maxlen=recent)
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._tracer = None
+
+    def _span(self, stage: str, labels: Dict[str, Any]):
+        if self._tracer is None:
+            self._tracer = False
+            if env_flag("BIZSCAN_OTEL"):
+                try:
+                    from opentelemetry import trace
+
+                    self._tracer = trace.get_tracer(self.namespace)
+                except ImportError:
+                    pass
+        if not self._tracer:
+            return nullcontext()
+        attributes = {name: str(value) for name, value in labels.items()}
+        return self._tracer.start_as_current_span(
+            f"{self.namespace}.{stage}", attributes=attributes
+        )
+
+    def observe(self, stage: str, seconds: float, ok: bool = True, **labels):
+        key = (stage, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+            if not ok:
+                errors = _label_key({**labels, "stage": stage})
+                self._counters[("stage_errors", errors)] += 1
+            self._recent.append(
+                Timing(stage, seconds, ok, time.time(), dict(key[1]))
+            )
+
+    @contextmanager
+    def timer(self, stage: str, **labels) -> Iterator[None]:
+        """Time the block as stage; an exception marks the timing failed"""
+        ok = False
+        start = time.perf_counter()
+        try:
+            with self._span(stage, labels):
+                yield
+            ok = True
+        finally:
+            self.observe(stage, time.perf_counter() - start, ok, **labels)
+
+    def timed(self, stage: str, **labels) -> Callable:
+        """Decorator form of timer()"""
+
+        def decorate(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(stage, **labels):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorate
+
+    def increment(self, name: str, value: float = 1, **labels):
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += value
+
+    def register_collector(self, name: str, collect: Callable[[], Dict[str, Any]]):
+        """Export the numeric values of collect() as gauges named name_<key>"""
+        with self._lock:
+            self._collectors[name] = collect
+
+    def recent(self, limit: int = 100) -> List[Timing]:
+        """Latest timings, newest first"""
+        with self._lock:
+            return list(self._recent)[-limit:][::-1]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Latency percentiles per stage over the recent timings window"""
+        with self._lock:
+            timings = list(self._recent)
+        by_stage: Dict[Tuple[str, LabelKey], List[Timing]] = defaultdict(list)
+        for timing in timings:
+            by_stage[(timing.stage, _label_key(timing.labels))].append(timing)
+
+        rows = []
+        for (stage, labels), group in sorted(by_stage.items()):
+            ordered = sorted(timing.seconds * 1000 for timing in group)
+
+            def at(share: float) -> float:
+                return round(ordered[int(share * (len(ordered) - 1))], 2)
+
+            rows.append(
+                {
+                    "stage": stage,
+                    "labels": ",".join(f"{name}={value}" for name, value in labels),
+                    "count": len(group),
+                    "errors": sum(not timing.ok for timing in group),
+                    "p50_ms": at(0.5),
+                    "p95_ms": at(0.95),
+                    "p99_ms": at(0.99),
+                    "max_ms": round(ordered[-1], 2),
+                }
+            )
+        return rows
+
+    def collect(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            collectors = dict(self._collectors)
+        values = {}
+        for name, collect in collectors.items():
+            try:
+                values[name] = collect()
+            except Exception as e:
+                logger.error("Metrics collector %s failed: %s", name, e, exc_info=e)
+        return values
+
+    def to_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        prefix = self.namespace
+        with self._lock:
+            histograms = sorted(
+                (key, list(h.buckets), h.sum, h.count)
+                for key, h in self._histograms.items()
+            )
+            counters = sorted(self._counters.items())
+
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent in each pipeline stage",
+            f"# TYPE {prefix}_stage_seconds histogram",
+        ]
+        for (stage, labels), buckets, total, count in histograms:
+            labels = labels + (("stage", stage),)
+            cumulative = 0
+            for bound, bucket in zip(BUCKETS, buckets):
+                cumulative += bucket
+                le = _format_labels(labels, le=str(bound))
+                lines.append(f"{prefix}_stage_seconds_bucket{le} {cumulative}")
+            le = _format_labels(labels, le="+Inf")
+            lines.append(f"{prefix}_stage_seconds_bucket{le} {count}")
+            labels = _format_labels(labels)
+            lines.append(f"{prefix}_stage_seconds_sum{labels} {total}")
+            lines.append(f"{prefix}_stage_seconds_count{labels} {count}")
+
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {prefix}_{name}_total counter")
+            lines.append(f"{prefix}_{name}_total{_format_labels(labels)} {value}")
+
+        for name, values in sorted(self.collect().items()):
+            for key, value in sorted(values.items()):
+                if isinstance(value, bool):
+                    value = int(value)
+                if not isinstance(value, (int, float)):
+                    continue
+                lines.append(f"# TYPE {prefix}_{name}_{key} gauge")
+                lines.append(f"{prefix}_{name}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "0.0.0.0") -> ThreadingHTTPServer:
+        """Serve /metrics for Prometheus on a daemon thread"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.to_prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(
+            target=server.serve_forever, name="metrics-http", daemon=True
+        ).start()
+        return server
+
+
+# Process-wide registry used by the instrumented modules
+METRICS = Metrics()
+timer = METRICS.timer
+timed = METRICS.timed
+increment = METRICS.increment
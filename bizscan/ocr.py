@@ -0,0 +1,630 @@
+import hashlib
+import importlib.metadata
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from bizscan.languages import LANGUAGE_SETS, SET_SCRIPTS, script_score
+from bizscan.metrics import METRICS, timer
+from bizscan.preprocess import PreprocessConfig, preprocess
+from bizscan.recognizers import RecognizerConfig, create_recognizer
+
+
+@dataclass
+class OCRResult:
+    """Text, boxes and confidences from a single readtext pass
+
+    languages is the language set that read the card, when a ReaderPool
+    picked it. provisional marks a read whose language check skipped a
+    candidate reader that was still loading; such results are not cached.
+    """
+
+    boxes: List[list] = field(default_factory=list)
+    texts: List[str] = field(default_factory=list)
+    confidences: List[float] = field(default_factory=list)
+    languages: List[str] = field(default_factory=list)
+    provisional: bool = False
+
+    @classmethod
+    def from_readtext(cls, detections: list) -> "OCRResult":
+        """Build a result from readtext(..., detail=1) output"""
+        result = cls()
+        for coords, text, prob in detections:
+            result.boxes.append([[int(x), int(y)] for x, y in coords])
+            result.texts.append(text)
+            # Four decimals is well past what any caller thresholds on
+            result.confidences.append(round(float(prob), 4))
+        return result
+
+    @property
+    def detections(self) -> list:
+        """(coords, text, prob) triples in readtext order"""
+        return list(zip(self.boxes, self.texts, self.confidences))
+
+    def to_json(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, payload: str) -> "OCRResult":
+        return cls(**json.loads(payload))
+
+
+class OCRCache:
+    """Content-addressed readtext cache: in-memory LRU plus optional sqlite tier"""
+
+    def __init__(
+        self,
+        reader,
+        reader_config: Dict[str, Any],
+        max_entries: int = 128,
+        db_path: Optional[str] = None,
+        max_disk_bytes: int = 256 * 1024 * 1024,
+        preprocess_config: Optional[PreprocessConfig] = None,
+    ):
+        self.reader = reader
+        self.preprocess_config = preprocess_config or PreprocessConfig()
+        self.config_key = describe_reader(reader_config, self.preprocess_config)
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, OCRResult]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "create table if not exists ocr_cache ("
+                "key text primary key, payload text not null, "
+                "size integer not null, last_access real not null)"
+            )
+            self._db.commit()
+
+    def key(self, image: np.ndarray, languages: Optional[List[str]] = None) -> str:
+        """Hash of the decoded pixels, their layout and the reader config
+
+        languages is an explicitly chosen language set, if any.
+        """
+        digest = hashlib.sha256(self.config_key.encode())
+        if languages:
+            digest.update(f"languages:{','.join(languages)}".encode())
+        digest.update(f"{image.shape}:{image.dtype}".encode())
+        digest.update(np.ascontiguousarray(image).data)
+        return digest.hexdigest()
+
+    def readtext(
+        self,
+        image: np.ndarray,
+        cache_key: Optional[str] = None,
+        languages: Optional[List[str]] = None,
+    ) -> OCRResult:
+        """Return the cached OCR result for image, running the reader on a miss"""
+        cache_key = cache_key or self.key(image, languages)
+        result = self.get(cache_key)
+        if result is not None:
+            return result
+
+        result = run_ocr(self.reader, image, self.preprocess_config, languages)
+        with self._lock:
+            self.misses += 1
+            if not result.provisional:
+                self._remember(cache_key, result)
+                self._persist(cache_key, result)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "entries": len(self._memory),
+            }
+
+    def get(self, cache_key: str) -> Optional[OCRResult]:
+        """Cached result for cache_key without running OCR, or None"""
+        with self._lock:
+            if cache_key in self._memory:
+                self._memory.move_to_end(cache_key)
+                self.hits += 1
+                return self._memory[cache_key]
+
+            if self._db is None:
+                return None
+            row = self._db.execute(
+                "select payload from ocr_cache where key = ?", (cache_key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "update ocr_cache set last_access = ? where key = ?",
+                (time.time(), cache_key),
+            )
+            self._db.commit()
+            result = OCRResult.from_json(row[0])
+            self.hits += 1
+            self.disk_hits += 1
+            self._remember(cache_key, result)
+            return result
+
+    def _remember(self, cache_key: str, result: OCRResult):
+        self._memory[cache_key] = result
+        self._memory.move_to_end(cache_key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _persist(self, cache_key: str, result: OCRResult):
+        if self._db is None:
+            return
+        payload = result.to_json()
+        self._db.execute(
+            "insert or replace into ocr_cache (key, payload, size, last_access) "
+            "values (?, ?, ?, ?)",
+            (cache_key, payload, len(payload), time.time()),
+        )
+        # Evict least recently used rows until we are back under the size cap
+        total = self._db.execute(
+            "select coalesce(sum(size), 0) from ocr_cache"
+        ).fetchone()[0]
+        while total > self.max_disk_bytes:
+            row = self._db.execute(
+                "select key, size from ocr_cache order by last_access limit 1"
+            ).fetchone()
+            if row is None or row[0] == cache_key:
+                break
+            self._db.execute("delete from ocr_cache where key = ?", (row[0],))
+            total -= row[1]
+        self._db.commit()
+
+
+OCR_LANGUAGES = ["en"]
+
+
+def run_ocr(
+    reader,
+    image: np.ndarray,
+    config: Optional[PreprocessConfig] = None,
+    languages: Optional[List[str]] = None,
+) -> OCRResult:
+    """Preprocess image, run readtext and map boxes back to original pixels
+
+    languages picks the reader of a ReaderPool; other readers ignore it.
+    """
+    with timer("preprocess"):
+        prepared = preprocess(image, config or PreprocessConfig())
+    provisional = False
+    with timer("readtext"):
+        if isinstance(reader, ReaderPool):
+            languages, detections, provisional = reader.read(
+                prepared.image, languages
+            )
+        else:
+            detections = reader.readtext(prepared.image)
+    result = OCRResult.from_readtext(detections)
+    result.boxes = prepared.map_boxes(result.boxes)
+    if isinstance(reader, ReaderPool):
+        result.languages = list(languages)
+        result.provisional = provisional
+    return result
+
+
+OCR_DEVICES = ("auto", "cpu", "cuda")
+
+
+def create_reader(
+    languages: Optional[List[str]] = None,
+    gpu: bool = False,
+    config: Optional[RecognizerConfig] = None,
+):
+    """Build the configured OCR recognizer (EasyOCR unless config says otherwise)"""
+    return create_recognizer(languages or OCR_LANGUAGES, gpu=gpu, config=config)
+
+
+def use_gpu(device: str = "auto") -> bool:
+    """Resolve an OCR_DEVICE setting to EasyOCR's gpu flag
+
+    "cpu" never imports torch; "auto" asks torch whether CUDA is usable
+    instead of attempting a GPU reader and falling back on failure.
+    """
+    device = device.strip().lower()
+    if device not in OCR_DEVICES:
+        raise ValueError(f"OCR device must be one of {', '.join(OCR_DEVICES)}")
+    if device == "auto":
+        import torch
+
+        return torch.cuda.is_available()
+    return device == "cuda"
+
+
+def _package_version(name: str) -> str:
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return ""
+
+
+def reader_config(
+    languages: Optional[List[str]] = None,
+    device: str = "auto",
+    recognizer: Optional[RecognizerConfig] = None,
+    auto_languages: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """Reader settings that affect OCR output, read without importing easyocr"""
+    recognizer = recognizer or RecognizerConfig()
+    config = {
+        "languages": languages or OCR_LANGUAGES,
+        "device": device,
+        "easyocr": _package_version("easyocr"),
+        "recognizer": recognizer.to_dict(),
+    }
+    if recognizer.backend == "onnx":
+        config["onnxruntime"] = _package_version("onnxruntime")
+    if auto_languages:
+        config["auto_languages"] = list(auto_languages)
+    return config
+
+
+def describe_reader(
+    config: Dict[str, Any], preprocess_config: Optional[PreprocessConfig] = None
+) -> str:
+    """Canonical JSON of everything that shaped an OCR result
+
+    Doubles as the OCR cache namespace and as the reader version stored
+    next to each contact's raw OCR output.
+    """
+    preprocess_config = preprocess_config or PreprocessConfig()
+    return json.dumps(
+        {**config, "preprocess": preprocess_config.to_dict()}, sort_keys=True
+    )
+
+
+class BackgroundReader:
+    """EasyOCR reader loaded on a daemon thread so startup never waits for it
+
+    readtext() blocks until the model is ready and re-raises a failed load.
+    With warm_up, one tiny inference runs first so the first real scan does
+    not also pay for lazy weight and kernel initialization. on_ready is
+    called from the loading thread once the load has finished or failed.
+    """
+
+    def __init__(
+        self,
+        languages: Optional[List[str]] = None,
+        device: str = "auto",
+        warm_up: bool = True,
+        recognizer: Optional[RecognizerConfig] = None,
+        on_ready: Optional[Callable[["BackgroundReader"], None]] = None,
+    ):
+        self.languages = languages or OCR_LANGUAGES
+        self.device = device
+        self.recognizer = recognizer or RecognizerConfig()
+        self.on_ready = on_ready
+        self.gpu: Optional[bool] = None
+        self.error: Optional[Exception] = None
+        self.load_seconds: Optional[float] = None
+        self.model_bytes: Optional[int] = None
+        self._reader = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(
+            target=self._load, args=(warm_up,), name="ocr-warm-up", daemon=True
+        )
+        self._thread.start()
+
+    def _load(self, warm_up: bool):
+        started = time.perf_counter()
+        try:
+            self.gpu = use_gpu(self.device)
+            reader = create_reader(self.languages, self.gpu, self.recognizer)
+            if warm_up:
+                reader.readtext(np.full((32, 128, 3), 255, dtype=np.uint8))
+            if hasattr(reader, "model_bytes"):
+                self.model_bytes = reader.model_bytes()
+            self._reader = reader
+        except Exception as e:
+            self.error = e
+        finally:
+            self.load_seconds = time.perf_counter() - started
+            METRICS.observe("model_load", self.load_seconds, self.error is None)
+            self._ready.set()
+            if self.on_ready is not None:
+                self.on_ready(self)
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait(self, timeout: Optional[float] = None):
+        """The loaded reader, blocking up to timeout seconds for it"""
+        if not self._ready.wait(timeout):
+            raise TimeoutError("OCR model is still loading")
+        if self.error is not None:
+            raise RuntimeError(f"OCR model failed to load: {self.error}")
+        return self._reader
+
+    def readtext(self, image: np.ndarray) -> list:
+        return self.wait().readtext(image)
+
+
+def _probe_image(image: np.ndarray, boxes: List[list], max_boxes: int = 3):
+    """The largest text boxes of image stacked into one small strip"""
+    crops = []
+    for box in boxes:
+        points = np.asarray(box)
+        x0, y0 = np.maximum(points.min(axis=0).astype(int), 0)
+        x1, y1 = points.max(axis=0).astype(int)
+        crop = image[y0 : y1 + 1, x0 : x1 + 1]
+        if crop.size:
+            crops.append(crop)
+    crops.sort(key=lambda crop: crop.shape[0] * crop.shape[1], reverse=True)
+    crops = crops[:max_boxes]
+    if not crops:
+        return None
+
+    width = max(crop.shape[1] for crop in crops) + 20
+    height = sum(crop.shape[0] + 10 for crop in crops) + 10
+    strip = np.full((height, width) + image.shape[2:], 255, dtype=image.dtype)
+    y = 10
+    for crop in crops:
+        strip[y : y + crop.shape[0], 10 : 10 + crop.shape[1]] = crop
+        y += crop.shape[0] + 10
+    return strip
+
+
+class ReaderLoading(Exception):
+    """Raised by ReaderPool.read while the reader it needs is still loading"""
+
+    def __init__(self, reader: BackgroundReader):
+        super().__init__(f"OCR reader for {', '.join(reader.languages)} is loading")
+        self.reader = reader
+
+
+class ReaderPool:
+    """OCR readers per language set, loaded on demand within a memory budget
+
+    The default set loads at startup and is never evicted, so English-only
+    scans cost what a single reader did. Other sets load in the background
+    when a card first asks for them. Each finished load measures its weights;
+    once they push the pool past max_bytes, the least recently used readers
+    are dropped, never while a probe is running.
+
+    With auto_languages, a card whose default read comes back with low
+    confidence is probed: its largest text boxes are read by each loaded
+    candidate set and the set whose script reads best reads the whole card.
+    Probing never waits for a model; one missing candidate at a time starts
+    loading in the background and takes part in later probes, and a read
+    that skipped a loading candidate is provisional.
+
+    A read that needs a reader still loading raises ReaderLoading rather
+    than holding a shared worker thread for the whole load. With
+    wait_for_readers, as in batch workers that have no one else to serve,
+    reads wait for their reader instead and probing waits for every
+    candidate that fits max_bytes.
+    """
+
+    def __init__(
+        self,
+        languages: Optional[List[str]] = None,
+        device: str = "auto",
+        recognizer: Optional[RecognizerConfig] = None,
+        auto_languages: Sequence[str] = (),
+        max_bytes: int = 512 * 1024 * 1024,
+        min_confidence: float = 0.5,
+        warm_up: bool = True,
+        wait_for_readers: bool = False,
+    ):
+        self.languages = languages or OCR_LANGUAGES
+        self.device = device
+        self.recognizer = recognizer or RecognizerConfig()
+        self.auto_languages = list(auto_languages)
+        self.max_bytes = max_bytes
+        self.min_confidence = min_confidence
+        self.warm_up = warm_up
+        self.wait_for_readers = wait_for_readers
+        self.loads = 0
+        self.evictions = 0
+        self.probes = 0
+        self.switches = 0
+        self._probing = 0
+        self._readers: "OrderedDict[Tuple[str, ...], BackgroundReader]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self.get(self.languages)
+
+    def _start(self, key: Tuple[str, ...]) -> BackgroundReader:
+        reader = BackgroundReader(
+            list(key), self.device, self.warm_up, self.recognizer, self._on_ready
+        )
+        self._readers[key] = reader
+        self.loads += 1
+        return reader
+
+    def _on_ready(self, reader: BackgroundReader):
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        """Drop least recently used readers until the loaded ones fit"""
+        if self._probing:
+            # The probe evicts once it is done, so its readers are not reloaded
+            return
+        default = tuple(self.languages)
+        used = sum(reader.model_bytes or 0 for reader in self._readers.values())
+        for key in list(self._readers):
+            if used <= self.max_bytes:
+                break
+            reader = self._readers[key]
+            if key == default or not reader.ready:
+                continue
+            # Jobs already holding the reader finish with it before it is freed
+            del self._readers[key]
+            used -= reader.model_bytes or 0
+            self.evictions += 1
+
+    def get(self, languages: List[str]) -> BackgroundReader:
+        """The reader for languages, starting to load it if needed"""
+        key = tuple(languages)
+        with self._lock:
+            reader = self._readers.get(key)
+            if reader is None or reader.error is not None:
+                reader = self._start(key)
+            self._readers.move_to_end(key)
+            return reader
+
+    def loaded(self, languages: Optional[List[str]] = None) -> bool:
+        """Whether the reader for languages (default set) is ready to read"""
+        with self._lock:
+            reader = self._readers.get(tuple(languages or self.languages))
+        return reader is not None and reader.ready
+
+    @property
+    def ready(self) -> bool:
+        return self.loaded()
+
+    @property
+    def loading(self) -> bool:
+        """Whether any reader is still loading"""
+        with self._lock:
+            return any(not reader.ready for reader in self._readers.values())
+
+    def _start_if_fits(self, key: Tuple[str, ...]) -> Optional[BackgroundReader]:
+        """Start loading key unless the pool is full or busy loading
+
+        Judged by the largest reader so far, so probing never evicts a
+        candidate to make room for another.
+        """
+        sizes = [reader.model_bytes or 0 for reader in self._readers.values()]
+        if any(not reader.ready for reader in self._readers.values()):
+            return None
+        if sum(sizes) + max(sizes) > self.max_bytes:
+            return None
+        return self._start(key)
+
+    def _loaded_reader(self, languages: List[str]) -> BackgroundReader:
+        reader = self.get(languages)
+        if not reader.ready and not self.wait_for_readers:
+            raise ReaderLoading(reader)
+        return reader
+
+    def read(
+        self, image: np.ndarray, languages: Optional[List[str]] = None
+    ) -> Tuple[List[str], list, bool]:
+        """(language set used, readtext detections, provisional) for image"""
+        if languages:
+            return languages, self._loaded_reader(languages).readtext(image), False
+
+        detections = self._loaded_reader(self.languages).readtext(image)
+        if not self.auto_languages or not detections:
+            return self.languages, detections, False
+        baseline = script_score(detections)
+        if baseline >= self.min_confidence:
+            return self.languages, detections, False
+
+        best, best_score = None, baseline
+        with timer("script_probe"):
+            probe = _probe_image(image, [coords for coords, _, _ in detections])
+            candidates = [
+                name
+                for name in self.auto_languages
+                if LANGUAGE_SETS[name] != self.languages and probe is not None
+            ]
+            readers: Dict[str, BackgroundReader] = {}
+            pending: Dict[str, BackgroundReader] = {}
+            with self._lock:
+                self._probing += 1
+                for name in candidates:
+                    key = tuple(LANGUAGE_SETS[name])
+                    reader = self._readers.get(key)
+                    if reader is None or reader.error is not None:
+                        continue
+                    self._readers.move_to_end(key)
+                    if reader.ready:
+                        readers[name] = reader
+                    else:
+                        pending[name] = reader
+                missing = [
+                    name
+                    for name in candidates
+                    if name not in readers and name not in pending
+                ]
+                if missing and not self.wait_for_readers:
+                    started = self._start_if_fits(tuple(LANGUAGE_SETS[missing[0]]))
+                    if started is not None:
+                        pending[missing[0]] = started
+            try:
+                if self.wait_for_readers:
+                    readers = self._wait_for(candidates, readers, pending)
+                    pending = {}
+                for name, reader in readers.items():
+                    probed = reader.readtext(probe)
+                    score = script_score(probed, SET_SCRIPTS[name])
+                    if score > best_score:
+                        best, best_score = name, score
+                    if best_score >= 0.8:
+                        # Clear enough; skip the remaining candidates
+                        break
+            finally:
+                with self._lock:
+                    self._probing -= 1
+                    self.probes += 1
+                    if best is not None:
+                        self.switches += 1
+                    self._evict()
+        # A loading candidate might still have read this card better
+        provisional = bool(pending) and best_score < 0.8
+        if best is None:
+            return self.languages, detections, provisional
+        return LANGUAGE_SETS[best], readers[best].readtext(image), provisional
+
+    def _wait_for(
+        self,
+        candidates: List[str],
+        readers: Dict[str, BackgroundReader],
+        pending: Dict[str, BackgroundReader],
+    ) -> Dict[str, BackgroundReader]:
+        """Loaded readers of every candidate that fits, in candidate order"""
+        # Let the loads already running finish so the next ones may start
+        for reader in pending.values():
+            try:
+                reader.wait()
+            except RuntimeError:
+                pass
+        loaded = {}
+        for name in candidates:
+            reader = readers.get(name) or pending.get(name)
+            if reader is None:
+                with self._lock:
+                    reader = self._start_if_fits(tuple(LANGUAGE_SETS[name]))
+            if reader is None:
+                continue
+            try:
+                reader.wait()
+            except RuntimeError:
+                continue
+            loaded[name] = reader
+        return loaded
+
+    def readtext(self, image: np.ndarray) -> list:
+        return self.read(image)[1]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "readers": len(self._readers),
+                "model_bytes": sum(
+                    reader.model_bytes or 0 for reader in self._readers.values()
+                ),
+                "loads": self.loads,
+                "evictions": self.evictions,
+                "probes": self.probes,
+                "switches": self.switches,
+            }
@@ -0,0 +1,288 @@
+import os
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from bizscan.config import env_flag
+from bizscan.metrics import timed
+
+
+@dataclass(frozen=True)
+class PreprocessConfig:
+    """How an image is prepared before OCR
+
+    max_side caps the long edge in pixels (None keeps full resolution);
+    crop_card finds the card outline and warps it flat, which also deskews;
+    normalize_contrast applies CLAHE to the grayscale image.
+    """
+
+    max_side: Optional[int] = 1600
+    grayscale: bool = False
+    crop_card: bool = False
+    normalize_contrast: bool = False
+
+    @classmethod
+    def from_env(cls) -> "PreprocessConfig":
+        max_side = int(os.getenv("OCR_MAX_SIDE", "1600"))
+        return cls(
+            max_side=max_side or None,
+            grayscale=env_flag("OCR_GRAYSCALE"),
+            crop_card=env_flag("OCR_CROP_CARD"),
+            normalize_contrast=env_flag("OCR_NORMALIZE_CONTRAST"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class PreparedImage:
+    """Image ready for OCR plus the homography back to the original pixels"""
+
+    image: np.ndarray
+    to_original: np.ndarray = field(default_factory=lambda: np.eye(3))
+
+    def map_boxes(self, boxes: List[list]) -> List[list]:
+        """Map box coordinates from the prepared image back to the original"""
+        # OpenCV is imported on first use, keeping it off the app's startup path
+        import cv2
+
+        if not boxes or np.allclose(self.to_original, np.eye(3)):
+            return boxes
+        points = np.asarray(boxes, dtype=np.float32).reshape(-1, 1, 2)
+        mapped = cv2.perspectiveTransform(points, self.to_original)
+        return np.rint(mapped).astype(int).reshape(len(boxes), -1, 2).tolist()
+
+
+def _order_corners(corners: np.ndarray) -> np.ndarray:
+    """Corners as top-left, top-right, bottom-right, bottom-left"""
+    sums = corners.sum(axis=1)
+    diffs = np.diff(corners, axis=1).ravel()
+    return np.array(
+        [
+            corners[np.argmin(sums)],
+            corners[np.argmin(diffs)],
+            corners[np.argmax(sums)],
+            corners[np.argmax(diffs)],
+        ],
+        dtype=np.float32,
+    )
+
+
+def find_card_corners(
+    image: np.ndarray, min_area_ratio: float = 0.2
+) -> Optional[np.ndarray]:
+    """Corners of the largest four-sided contour covering enough of the image"""
+    import cv2
+
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8))
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    min_area = min_area_ratio * gray.shape[0] * gray.shape[1]
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True):
+        if cv2.contourArea(contour) < min_area:
+            break
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            return _order_corners(approx.reshape(4, 2).astype(np.float32))
+    return None
+
+
+def _card_candidates(mask: np.ndarray, min_area: float, max_area: float) -> list:
+    """(area, corners) of the card-shaped outer contours in a binary mask"""
+    import cv2
+
+    candidates = []
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    for contour in contours:
+        area = cv2.contourArea(contour)
+        if not min_area <= area <= max_area:
+            continue
+        rect = cv2.minAreaRect(contour)
+        width, height = rect[1]
+        if not width or not height:
+            continue
+        # Cards fill their rotated bounding box and are 1.4-2.0 times as wide
+        # as tall (ISO, US and Japanese sizes), plus slack for perspective
+        aspect = max(width, height) / min(width, height)
+        if area / (width * height) < 0.8 or not 1.2 <= aspect <= 2.4:
+            continue
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            corners = approx.reshape(4, 2)
+        else:
+            corners = cv2.boxPoints(rect)
+        candidates.append((area, _order_corners(corners.astype(np.float32))))
+    return candidates
+
+
+def _overlap(a: np.ndarray, b: np.ndarray) -> float:
+    """Intersection over union of the axis-aligned bounds of two quads"""
+    (ax0, ay0), (ax1, ay1) = a.min(axis=0), a.max(axis=0)
+    (bx0, by0), (bx1, by1) = b.min(axis=0), b.max(axis=0)
+    width = max(0.0, min(ax1, bx1) - max(ax0, bx0))
+    height = max(0.0, min(ay1, by1) - max(ay0, by0))
+    inter = width * height
+    union = (ax1 - ax0) * (ay1 - ay0) + (bx1 - bx0) * (by1 - by0) - inter
+    return inter / union if union else 0.0
+
+
+def _contains(outer: np.ndarray, inner: np.ndarray) -> bool:
+    import cv2
+
+    center = tuple(float(value) for value in inner.mean(axis=0))
+    return cv2.pointPolygonTest(outer.reshape(-1, 1, 2), center, False) >= 0
+
+
+def _looks_like_card(gray: np.ndarray, edges: np.ndarray, corners: np.ndarray) -> bool:
+    """Whether an outline is a card rather than a panel or blank shape on one
+
+    Cards are not darker than what surrounds them and hold text, i.e. some
+    edge density away from their own border.
+    """
+    import cv2
+
+    outline = np.zeros(gray.shape, np.uint8)
+    cv2.fillConvexPoly(outline, corners.astype(np.int32), 255)
+    side = max(3, int(0.08 * min(np.ptp(corners, axis=0))))
+    kernel = np.ones((side, side), np.uint8)
+    ring = cv2.dilate(outline, kernel) & ~outline
+    if ring.any() and cv2.mean(gray, outline)[0] < cv2.mean(gray, ring)[0] - 10:
+        return False
+    inner = cv2.erode(outline, kernel)
+    return inner.any() and cv2.mean(edges, inner)[0] >= 0.01 * 255
+
+
+@timed("segment")
+def find_cards(
+    image: np.ndarray,
+    min_area_ratio: float = 0.01,
+    max_cards: int = 24,
+    detect_side: int = 1000,
+) -> List[np.ndarray]:
+    """Corners of every card in a photo of several cards, in reading order
+
+    Outlines come from an Otsu threshold (cards lighter than the table) and
+    from Canny edges (cards touching or on a light table) on a copy scaled
+    to detect_side. Outlines darker than their surroundings or without text,
+    such as a card's dark panels or a blank card, are skipped. An outline
+    mostly covered by others is a cluster of touching cards and is dropped;
+    otherwise it is a card and the outlines inside it are dropped instead.
+    """
+    import cv2
+
+    scale = min(1.0, detect_side / max(image.shape[:2]))
+    small = image
+    if scale < 1.0:
+        small = cv2.resize(
+            image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+    gray = small if small.ndim == 2 else cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+    _, bright = cv2.threshold(blurred, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    canny = cv2.Canny(blurred, 50, 150)
+    edges = cv2.dilate(canny, np.ones((3, 3), np.uint8))
+
+    image_area = gray.shape[0] * gray.shape[1]
+    candidates = []
+    for mask in (bright, edges):
+        candidates += _card_candidates(
+            mask, min_area_ratio * image_area, 0.9 * image_area
+        )
+    candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+    # Both masks usually find the same card; keep the larger outline
+    cards: List[np.ndarray] = []
+    for _, corners in candidates:
+        if all(_overlap(corners, kept) < 0.6 for kept in cards) and _looks_like_card(
+            gray, canny, corners
+        ):
+            cards.append(corners)
+
+    areas = [cv2.contourArea(corners) for corners in cards]
+    dropped = set()
+    for i, outer in enumerate(cards):
+        inside = [
+            j for j, inner in enumerate(cards) if j != i and _contains(outer, inner)
+        ]
+        covered = sum(areas[j] for j in inside)
+        dropped.update([i] if covered > 0.5 * areas[i] else inside)
+    cards = [corners for i, corners in enumerate(cards) if i not in dropped]
+    cards = cards[:max_cards]
+
+    # Reading order: rows top to bottom, cards left to right within a row
+    if cards:
+        row_height = 0.5 * float(
+            np.median([min(np.ptp(card, axis=0)) for card in cards])
+        )
+        cards.sort(key=lambda card: card[:, 1].mean())
+        rows: List[List[np.ndarray]] = []
+        for card in cards:
+            if rows and card[:, 1].mean() - rows[-1][0][:, 1].mean() < row_height:
+                rows[-1].append(card)
+            else:
+                rows.append([card])
+        cards = [
+            card
+            for row in rows
+            for card in sorted(row, key=lambda card: card[:, 0].mean())
+        ]
+    return [card / scale for card in cards]
+
+
+def warp_card(image: np.ndarray, corners: np.ndarray):
+    """Perspective-correct the card inside corners; returns (card, transform)"""
+    import cv2
+
+    top_left, top_right, bottom_right, bottom_left = corners
+    width = int(
+        max(
+            np.linalg.norm(top_right - top_left),
+            np.linalg.norm(bottom_right - bottom_left),
+        )
+    )
+    height = int(
+        max(
+            np.linalg.norm(bottom_left - top_left),
+            np.linalg.norm(bottom_right - top_right),
+        )
+    )
+    target = np.array(
+        [[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]],
+        dtype=np.float32,
+    )
+    transform = cv2.getPerspectiveTransform(corners, target)
+    return cv2.warpPerspective(image, transform, (width, height)), transform
+
+
+def preprocess(image: np.ndarray, config: PreprocessConfig) -> PreparedImage:
+    """Apply the configured preparation steps, tracking the coordinate mapping"""
+    import cv2
+
+    forward = np.eye(3)
+    prepared = image
+
+    if config.max_side and max(image.shape[:2]) > config.max_side:
+        scale = config.max_side / max(image.shape[:2])
+        prepared = cv2.resize(
+            prepared, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA
+        )
+        forward = np.diag([scale, scale, 1.0]) @ forward
+
+    if config.crop_card:
+        corners = find_card_corners(prepared)
+        if corners is not None:
+            prepared, warp = warp_card(prepared, corners)
+            forward = warp @ forward
+
+    if config.grayscale or config.normalize_contrast:
+        if prepared.ndim == 3:
+            prepared = cv2.cvtColor(prepared, cv2.COLOR_BGR2GRAY)
+        if config.normalize_contrast:
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            prepared = clahe.apply(prepared)
+
+    return PreparedImage(prepared, np.linalg.inv(forward))
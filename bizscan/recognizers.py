@@ -0,0 +1,228 @@
+import os
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from bizscan.config import env_flag
+
+RECOGNIZER_BACKENDS = ("easyocr", "onnx")
+
+
+@dataclass(frozen=True)
+class RecognizerConfig:
+    """Which OCR engine reads the card and the readtext parameters it uses
+
+    quantize applies PyTorch dynamic int8 quantization to the EasyOCR models
+    on CPU; backend "onnx" runs the detector and recognizer written by
+    export_onnx() under ONNX Runtime instead of PyTorch.
+    """
+
+    backend: str = "easyocr"
+    quantize: bool = True
+    batch_size: int = 1
+    canvas_size: int = 2560
+    paragraph: bool = False
+    onnx_dir: str = "models/onnx"
+
+    @classmethod
+    def from_env(cls) -> "RecognizerConfig":
+        backend = os.getenv("OCR_BACKEND", "easyocr").strip().lower()
+        if backend not in RECOGNIZER_BACKENDS:
+            raise ValueError(
+                f"OCR_BACKEND must be one of {', '.join(RECOGNIZER_BACKENDS)}"
+            )
+        return cls(
+            backend=backend,
+            quantize=env_flag("OCR_QUANTIZE", True),
+            batch_size=int(os.getenv("OCR_BATCH_SIZE", "1")),
+            canvas_size=int(os.getenv("OCR_CANVAS_SIZE", "2560")),
+            paragraph=env_flag("OCR_PARAGRAPH"),
+            onnx_dir=os.getenv("OCR_ONNX_DIR", "models/onnx"),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    def readtext_kwargs(self) -> Dict[str, Any]:
+        return {
+            "batch_size": self.batch_size,
+            "canvas_size": self.canvas_size,
+            "paragraph": self.paragraph,
+        }
+
+
+def _tensor_bytes(value: Any) -> int:
+    if hasattr(value, "element_size"):
+        return value.numel() * value.element_size()
+    if isinstance(value, (list, tuple)):
+        return sum(_tensor_bytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_tensor_bytes(item) for item in value.values())
+    if type(value).__name__ == "ScriptObject" and hasattr(value, "__getstate__"):
+        # Quantized LSTM and linear weights are packed TorchScript objects
+        # whose pickled state holds their int8 tensors
+        return _tensor_bytes(value.__getstate__())
+    return 0
+
+
+class EasyOCRRecognizer:
+    """EasyOCR detector and recognizer called with the configured parameters"""
+
+    name = "easyocr"
+
+    def __init__(
+        self,
+        languages: List[str],
+        gpu: bool = False,
+        config: Optional[RecognizerConfig] = None,
+        **reader_options,
+    ):
+        import easyocr
+
+        self.config = config or RecognizerConfig()
+        self.reader = easyocr.Reader(
+            languages, gpu=gpu, quantize=self.config.quantize, **reader_options
+        )
+
+    def model_bytes(self) -> int:
+        """Approximate memory held by the detector and recognizer weights"""
+        return sum(
+            _tensor_bytes(module.state_dict())
+            for module in (
+                getattr(self.reader, "detector", None),
+                getattr(self.reader, "recognizer", None),
+            )
+            if hasattr(module, "state_dict")
+        )
+
+    def readtext(self, image: np.ndarray) -> list:
+        """(coords, text, prob) triples in reading order"""
+        detections = self.reader.readtext(image, **self.config.readtext_kwargs())
+        if self.config.paragraph:
+            # Paragraph mode merges lines and reports no confidence for them
+            return [(coords, text, 1.0) for coords, text in detections]
+        return detections
+
+
+class _ONNXModule:
+    """Stands in for an EasyOCR torch module, running an ONNX session instead"""
+
+    def __init__(self, session):
+        self.session = session
+        self.inputs = [node.name for node in session.get_inputs()]
+
+    def eval(self):
+        return self
+
+    def __call__(self, *args):
+        import torch
+
+        # Unused inputs (the recognizer's text prompt) are pruned on export
+        feed = {name: arg.cpu().numpy() for name, arg in zip(self.inputs, args)}
+        outputs = [torch.from_numpy(out) for out in self.session.run(None, feed)]
+        return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+
+def onnx_paths(onnx_dir: str, languages: List[str]) -> Dict[str, str]:
+    return {
+        "detector": os.path.join(onnx_dir, "detector.onnx"),
+        "recognizer": os.path.join(
+            onnx_dir, f"recognizer-{'-'.join(sorted(languages))}.onnx"
+        ),
+    }
+
+
+class ONNXRecognizer(EasyOCRRecognizer):
+    """EasyOCR's pipeline with both networks executed by ONNX Runtime
+
+    EasyOCR still does the image pre/post-processing and CTC decoding, so
+    results match the PyTorch models up to floating point differences.
+    """
+
+    name = "onnx"
+
+    def __init__(
+        self,
+        languages: List[str],
+        gpu: bool = False,
+        config: Optional[RecognizerConfig] = None,
+    ):
+        import onnxruntime
+
+        config = config or RecognizerConfig(backend="onnx")
+        paths = onnx_paths(config.onnx_dir, languages)
+        missing = [path for path in paths.values() if not os.path.exists(path)]
+        if missing:
+            raise FileNotFoundError(
+                f"Missing ONNX models {', '.join(missing)}; "
+                "create them with: python -m bizscan export-onnx"
+            )
+
+        # The torch side only runs pre/post-processing, so keep it on the CPU.
+        # The detector stays enabled so EasyOCR sets up its text box pipeline;
+        # both torch networks are then swapped for the ONNX sessions.
+        super().__init__(languages, gpu=False, config=replace(config, quantize=False))
+        providers = ["CPUExecutionProvider"]
+        if gpu:
+            providers.insert(0, "CUDAExecutionProvider")
+        for name, path in paths.items():
+            session = onnxruntime.InferenceSession(path, providers=providers)
+            setattr(self.reader, name, _ONNXModule(session))
+        self.paths = paths
+
+    def model_bytes(self) -> int:
+        return sum(os.path.getsize(path) for path in self.paths.values())
+
+
+RECOGNIZERS = {
+    EasyOCRRecognizer.name: EasyOCRRecognizer,
+    ONNXRecognizer.name: ONNXRecognizer,
+}
+
+
+def create_recognizer(
+    languages: List[str], gpu: bool = False, config: Optional[RecognizerConfig] = None
+):
+    """Build the recognizer selected by config.backend"""
+    config = config or RecognizerConfig()
+    return RECOGNIZERS[config.backend](languages, gpu=gpu, config=config)
+
+
+def export_onnx(languages: List[str], onnx_dir: str, opset: int = 17) -> Dict[str, str]:
+    """Export EasyOCR's detector and recognizer for languages to ONNX files"""
+    import easyocr
+    import torch
+
+    os.makedirs(onnx_dir, exist_ok=True)
+    paths = onnx_paths(onnx_dir, languages)
+    # Quantized modules do not export; ONNX Runtime optimizes the graph itself
+    reader = easyocr.Reader(languages, gpu=False, quantize=False)
+
+    torch.onnx.export(
+        reader.detector,
+        (torch.zeros(1, 3, 640, 640),),
+        paths["detector"],
+        input_names=["image"],
+        output_names=["scores", "features"],
+        dynamic_axes={
+            "image": {2: "height", 3: "width"},
+            "scores": {1: "score_height", 2: "score_width"},
+            "features": {2: "feature_height", 3: "feature_width"},
+        },
+        opset_version=opset,
+    )
+    torch.onnx.export(
+        reader.recognizer,
+        (torch.zeros(1, 1, 64, 256), torch.zeros(1, 1, dtype=torch.long)),
+        paths["recognizer"],
+        input_names=["image", "text"],
+        output_names=["preds"],
+        dynamic_axes={
+            "image": {0: "batch", 3: "width"},
+            "text": {0: "batch"},
+            "preds": {0: "batch", 1: "steps"},
+        },
+        opset_version=opset,
+    )
+    return paths
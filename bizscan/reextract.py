@@ -0,0 +1,138 @@
+import itertools
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from bizscan import storage
+from bizscan.extraction import CONTACT_FIELDS, extract_layout_fields
+from bizscan.ocr import OCRResult
+
+
+def ocr_record(
+    contact_id: Any,
+    ocr: OCRResult,
+    reader: str,
+    extracted: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Row for storage.save_ocr_results
+
+    extracted is what the extractor produced before any user edits; it
+    defaults to running the current extractor over ocr.
+    """
+    if extracted is None:
+        extracted = extract_layout_fields(ocr.detections).to_dict()
+    return {
+        "contact_id": contact_id,
+        "payload": ocr.to_json(),
+        "reader": reader,
+        "extracted": json.dumps(
+            {name: extracted.get(name) or "" for name in CONTACT_FIELDS},
+            separators=(",", ":"),
+        ),
+    }
+
+
+def save_scan_ocr(outcomes: Iterable[Any], results: List[Any], reader: str) -> int:
+    """Store the OCR output behind every saved contact of a bulk write
+
+    outcomes are storage.RowOutcome objects whose index points into results,
+    the BatchResult list the contacts came from. Returns the rows stored.
+    """
+    records = []
+    for outcome in outcomes:
+        if not outcome.ok or not outcome.row:
+            continue
+        result = results[outcome.index]
+        if result.ocr is not None:
+            records.append(
+                ocr_record(outcome.row["id"], result.ocr, reader, result.contact)
+            )
+    storage.save_ocr_results(records)
+    return len(records)
+
+
+@dataclass
+class ReextractReport:
+    """What a re-extraction pass looked at and changed"""
+
+    scanned: int = 0
+    with_ocr: int = 0
+    changed: int = 0
+    fields: Dict[str, int] = field(default_factory=dict)
+    seconds: float = 0.0
+
+
+def _field_changes(
+    contact: Dict[str, Any], previous: Dict[str, Any], current: Dict[str, str]
+) -> Dict[str, str]:
+    """Fields to overwrite with the new extraction
+
+    Only fields the extractor now reads differently, and only while the
+    contact still holds the old extracted value; user edits are kept.
+    """
+    changes = {}
+    for name in CONTACT_FIELDS:
+        old = previous.get(name) or ""
+        new = current.get(name) or ""
+        stored = contact.get(name) or ""
+        if new != old and stored == old:
+            changes[name] = new
+    return changes
+
+
+def reextract_contacts(
+    page_size: int = 500, dry_run: bool = False, concurrency: int = 4
+) -> ReextractReport:
+    """Run the current extractor over every stored OCR result
+
+    Contacts are streamed a keyset page at a time with their OCR rows
+    fetched in one query per page, and changed fields are written back with
+    one bulk update per page, so no card is decoded or OCRed again. With
+    dry_run nothing is written and the report shows what would change.
+    """
+    report = ReextractReport()
+    field_counts: Counter = Counter()
+    started = time.perf_counter()
+    contacts = storage.iter_contacts(page_size)
+    while True:
+        page = list(itertools.islice(contacts, page_size))
+        if not page:
+            break
+        report.scanned += len(page)
+        stored = {
+            row["contact_id"]: row
+            for row in storage.fetch_ocr_results([contact["id"] for contact in page])
+        }
+
+        updates, records = [], []
+        for contact in page:
+            row = stored.get(contact["id"])
+            if row is None:
+                continue
+            report.with_ocr += 1
+            previous = json.loads(row.get("extracted") or "{}")
+            ocr = OCRResult.from_json(row["payload"])
+            current = extract_layout_fields(ocr.detections).to_dict()
+            if all(
+                current[name] == (previous.get(name) or "") for name in CONTACT_FIELDS
+            ):
+                continue
+            changes = _field_changes(contact, previous, current)
+            if changes:
+                report.changed += 1
+                field_counts.update(changes.keys())
+                updates.append({"id": contact["id"], **changes})
+            # Remember the new baseline so later runs still spot user edits
+            records.append(
+                ocr_record(contact["id"], ocr, row.get("reader") or "", current)
+            )
+
+        if not dry_run:
+            storage.update_contacts(updates, concurrency=concurrency)
+            storage.save_ocr_results(records)
+
+    report.fields = dict(field_counts)
+    report.seconds = round(time.perf_counter() - started, 3)
+    return report
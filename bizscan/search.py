@@ -0,0 +1,80 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from bizscan.extraction import CONTACT_FIELDS
+
+# Separates fields in the indexed text so grams never span two fields
+FIELD_SEPARATOR = "\x1f"
+
+
+class ContactSearchIndex:
+    """Trigram inverted index for case-insensitive substring search over contacts
+
+    Terms of three or more characters are answered by intersecting the
+    posting sets of their trigrams and verifying the survivors; shorter
+    terms fall back to a substring scan of the pre-lowered text.
+    """
+
+    def __init__(self, fields: Optional[List[str]] = None, gram_size: int = 3):
+        self.fields = fields or CONTACT_FIELDS
+        self.gram_size = gram_size
+        self._text: Dict[Any, str] = {}
+        self._postings: Dict[str, Set[Any]] = defaultdict(set)
+
+    @classmethod
+    def build(cls, rows: Iterable[Dict[str, Any]], **kwargs) -> "ContactSearchIndex":
+        index = cls(**kwargs)
+        for row in rows:
+            index.add(row)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._text)
+
+    def _grams(self, text: str) -> Set[str]:
+        size = self.gram_size
+        return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+    def add(self, row: Dict[str, Any]):
+        """Index a row, replacing any previous version with the same id"""
+        contact_id = row["id"]
+        if contact_id in self._text:
+            self.remove(contact_id)
+        text = FIELD_SEPARATOR.join(
+            str(row.get(name) or "") for name in self.fields
+        ).lower()
+        self._text[contact_id] = text
+        for gram in self._grams(text):
+            self._postings[gram].add(contact_id)
+
+    update = add
+
+    def remove(self, contact_id: Any):
+        text = self._text.pop(contact_id, None)
+        if text is None:
+            return
+        for gram in self._grams(text):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.discard(contact_id)
+                if not posting:
+                    del self._postings[gram]
+
+    def search(self, term: str) -> Set[Any]:
+        """Ids of rows containing term in any indexed field"""
+        term = term.strip().lower()
+        if not term:
+            return set(self._text)
+        if len(term) < self.gram_size:
+            return {cid for cid, text in self._text.items() if term in text}
+
+        postings = sorted(
+            (self._postings.get(gram, set()) for gram in self._grams(term)), key=len
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates &= posting
+        # Trigram hits can come from different places in the text, so verify
+        return {cid for cid in candidates if term in self._text[cid]}
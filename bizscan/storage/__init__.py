@@ -0,0 +1,304 @@
+import itertools
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from bizscan.extraction import CONTACT_FIELDS
+from bizscan.metrics import timer
+from bizscan.storage.base import NATURAL_KEYS, ContactPage, StorageBackend
+
+_backend: Optional[StorageBackend] = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: Optional[str] = None) -> StorageBackend:
+    """Build the backend named by name or STORAGE_BACKEND (default: supabase)"""
+    load_dotenv()
+    name = (name or os.getenv("STORAGE_BACKEND") or "supabase").lower()
+
+    if name == "supabase":
+        from bizscan.storage.rest import SupabaseBackend
+
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_KEY")
+        if not url or not key:
+            raise RuntimeError(
+                "Missing Supabase configuration. Please check your .env file."
+            )
+        return SupabaseBackend(url, key)
+
+    if name == "postgres":
+        from bizscan.storage.sql import PostgresBackend
+
+        dsn = os.getenv("DATABASE_URL")
+        if not dsn:
+            raise RuntimeError(
+                "Missing DATABASE_URL for the postgres storage backend."
+            )
+        return PostgresBackend(
+            dsn,
+            min_connections=int(os.getenv("DATABASE_POOL_MIN", "1")),
+            max_connections=int(os.getenv("DATABASE_POOL_MAX", "10")),
+        )
+
+    if name == "sqlite":
+        from bizscan.storage.sql import SQLiteBackend
+
+        return SQLiteBackend(os.getenv("SQLITE_PATH", "bizscan.sqlite3"))
+
+    raise RuntimeError(
+        f"Unknown STORAGE_BACKEND '{name}'. Use supabase, postgres or sqlite."
+    )
+
+
+def get_backend() -> StorageBackend:
+    """Return the shared storage backend, creating it on first use"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = create_backend()
+    return _backend
+
+
+def set_backend(backend: Optional[StorageBackend]):
+    """Replace the shared backend, e.g. with an in-memory SQLite store"""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def insert_contacts(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Insert contact rows in a single request and return the stored rows"""
+    backend = get_backend()
+    with timer("storage", op="insert", backend=backend.name):
+        return backend.insert_contacts(list(rows))
+
+
+def fetch_contacts_page(
+    limit: int = 50, offset: int = 0, search: str = ""
+) -> ContactPage:
+    """Fetch one page of contacts, newest first, filtered in the database"""
+    backend = get_backend()
+    with timer("storage", op="fetch_page", backend=backend.name):
+        return backend.fetch_contacts_page(limit=limit, offset=offset, search=search)
+
+
+def fetch_contacts(page_size: int = 1000) -> List[Dict[str, Any]]:
+    """Fetch every contact, newest first"""
+    rows = []
+    while True:
+        page = fetch_contacts_page(limit=page_size, offset=len(rows))
+        rows.extend(page.rows)
+        if len(page.rows) < page_size:
+            return rows
+
+
+def iter_contacts(page_size: int = 1000) -> Iterator[Dict[str, Any]]:
+    """Yield every contact in id order, one keyset page in memory at a time
+
+    Unlike offset paging, each page is an index range scan from the last
+    id seen, so late pages cost the same as early ones and rows inserted
+    or deleted meanwhile never shift the pages.
+    """
+    backend = get_backend()
+    after_id = 0
+    while True:
+        with timer("storage", op="fetch_after", backend=backend.name):
+            rows = backend.fetch_contacts_after(after_id, page_size)
+        yield from rows
+        if len(rows) < page_size:
+            return
+        after_id = rows[-1]["id"]
+
+
+def update_contact(contact_id: int, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Update the contact with primary key contact_id"""
+    backend = get_backend()
+    with timer("storage", op="update", backend=backend.name):
+        return backend.update_contact(contact_id, data)
+
+
+def delete_contact(contact_id: int) -> List[Dict[str, Any]]:
+    """Delete the contact with primary key contact_id"""
+    backend = get_backend()
+    with timer("storage", op="delete", backend=backend.name):
+        return backend.delete_contact(contact_id)
+
+
+def update_contacts(
+    changes: Iterable[Dict[str, Any]], batch_size: int = 500, concurrency: int = 4
+) -> List[Dict[str, Any]]:
+    """Apply partial updates (an id plus the changed fields) in parallel batches"""
+    backend = get_backend()
+
+    def write(batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        with timer("storage", op="bulk_update", backend=backend.name):
+            return backend.update_contacts(batch)
+
+    changes = iter(changes)
+    batches = iter(lambda: list(itertools.islice(changes, batch_size)), [])
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return [row for rows in pool.map(write, batches) for row in rows]
+
+
+def save_ocr_results(rows: Iterable[Dict[str, Any]]):
+    """Store raw OCR rows (contact_id, payload, reader, extracted) for contacts"""
+    backend = get_backend()
+    with timer("storage", op="save_ocr", backend=backend.name):
+        backend.save_ocr_results(list(rows))
+
+
+def fetch_ocr_results(contact_ids: Iterable[int]) -> List[Dict[str, Any]]:
+    """Stored OCR rows for the given contacts"""
+    backend = get_backend()
+    with timer("storage", op="fetch_ocr", backend=backend.name):
+        return backend.fetch_ocr_results(list(contact_ids))
+
+
+@dataclass
+class RowOutcome:
+    """Result of writing one contact in a bulk write"""
+
+    index: int
+    ok: bool
+    row: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    attempts: int = 0
+
+
+def _is_missing(value: Any) -> bool:
+    """None, NaN, NaT or pd.NA; pandas is only consulted if already imported"""
+    if value is None:
+        return True
+    pandas = sys.modules.get("pandas")
+    if pandas is not None and pandas.api.types.is_scalar(value):
+        return bool(pandas.isna(value))
+    # NaN is the only value not equal to itself
+    try:
+        return bool(value != value)
+    except (TypeError, ValueError):
+        return False
+
+
+def _contact_records(contacts) -> Iterator[Dict[str, Any]]:
+    """Contact dicts from a DataFrame or an iterable of mappings"""
+    if hasattr(contacts, "to_dict"):
+        contacts = contacts.to_dict("records")
+    for contact in contacts:
+        row = {}
+        for name in CONTACT_FIELDS:
+            value = contact.get(name)
+            row[name] = "" if _is_missing(value) else value
+        yield row
+
+
+def _write_batch(
+    batch: List[Tuple[int, Dict[str, Any]]],
+    upsert_on: Optional[str],
+    max_retries: int,
+    backoff: float,
+) -> List[RowOutcome]:
+    backend = get_backend()
+    rows = [row for _, row in batch]
+    for attempt in range(1, max_retries + 2):
+        try:
+            op = "bulk_upsert" if upsert_on else "bulk_insert"
+            with timer("storage", op=op, backend=backend.name):
+                if upsert_on:
+                    stored = backend.upsert_contacts(rows, upsert_on)
+                else:
+                    stored = backend.insert_contacts(rows)
+            return [
+                RowOutcome(
+                    index,
+                    True,
+                    row=stored[i] if i < len(stored) else None,
+                    attempts=attempt,
+                )
+                for i, (index, _) in enumerate(batch)
+            ]
+        except Exception as e:
+            transient = backend.is_transient(e)
+            if transient and not upsert_on:
+                # A timed out insert may have committed; writing it again
+                # would duplicate the rows, so leave the retry to the caller
+                return [
+                    RowOutcome(
+                        index,
+                        False,
+                        error=f"{e} (may already be saved)",
+                        attempts=attempt,
+                    )
+                    for index, _ in batch
+                ]
+            if transient and attempt <= max_retries:
+                # Upserts are idempotent; back off with jitter so parallel
+                # batches spread out
+                time.sleep(backoff * 2 ** (attempt - 1) * (0.5 + random.random()))
+                continue
+            if len(batch) > 1:
+                # Split the batch to find the rows the database rejects
+                middle = len(batch) // 2
+                return _write_batch(
+                    batch[:middle], upsert_on, max_retries, backoff
+                ) + _write_batch(batch[middle:], upsert_on, max_retries, backoff)
+            return [RowOutcome(batch[0][0], False, error=str(e), attempts=attempt)]
+    return []
+
+
+def bulk_write_contacts(
+    contacts,
+    batch_size: int = 500,
+    concurrency: int = 4,
+    upsert_on: Optional[str] = None,
+    max_retries: int = 3,
+    backoff: float = 0.5,
+) -> List[RowOutcome]:
+    """Insert or upsert many contacts in batches, returning one outcome per row
+
+    contacts may be a DataFrame or any iterable of dicts and is consumed
+    lazily. With upsert_on set to a natural key column, rows matching an
+    existing contact on that column are updated in place; blank keys are
+    written as NULL so they never collide. Transient failures of upserts are
+    retried with exponential backoff; those of plain inserts are not, since
+    the batch may have been committed, and its rows are reported failed.
+    Batches the database rejects are split until the offending rows are
+    isolated.
+    """
+    if upsert_on is not None and upsert_on not in NATURAL_KEYS:
+        raise ValueError(f"upsert_on must be one of {', '.join(NATURAL_KEYS)}")
+
+    def batches() -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+        records = enumerate(_contact_records(contacts))
+        while True:
+            batch = list(itertools.islice(records, batch_size))
+            if not batch:
+                return
+            if upsert_on:
+                for _, row in batch:
+                    row[upsert_on] = row[upsert_on] or None
+            yield batch
+
+    outcomes: List[RowOutcome] = []
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        pending = set()
+        for batch in batches():
+            if len(pending) >= concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    outcomes.extend(future.result())
+            pending.add(
+                pool.submit(_write_batch, batch, upsert_on, max_retries, backoff)
+            )
+        for future in pending:
+            outcomes.extend(future.result())
+    outcomes.sort(key=lambda outcome: outcome.index)
+    return outcomes
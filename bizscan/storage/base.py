@@ -0,0 +1,92 @@
+import re
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+CONTACTS_TABLE = "contact_info"
+# Raw OCR output per contact, kept so fields can be re-extracted without OCR
+OCR_TABLE = "contact_ocr"
+
+# Columns that may serve as a natural key for upserts
+NATURAL_KEYS = ("business_email", "contact_number")
+
+
+@dataclass
+class ContactPage:
+    """One page of contacts plus the total number of matching rows"""
+
+    rows: List[Dict[str, Any]]
+    total: int
+    limit: int
+    offset: int
+
+
+def clean_search_term(search: str) -> str:
+    """Drop characters that are filter or wildcard syntax rather than search text"""
+    return re.sub(r"[,()*%\\]", " ", search).strip()
+
+
+class StorageBackend(ABC):
+    """Interface every contact store implements
+
+    Rows are plain dicts with JSON-compatible values (timestamps as ISO
+    strings), newest first wherever order matters. A backend missing any
+    abstract method fails when it is instantiated.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def insert_contacts(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Insert rows in one round trip and return the stored rows"""
+
+    @abstractmethod
+    def upsert_contacts(
+        self, rows: List[Dict[str, Any]], on_conflict: str
+    ) -> List[Dict[str, Any]]:
+        """Insert rows, updating existing ones that share the on_conflict column"""
+
+    @abstractmethod
+    def fetch_contacts_page(
+        self, limit: int = 50, offset: int = 0, search: str = ""
+    ) -> ContactPage:
+        """One page of contacts, newest first, filtered by search"""
+
+    @abstractmethod
+    def fetch_contacts_after(
+        self, after_id: int = 0, limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """Up to limit contacts with id above after_id, in id order"""
+
+    @abstractmethod
+    def update_contact(
+        self, contact_id: int, data: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """Update the contact with primary key contact_id"""
+
+    def update_contacts(self, changes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Apply many partial updates, each an id plus only the changed fields"""
+        stored = []
+        for change in changes:
+            data = {name: value for name, value in change.items() if name != "id"}
+            stored.extend(self.update_contact(change["id"], data))
+        return stored
+
+    @abstractmethod
+    def delete_contact(self, contact_id: int) -> List[Dict[str, Any]]:
+        """Delete the contact with primary key contact_id"""
+
+    @abstractmethod
+    def save_ocr_results(self, rows: List[Dict[str, Any]]):
+        """Insert or replace stored OCR rows, keyed by contact_id"""
+
+    @abstractmethod
+    def fetch_ocr_results(self, contact_ids: List[int]) -> List[Dict[str, Any]]:
+        """Stored OCR rows for the given contacts; contacts without one are skipped"""
+
+    def is_transient(self, error: Exception) -> bool:
+        """Whether a failed write is worth retrying"""
+        return False
+
+    def close(self):
+        pass
@@ -0,0 +1,120 @@
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+from bizscan.extraction import CONTACT_FIELDS
+from bizscan.storage.base import (
+    CONTACTS_TABLE,
+    OCR_TABLE,
+    ContactPage,
+    StorageBackend,
+    clean_search_term,
+)
+
+# HTTP statuses worth retrying; anything else is treated as a bad row
+TRANSIENT_STATUSES = {"408", "425", "429", "500", "502", "503", "504"}
+
+
+class SupabaseBackend(StorageBackend):
+    """Contacts stored in Supabase, accessed through its REST API"""
+
+    name = "supabase"
+
+    def __init__(self, url: str, key: str):
+        from supabase import create_client
+
+        self.client = create_client(url, key)
+
+    def _table(self):
+        return self.client.table(CONTACTS_TABLE)
+
+    def insert_contacts(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        return self._table().insert(rows).execute().data or []
+
+    def upsert_contacts(
+        self, rows: List[Dict[str, Any]], on_conflict: str
+    ) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        return self._table().upsert(rows, on_conflict=on_conflict).execute().data or []
+
+    def fetch_contacts_page(
+        self, limit: int = 50, offset: int = 0, search: str = ""
+    ) -> ContactPage:
+        query = self._table().select("*", count="exact")
+        term = clean_search_term(search)
+        if term:
+            query = query.or_(
+                ",".join(f"{column}.ilike.*{term}*" for column in CONTACT_FIELDS)
+            )
+        response = (
+            query.order("created_at", desc=True)
+            .order("id", desc=True)
+            .range(offset, offset + limit - 1)
+            .execute()
+        )
+        return ContactPage(response.data or [], response.count or 0, limit, offset)
+
+    def fetch_contacts_after(
+        self, after_id: int = 0, limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        response = (
+            self._table()
+            .select("*")
+            .gt("id", after_id)
+            .order("id")
+            .limit(limit)
+            .execute()
+        )
+        return response.data or []
+
+    def update_contact(
+        self, contact_id: int, data: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        return self._table().update(data).eq("id", contact_id).execute().data or []
+
+    def update_contacts(self, changes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # PostgREST has no bulk update, so upsert on the primary key instead.
+        # A bulk upsert sends every row with the union of their columns, so
+        # rows are grouped by changed columns to leave the others untouched.
+        # The ids must exist: an unknown id would insert a partial contact.
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+        for change in changes:
+            columns = tuple(name for name in CONTACT_FIELDS if name in change)
+            if columns:
+                groups[columns].append(
+                    {"id": change["id"], **{name: change[name] for name in columns}}
+                )
+
+        stored = []
+        for rows in groups.values():
+            stored += self._table().upsert(rows, on_conflict="id").execute().data or []
+        return stored
+
+    def delete_contact(self, contact_id: int) -> List[Dict[str, Any]]:
+        return self._table().delete().eq("id", contact_id).execute().data or []
+
+    def save_ocr_results(self, rows: List[Dict[str, Any]]):
+        if rows:
+            self.client.table(OCR_TABLE).upsert(
+                rows, on_conflict="contact_id"
+            ).execute()
+
+    def fetch_ocr_results(self, contact_ids: List[int]) -> List[Dict[str, Any]]:
+        if not contact_ids:
+            return []
+        response = (
+            self.client.table(OCR_TABLE)
+            .select("*")
+            .in_("contact_id", list(contact_ids))
+            .execute()
+        )
+        return response.data or []
+
+    def is_transient(self, error: Exception) -> bool:
+        import httpx
+
+        if isinstance(error, httpx.TransportError):
+            return True
+        return str(getattr(error, "code", "") or "") in TRANSIENT_STATUSES
@@ -0,0 +1,314 @@
+import datetime
+import sqlite3
+import threading
+from abc import abstractmethod
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, ContextManager, Dict, Iterator, List, Tuple
+
+from bizscan.extraction import CONTACT_FIELDS
+from bizscan.storage.base import (
+    CONTACTS_TABLE,
+    NATURAL_KEYS,
+    OCR_TABLE,
+    ContactPage,
+    StorageBackend,
+    clean_search_term,
+)
+
+ORDER_BY = "order by created_at desc, id desc"
+OCR_COLUMNS = ("contact_id", "payload", "reader", "extracted")
+
+
+def _json_row(row) -> Dict[str, Any]:
+    """Row as a dict with timestamps rendered like the REST API renders them"""
+    return {
+        name: value.isoformat() if isinstance(value, datetime.datetime) else value
+        for name, value in dict(row).items()
+    }
+
+
+class SQLBackend(StorageBackend):
+    """Shared SQL for backends that talk to a database directly"""
+
+    placeholder = "?"
+    like = "like"
+    now = "current_timestamp"
+
+    @abstractmethod
+    def _cursor(self) -> ContextManager[Any]:
+        """Context manager yielding a cursor inside one committed transaction"""
+
+    def _execute(self, sql: str, params: Tuple = ()) -> List[Dict[str, Any]]:
+        with self._cursor() as cursor:
+            cursor.execute(sql.replace("?", self.placeholder), params)
+            if cursor.description is None:
+                return []
+            return [_json_row(row) for row in cursor.fetchall()]
+
+    def _insert_sql(self, count: int) -> str:
+        columns = ", ".join(CONTACT_FIELDS)
+        values = ", ".join(
+            ["(" + ", ".join("?" * len(CONTACT_FIELDS)) + ")"] * count
+        )
+        return f"insert into {CONTACTS_TABLE} ({columns}) values {values}"
+
+    @staticmethod
+    def _insert_params(rows: List[Dict[str, Any]]) -> Tuple:
+        return tuple(row.get(name) for row in rows for name in CONTACT_FIELDS)
+
+    def insert_contacts(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        return self._execute(
+            f"{self._insert_sql(len(rows))} returning *", self._insert_params(rows)
+        )
+
+    def upsert_contacts(
+        self, rows: List[Dict[str, Any]], on_conflict: str
+    ) -> List[Dict[str, Any]]:
+        if on_conflict not in NATURAL_KEYS:
+            raise ValueError(f"Cannot upsert on {on_conflict}")
+        if not rows:
+            return []
+        updates = ", ".join(
+            f"{name} = excluded.{name}"
+            for name in CONTACT_FIELDS
+            if name != on_conflict
+        )
+        return self._execute(
+            f"{self._insert_sql(len(rows))} on conflict ({on_conflict}) "
+            f"do update set {updates}, last_modified = {self.now} returning *",
+            self._insert_params(rows),
+        )
+
+    def fetch_contacts_page(
+        self, limit: int = 50, offset: int = 0, search: str = ""
+    ) -> ContactPage:
+        where = ""
+        params: Tuple = ()
+        term = clean_search_term(search)
+        if term:
+            where = "where " + " or ".join(
+                f"{name} {self.like} ?" for name in CONTACT_FIELDS
+            )
+            params = (f"%{term}%",) * len(CONTACT_FIELDS)
+
+        total = self._execute(
+            f"select count(*) as total from {CONTACTS_TABLE} {where}", params
+        )[0]["total"]
+        rows = self._execute(
+            f"select * from {CONTACTS_TABLE} {where} {ORDER_BY} limit ? offset ?",
+            params + (limit, offset),
+        )
+        return ContactPage(rows, total, limit, offset)
+
+    def fetch_contacts_after(
+        self, after_id: int = 0, limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        return self._execute(
+            f"select * from {CONTACTS_TABLE} where id > ? order by id limit ?",
+            (after_id, limit),
+        )
+
+    def update_contact(
+        self, contact_id: int, data: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        data = {name: value for name, value in data.items() if name in CONTACT_FIELDS}
+        assignments = ", ".join(f"{name} = ?" for name in data)
+        return self._execute(
+            f"update {CONTACTS_TABLE} set {assignments}, "
+            f"last_modified = {self.now} where id = ? returning *",
+            tuple(data.values()) + (contact_id,),
+        )
+
+    def delete_contact(self, contact_id: int) -> List[Dict[str, Any]]:
+        return self._execute(
+            f"delete from {CONTACTS_TABLE} where id = ? returning *", (contact_id,)
+        )
+
+    def update_contacts(self, changes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # One statement per set of changed columns rather than one per row
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = defaultdict(list)
+        for change in changes:
+            columns = tuple(name for name in CONTACT_FIELDS if name in change)
+            if columns:
+                groups[columns].append(change)
+
+        stored = []
+        for columns, rows in groups.items():
+            names = ("id",) + columns
+            values = ", ".join(["(" + ", ".join("?" * len(names)) + ")"] * len(rows))
+            assignments = ", ".join(
+                f"{name} = (select {name} from changes "
+                f"where changes.id = {CONTACTS_TABLE}.id)"
+                for name in columns
+            )
+            stored += self._execute(
+                f"with changes ({', '.join(names)}) as (values {values}) "
+                f"update {CONTACTS_TABLE} set {assignments}, "
+                f"last_modified = {self.now} "
+                "where id in (select id from changes) returning *",
+                tuple(row[name] for row in rows for name in names),
+            )
+        return stored
+
+    def save_ocr_results(self, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        values = ", ".join(
+            ["(" + ", ".join("?" * len(OCR_COLUMNS)) + ")"] * len(rows)
+        )
+        updates = ", ".join(f"{name} = excluded.{name}" for name in OCR_COLUMNS[1:])
+        self._execute(
+            f"insert into {OCR_TABLE} ({', '.join(OCR_COLUMNS)}) values {values} "
+            f"on conflict (contact_id) do update set {updates}, "
+            f"last_modified = {self.now}",
+            tuple(row.get(name) for row in rows for name in OCR_COLUMNS),
+        )
+
+    def fetch_ocr_results(self, contact_ids: List[int]) -> List[Dict[str, Any]]:
+        if not contact_ids:
+            return []
+        placeholders = ", ".join("?" * len(contact_ids))
+        return self._execute(
+            f"select * from {OCR_TABLE} where contact_id in ({placeholders})",
+            tuple(contact_ids),
+        )
+
+
+class SQLiteBackend(SQLBackend):
+    """Contacts in an embedded SQLite file, for offline use, tests and benchmarks"""
+
+    name = "sqlite"
+    now = "strftime('%Y-%m-%dT%H:%M:%f+00:00', 'now')"
+
+    def __init__(self, path: str = "bizscan.sqlite3"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        # Deleting a contact also deletes its stored OCR output
+        self._connection.execute("pragma foreign_keys = on")
+        if path != ":memory:":
+            self._connection.execute("pragma journal_mode = wal")
+        self._create_schema()
+
+    def _create_schema(self):
+        timestamp = f"default ({self.now})"
+        columns = ",\n".join(f"    {name} text" for name in CONTACT_FIELDS)
+        with self._lock, self._connection:
+            self._connection.executescript(
+                f"""
+                create table if not exists {CONTACTS_TABLE} (
+                    id integer primary key autoincrement,
+                {columns},
+                    created_at text {timestamp},
+                    last_modified text {timestamp}
+                );
+                create index if not exists {CONTACTS_TABLE}_created_at_id_idx
+                    on {CONTACTS_TABLE} (created_at desc, id desc);
+                create index if not exists {CONTACTS_TABLE}_business_email_idx
+                    on {CONTACTS_TABLE} (business_email);
+                create index if not exists {CONTACTS_TABLE}_contact_number_idx
+                    on {CONTACTS_TABLE} (contact_number);
+                create index if not exists {CONTACTS_TABLE}_full_name_idx
+                    on {CONTACTS_TABLE} (lower(full_name));
+                create table if not exists {OCR_TABLE} (
+                    contact_id integer primary key
+                        references {CONTACTS_TABLE} (id) on delete cascade,
+                    payload text not null,
+                    reader text,
+                    extracted text,
+                    created_at text {timestamp},
+                    last_modified text {timestamp}
+                );
+                """
+            )
+
+    def upsert_contacts(
+        self, rows: List[Dict[str, Any]], on_conflict: str
+    ) -> List[Dict[str, Any]]:
+        # The natural keys carry no unique constraint here, since saving a
+        # suspected duplicate anyway must still work, so ON CONFLICT has no
+        # target. Update the newest matching contact or insert, per row, in
+        # one transaction; blank keys never match.
+        if on_conflict not in NATURAL_KEYS:
+            raise ValueError(f"Cannot upsert on {on_conflict}")
+        updates = ", ".join(
+            f"{name} = ?" for name in CONTACT_FIELDS if name != on_conflict
+        )
+        stored = []
+        with self._cursor() as cursor:
+            for row in rows:
+                matched = []
+                key = row.get(on_conflict)
+                if key:
+                    cursor.execute(
+                        f"update {CONTACTS_TABLE} set {updates}, "
+                        f"last_modified = {self.now} where id = (select max(id) "
+                        f"from {CONTACTS_TABLE} where {on_conflict} = ?) returning *",
+                        tuple(
+                            row.get(name)
+                            for name in CONTACT_FIELDS
+                            if name != on_conflict
+                        )
+                        + (key,),
+                    )
+                    matched = cursor.fetchall()
+                if not matched:
+                    cursor.execute(
+                        f"{self._insert_sql(1)} returning *", self._insert_params([row])
+                    )
+                    matched = cursor.fetchall()
+                stored += [_json_row(match) for match in matched]
+        return stored
+
+    @contextmanager
+    def _cursor(self) -> Iterator[Any]:
+        with self._lock, self._connection:
+            cursor = self._connection.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def is_transient(self, error: Exception) -> bool:
+        return isinstance(error, sqlite3.OperationalError) and "locked" in str(error)
+
+    def close(self):
+        self._connection.close()
+
+
+class PostgresBackend(SQLBackend):
+    """Contacts in Postgres over a pooled psycopg2 connection, bypassing REST"""
+
+    name = "postgres"
+    placeholder = "%s"
+    like = "ilike"
+    now = "now()"
+
+    def __init__(self, dsn: str, min_connections: int = 1, max_connections: int = 10):
+        from psycopg2.pool import ThreadedConnectionPool
+
+        self._pool = ThreadedConnectionPool(min_connections, max_connections, dsn)
+
+    @contextmanager
+    def _cursor(self) -> Iterator[Any]:
+        from psycopg2.extras import RealDictCursor
+
+        connection = self._pool.getconn()
+        try:
+            with connection:
+                with connection.cursor(cursor_factory=RealDictCursor) as cursor:
+                    yield cursor
+        finally:
+            self._pool.putconn(connection)
+
+    def is_transient(self, error: Exception) -> bool:
+        import psycopg2
+
+        return isinstance(error, (psycopg2.OperationalError, psycopg2.InterfaceError))
+
+    def close(self):
+        self._pool.closeall()
@@ -1,24 +1,64 @@
-import pandas as pd
 import streamlit as st
 from streamlit_option_menu import option_menu
-import easyocr
-import cv2
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+import logging
 import os
-import matplotlib.pyplot as plt
-import re
+import tempfile
+import threading
 import time
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
 import numpy as np
-from dotenv import load_dotenv
-from supabase import create_client
-
-load_dotenv()
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
-if not url or not key:
-    st.error("Missing Supabase configuration. Please check your .env file.")
+
+from bizscan.batch import BatchResult, iter_card_files, scan_batch
+from bizscan.config import env_flag
+from bizscan.contacts import ContactCache
+from bizscan.dedup import DEFAULT_THRESHOLD, DedupIndex, DuplicateGroup, DuplicateMatch
+from bizscan.export import (
+    EXPORT_FORMATS,
+    MEDIA_TYPES,
+    export_contacts,
+    export_filename,
+    sweep_export_files,
+)
+from bizscan.extraction import extract_layout_fields
+from bizscan.jobs import FAILED, OCRJobQueue, QueueFull
+from bizscan.languages import LANGUAGE_LABELS, LANGUAGE_SETS, auto_language_sets
+from bizscan.metrics import METRICS
+from bizscan.imaging import decode_image, render_preview, save_card_image
+from bizscan import storage
+from bizscan.ocr import (
+    OCR_LANGUAGES,
+    OCRCache,
+    OCRResult,
+    ReaderPool,
+    describe_reader,
+    reader_config,
+)
+from bizscan.preprocess import PreprocessConfig, find_cards, warp_card
+from bizscan.reextract import (
+    ReextractReport,
+    ocr_record,
+    reextract_contacts,
+    save_scan_ocr,
+)
+from bizscan.recognizers import RecognizerConfig
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    storage.get_backend()
+except Exception as e:
+    st.error(str(e))
     st.stop()
-supabase = create_client(url, key)
+
+
+def log_failure(stage: str, error: Exception):
+    """Log a failed storage call and count it in the stage error metrics"""
+    logger.error("%s failed: %s", stage, error, exc_info=error)
+    METRICS.increment("stage_errors", stage=stage)
 
 
 def load_css():
@@ -214,124 +254,136 @@ def load_css():
     )
 
 
-def extract_email(text: str) -> Optional[str]:
-    """Extract email address from text"""
-    email_pattern = r"[\w\.-]+@[\w\.-]+\.\w+"
-    email_match = re.search(email_pattern, text)
-    if email_match:
-        email = email_match.group(0)
-        return email.strip()
-    return None
+@st.cache_resource
+def load_ocr() -> ReaderPool:
+    """OCR models per language set, the default one loading in the background
 
+    OCR_DEVICE is auto, cpu or cuda; OCR_READER_POOL_MB caps the weights of
+    the loaded readers.
+    """
+    return ReaderPool(
+        OCR_LANGUAGES,
+        device=os.getenv("OCR_DEVICE", "auto"),
+        recognizer=RecognizerConfig.from_env(),
+        auto_languages=auto_language_sets(),
+        max_bytes=int(os.getenv("OCR_READER_POOL_MB", "512")) * 1024 * 1024,
+    )
 
-def extract_phone(text: str) -> Optional[str]:
-    """Extract phone number from text"""
-    phone_pattern = r"(?:\+\d{1,3}[-.\s]?)?\(?\d{3}\)?[-.\s]?\d{3}[-.\s]?\d{4}"
-    phone_match = re.search(phone_pattern, text)
-    if phone_match:
-        phone = phone_match.group(0)
-        return re.sub(r"[^\d+]", "", phone)
-    return None
 
+@st.cache_resource
+def load_ocr_cache() -> OCRCache:
+    """Shared OCR cache; set OCR_CACHE_PATH to also persist results to sqlite"""
+    reader = load_ocr()
+    return OCRCache(
+        reader,
+        reader_config(
+            reader.languages, reader.device, reader.recognizer, reader.auto_languages
+        ),
+        max_entries=int(os.getenv("OCR_CACHE_ENTRIES", "128")),
+        db_path=os.getenv("OCR_CACHE_PATH"),
+        max_disk_bytes=int(os.getenv("OCR_CACHE_MAX_MB", "256")) * 1024 * 1024,
+        preprocess_config=PreprocessConfig.from_env(),
+    )
 
-def extract_website(text: str) -> Optional[str]:
-    """Extract website from text"""
-    if "@" in text:  # Skip email addresses
-        return None
-    website_pattern = (
-        r"(?:www\.)?[a-zA-Z0-9][a-zA-Z0-9-]+\.[a-zA-Z]{2,}(?:\.[a-zA-Z]{2,})?"
+
+@st.cache_resource
+def load_ocr_queue() -> OCRJobQueue:
+    """OCR job queue shared by every session"""
+    return OCRJobQueue(
+        load_ocr_cache(),
+        workers=int(os.getenv("OCR_WORKERS", "1")),
+        max_queue=int(os.getenv("OCR_MAX_QUEUE", "16")),
     )
-    website_match = re.search(website_pattern, text.lower())
-    if website_match:
-        website = website_match.group(0)
-        return f"www.{website}" if not website.startswith("www.") else website
-    return None
-
-
-def extract_address(text: str) -> Optional[str]:
-    """Extract street address from text"""
-    address_pattern = r"\d+\s+[A-Za-z\s,]+(?:Street|St|Avenue|Ave|Road|Rd|Boulevard|Blvd|Lane|Ln|Drive|Dr)\b"
-    address_match = re.search(address_pattern, text)
-    return address_match.group(0) if address_match else None
-
-
-def process_card_image(image: np.ndarray, text_boxes: list) -> plt.Figure:
-    """Process and display card image with detected text boxes"""
-    fig = plt.figure(figsize=(15, 15))
-    ax = fig.add_subplot(111)
-
-    for coords, text, prob in text_boxes:
-        top_left = tuple(map(int, coords[0]))
-        bottom_right = tuple(map(int, coords[2]))
-        cv2.rectangle(image, top_left, bottom_right, (0, 255, 0), 2)
-
-    ax.imshow(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
-    ax.axis("off")
-    return fig
-
-
-def extract_card_info(ocr_result: list) -> pd.DataFrame:
-    """Extract information from OCR result"""
-    info = {
-        "full_name": "",
-        "organization": "",
-        "job_title": "",
-        "contact_number": "",
-        "business_email": "",
-        "business_url": "",
-        "street_address": "",
-        "location_city": "",
-        "location_state": "",
-        "postal_code": "",
-    }
 
-    # First pass: look for email specifically
-    for text in ocr_result:
-        text = text.strip()
-        email = extract_email(text)
-        if email:
-            info["business_email"] = email
-            break
 
-    # Second pass: extract other information
-    for idx, text in enumerate(ocr_result):
-        text = text.strip()
-        if not text:
-            continue
+@st.cache_resource
+def start_metrics():
+    """Export cache and queue counters; set METRICS_PORT to serve /metrics"""
+    METRICS.register_collector("ocr_readers", load_ocr().stats)
+    METRICS.register_collector("ocr_cache", load_ocr_cache().stats)
+    METRICS.register_collector("ocr_queue", load_ocr_queue().stats)
+    METRICS.register_collector("contact_cache", load_contact_cache().stats)
+    port = os.getenv("METRICS_PORT")
+    if port:
+        METRICS.serve(int(port))
+    return METRICS
+
+
+def render_debug_panel():
+    """Recent stage timings, shown in the sidebar when the URL has ?debug=1"""
+    import pandas as pd
+
+    with st.sidebar.expander("Debug: timings", expanded=True):
+        summary = METRICS.summary()
+        if summary:
+            st.dataframe(pd.DataFrame(summary), hide_index=True)
+        recent = [
+            {
+                "time": time.strftime("%H:%M:%S", time.localtime(timing.at)),
+                "stage": timing.stage,
+                "labels": ",".join(f"{k}={v}" for k, v in timing.labels.items()),
+                "ms": round(timing.seconds * 1000, 2),
+                "ok": timing.ok,
+            }
+            for timing in METRICS.recent(50)
+        ]
+        if recent:
+            st.dataframe(pd.DataFrame(recent), hide_index=True)
+        else:
+            st.caption("No timings recorded yet.")
+        st.json(METRICS.collect(), expanded=False)
+        st.download_button(
+            "Download Prometheus metrics",
+            METRICS.to_prometheus(),
+            file_name="metrics.txt",
+        )
 
-        # Skip if this line was already identified as email
-        if text == info["business_email"]:
-            continue
 
-        phone = extract_phone(text)
-        if phone:
-            info["contact_number"] = phone
-            continue
+def choose_languages(key: str, ocr_reader: ReaderPool) -> Optional[List[str]]:
+    """Language picker; None leaves the choice to the reader pool"""
+    default = "Detect automatically" if ocr_reader.auto_languages else "English"
+    choice = st.selectbox(
+        "Card language",
+        ["auto"] + [name for name in LANGUAGE_SETS if name != "en"],
+        format_func=lambda name: LANGUAGE_LABELS.get(name, default),
+        key=key,
+    )
+    return None if choice == "auto" else LANGUAGE_SETS[choice]
 
-        website = extract_website(text)
-        if website:
-            info["business_url"] = website
-            continue
 
-        address = extract_address(text)
-        if address:
-            info["street_address"] = address
-            continue
+def session_id() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else ""
+
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def card_preview(
+    image_key: str, _image: np.ndarray, _detections: list, numbered: bool = False
+) -> bytes:
+    """Encoded preview with detected text boxes, cached by image hash"""
+    return render_preview(_image, _detections, numbered=numbered)
+
 
-        # Handle name and title
-        if idx == 0 and not any(char.isdigit() for char in text):
-            info["full_name"] = text
-        elif idx == 1 and not any(
-            domain in text.lower() for domain in [".com", ".org", ".net"]
-        ):
-            info["job_title"] = text
+@st.cache_data(show_spinner=False, max_entries=16)
+def card_regions(image_key: str, _image: np.ndarray) -> List[list]:
+    """Corners of each card when a photo holds several, cached by image hash"""
+    regions = find_cards(_image)
+    return [corners.tolist() for corners in regions] if len(regions) > 1 else []
 
-    return pd.DataFrame([info])
+
+@st.cache_resource
+def load_contact_cache() -> ContactCache:
+    """Contact snapshot cache shared by every session"""
+    return ContactCache(
+        ttl=float(os.getenv("CONTACT_CACHE_TTL", "60")),
+        max_rows=int(os.getenv("CONTACT_SNAPSHOT_MAX_ROWS", "50000")),
+    )
 
 
-# Database functions
-def save_to_database(df: pd.DataFrame) -> bool:
-    """Save contact information to database"""
+def save_to_database(
+    df: "pd.DataFrame", ocr: Optional[OCRResult] = None, reader: str = ""
+) -> bool:
+    """Save contact information to database, with the OCR output it came from"""
     try:
         data = {
             "full_name": df.iloc[0]["full_name"],
@@ -346,55 +398,352 @@ def save_to_database(df: pd.DataFrame) -> bool:
             "postal_code": df.iloc[0]["postal_code"],
         }
 
-        response = supabase.table("contact_info").insert(data).execute()
-        print("Insert response:", response)  # For debugging
+        response = storage.insert_contacts([data])
+        load_contact_cache().apply_upserts(response)
+        if ocr is not None and response:
+            save_ocr_output([ocr_record(response[0]["id"], ocr, reader)])
         return True
     except Exception as e:
         st.error(f"Failed to save to database: {str(e)}")
-        print(f"Database error details: {str(e)}")
+        log_failure("save_to_database", e)
         return False
 
 
-def get_all_contacts() -> pd.DataFrame:
-    """Retrieve all contacts from database"""
+def save_contacts_to_database(df: "pd.DataFrame") -> List[storage.RowOutcome]:
+    """Save many contacts to database in batches, returning per-row outcomes"""
     try:
-        response = (
-            supabase.table("contact_info")
-            .select("*")
-            .order("created_at", desc=True)
-            .execute()
+        outcomes = storage.bulk_write_contacts(
+            df,
+            batch_size=int(os.getenv("BULK_WRITE_BATCH_SIZE", "500")),
+            concurrency=int(os.getenv("BULK_WRITE_CONCURRENCY", "4")),
+            upsert_on=os.getenv("CONTACT_UPSERT_KEY") or None,
         )
+    except Exception as e:
+        st.error(f"Failed to save contacts to database: {str(e)}")
+        log_failure("save_contacts_to_database", e)
+        return []
 
-        if response.data:
-            df = pd.DataFrame(response.data)
-            # Rename columns to match display format
-            column_mapping = {
-                "full_name": "Name",
-                "organization": "Organization",
-                "job_title": "Title",
-                "contact_number": "Phone",
-                "business_email": "Email",
-                "business_url": "Website",
-                "street_address": "Address",
-                "location_city": "City",
-                "location_state": "State",
-                "postal_code": "Postal Code",
+    load_contact_cache().apply_upserts(
+        [outcome.row for outcome in outcomes if outcome.ok and outcome.row]
+    )
+    failed = [outcome for outcome in outcomes if not outcome.ok]
+    if failed:
+        st.error(
+            f"Failed to save {len(failed)} of {len(outcomes)} contacts: "
+            + "; ".join(f"row {o.index + 1}: {o.error}" for o in failed[:5])
+        )
+        logger.error(
+            "save_contacts_to_database: %d rows failed: %s",
+            len(failed),
+            [o.error for o in failed],
+        )
+        METRICS.increment(
+            "stage_errors", value=len(failed), stage="save_contacts_to_database"
+        )
+    return outcomes
+
+
+def save_ocr_output(records: List[Dict[str, Any]]):
+    """Keep raw OCR for re-extraction; the contacts are saved either way"""
+    try:
+        storage.save_ocr_results(records)
+    except Exception as e:
+        log_failure("save_ocr_output", e)
+
+
+def save_scanned_ocr(outcomes: List[storage.RowOutcome], results: list, reader: str):
+    try:
+        save_scan_ocr(outcomes, results, reader)
+    except Exception as e:
+        log_failure("save_scanned_ocr", e)
+
+
+def reextract_all_contacts(dry_run: bool) -> Optional[ReextractReport]:
+    try:
+        report = reextract_contacts(dry_run=dry_run)
+    except Exception as e:
+        st.error(f"Failed to re-extract contacts: {str(e)}")
+        log_failure("reextract_all_contacts", e)
+        return None
+    if not dry_run and report.changed:
+        load_contact_cache().invalidate()
+    return report
+
+
+def find_contact_duplicates(contact: Dict[str, Any]) -> List[DuplicateMatch]:
+    """Stored contacts that look like the same person as contact"""
+    try:
+        return load_contact_cache().duplicates(contact)
+    except Exception as e:
+        log_failure("find_contact_duplicates", e)
+        return []
+
+
+def find_all_duplicates(threshold: float) -> Optional[List[DuplicateGroup]]:
+    try:
+        return load_contact_cache().find_duplicates(threshold)
+    except Exception as e:
+        st.error(f"Failed to search for duplicates: {str(e)}")
+        log_failure("find_all_duplicates", e)
+        return None
+
+
+def batch_duplicates(results: list) -> Dict[str, str]:
+    """Likely duplicate per scanned card, among stored and earlier cards"""
+    seen = DedupIndex()
+    flagged = {}
+    for r in results:
+        if not r.ok:
+            continue
+        matches = find_contact_duplicates(r.contact)
+        if matches:
+            flagged[r.name] = f"{matches[0].label} ({matches[0].score:.0%})"
+        else:
+            matches = seen.match({**r.contact, "id": None})
+            if matches:
+                flagged[r.name] = f"same as {matches[0].duplicate_id}"
+        seen.add({**r.contact, "id": r.name})
+    return flagged
+
+
+def review_scanned_contacts(
+    results: list, duplicates: Dict[str, str], editor_key: str, reader: str
+) -> Optional[set]:
+    """Editable table of scanned contacts with a button to save the ticked ones
+
+    Returns the names of the cards that failed to save after a save, or None
+    when nothing was saved on this run.
+    """
+    import pandas as pd
+
+    st.subheader("Review Scanned Contacts")
+    if duplicates:
+        st.info(
+            f"{len(duplicates)} card(s) look like existing contacts and "
+            "are unticked; tick them to save anyway."
+        )
+    review_df = pd.DataFrame(
+        [
+            {
+                "save": r.name not in duplicates,
+                "file": r.name,
+                "possible_duplicate": duplicates.get(r.name, ""),
+                **r.contact,
             }
-            df = df.rename(columns=column_mapping)
-            # Select only the columns we want to display
-            display_columns = list(column_mapping.values())
-            return df[display_columns]
+            for r in results
+            if r.ok
+        ]
+    )
+    if review_df.empty:
+        return None
+    edited_df = st.data_editor(
+        review_df,
+        use_container_width=True,
+        hide_index=True,
+        disabled=["file", "possible_duplicate"],
+        key=editor_key,
+    )
+
+    if not st.button("Save Selected Contacts"):
+        return None
+    selected = edited_df[edited_df["save"]]
+    if selected.empty:
+        st.info("No contacts selected.")
+        return None
+    outcomes = save_contacts_to_database(selected)
+    by_name = {r.name: r for r in results}
+    save_scanned_ocr(outcomes, [by_name[name] for name in selected["file"]], reader)
+    saved = sum(outcome.ok for outcome in outcomes)
+    if saved:
+        st.success(f"Saved {saved} contacts successfully!")
+    # Keep only the cards that still need saving
+    return {
+        selected.iloc[outcome.index]["file"] for outcome in outcomes if not outcome.ok
+    }
+
+
+def scan_card_regions(
+    image_key: str,
+    image: np.ndarray,
+    regions: List[list],
+    file_name: str,
+    ocr_reader: ReaderPool,
+    ocr_queue: OCRJobQueue,
+    languages: Optional[List[str]] = None,
+) -> list:
+    """OCR every card of a multi-card photo as its own job, one result per card
+
+    Until all the jobs have finished this shows progress and reruns the
+    script, like the single-card flow. The warped crops and their cache keys
+    are kept in the session for image_key, so the reruns only poll the jobs.
+    """
+    prepared = st.session_state.get("card_crops")
+    if not prepared or prepared[0] != image_key:
+        crops = [
+            warp_card(image, np.asarray(corners, dtype=np.float32))[0]
+            for corners in regions
+        ]
+        keys = [ocr_queue.cache.key(crop, languages) for crop in crops]
+        prepared = (image_key, crops, keys)
+        st.session_state.card_crops = prepared
+    _, crops, keys = prepared
+
+    jobs = []
+    for crop, key in zip(crops, keys):
+        try:
+            jobs.append(
+                ocr_queue.submit(
+                    crop, owner=session_id(), cache_key=key, languages=languages
+                )
+            )
+        except QueueFull:
+            # The rest are queued on a later rerun, once workers free up room
+            break
+
+    done = sum(job.finished for job in jobs)
+    if done < len(crops):
+        if len(jobs) < len(crops):
+            st.info("Waiting for room in the scanner queue...")
+        elif not ocr_reader.loaded(languages):
+            st.info("Loading the OCR model, this only happens once...")
+        st.progress(done / len(crops), text=f"Read {done} of {len(crops)} cards...")
+        time.sleep(0.5)
+        st.rerun()
+
+    del st.session_state.card_crops
+    results = []
+    for index, job in enumerate(jobs):
+        name = f"{file_name} card {index + 1}"
+        if job.status == FAILED:
+            results.append(BatchResult(index, name, error=job.error))
+            continue
+        contact = extract_layout_fields(job.result.detections).to_dict()
+        results.append(BatchResult(index, name, contact=contact, ocr=job.result))
+    return results
+
+
+CONTACT_COLUMNS = {
+    "full_name": "Name",
+    "organization": "Organization",
+    "job_title": "Title",
+    "contact_number": "Phone",
+    "business_email": "Email",
+    "business_url": "Website",
+    "street_address": "Address",
+    "location_city": "City",
+    "location_state": "State",
+    "postal_code": "Postal Code",
+}
+
+
+def data_frame(rows) -> "pd.DataFrame":
+    """pandas.DataFrame(rows), importing pandas on first use"""
+    import pandas as pd
+
+    return pd.DataFrame(rows)
+
+
+def contacts_frame(rows: list) -> "pd.DataFrame":
+    """Build a display DataFrame from contact rows, indexed by contact id"""
+    import pandas as pd
+
+    if not rows:
         return pd.DataFrame()
+    # Rename columns to match display format and keep only those we display
+    df = pd.DataFrame(rows).set_index("id").rename(columns=CONTACT_COLUMNS)
+    return df[list(CONTACT_COLUMNS.values())]
+
+
+def get_all_contacts() -> "pd.DataFrame":
+    """Retrieve all contacts from database"""
+    import pandas as pd
+
+    try:
+        return contacts_frame(storage.fetch_contacts())
     except Exception as e:
         st.error(f"Failed to fetch contacts: {str(e)}")
-        print(f"Database error details: {str(e)}")
+        log_failure("get_all_contacts", e)
         return pd.DataFrame()
 
 
-def update_contact(name: str, updated_data: Dict[str, Any]) -> bool:
+def get_contacts_page(
+    search_term: str, page: int, page_size: int
+) -> Tuple["pd.DataFrame", int]:
+    """Retrieve one page of contacts matching search_term, plus the match count"""
+    import pandas as pd
+
+    try:
+        # Small tables are searched in memory; large ones are paged by the database
+        result = load_contact_cache().page(
+            limit=page_size, offset=(page - 1) * page_size, search=search_term
+        )
+        return contacts_frame(result.rows), result.total
+    except Exception as e:
+        st.error(f"Failed to fetch contacts: {str(e)}")
+        log_failure("get_contacts_page", e)
+        return pd.DataFrame(), 0
+
+
+EXPORT_LABELS = {
+    "csv": "CSV",
+    "jsonl": "JSON Lines",
+    "vcard3": "vCard 3.0",
+    "vcard4": "vCard 4.0",
+}
+
+
+EXPORT_DIR = os.path.join(tempfile.gettempdir(), "bizscan-exports")
+
+
+@st.cache_resource
+def start_export_sweeper() -> float:
+    """Delete exports left behind by abandoned sessions on a schedule"""
+    ttl = float(os.getenv("EXPORT_TTL_SECONDS", "900"))
+
+    def sweep():
+        while True:
+            sweep_export_files(EXPORT_DIR, ttl)
+            time.sleep(ttl / 4)
+
+    threading.Thread(target=sweep, name="export-sweeper", daemon=True).start()
+    return ttl
+
+
+def prepare_export(export_format: str, compress: bool) -> Optional[Tuple[str, int]]:
+    """Stream every contact into a temporary file; returns (path, contact count)
+
+    Files are removed once downloaded, or by the sweeper after
+    EXPORT_TTL_SECONDS.
+    """
+    start_export_sweeper()
+    try:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=EXPORT_DIR,
+            prefix="bizscan-export-",
+            suffix=export_filename(export_format, compress),
+            delete=False,
+        ) as f:
+            count = export_contacts(f, export_format, compress)
+        return f.name, count
+    except Exception as e:
+        st.error(f"Error exporting contacts: {str(e)}")
+        log_failure("prepare_export", e)
+        return None
+
+
+def discard_export():
+    """Forget this session's prepared export and delete its file"""
+    export = st.session_state.pop("contact_export", None)
+    if export and os.path.exists(export[0]):
+        os.remove(export[0])
+
+
+def update_contact(contact_id: int, updated_data: Dict[str, Any]) -> bool:
     """Update contact information"""
     try:
         data = {
+            "full_name": updated_data["Name"],
             "organization": updated_data["Organization"],
             "job_title": updated_data["Title"],
             "contact_number": updated_data["Phone"],
@@ -406,28 +755,24 @@ def update_contact(name: str, updated_data: Dict[str, Any]) -> bool:
             "postal_code": updated_data["Postal Code"],
         }
 
-        response = (
-            supabase.table("contact_info").update(data).eq("full_name", name).execute()
-        )
-        print("Update response:", response)  # For debugging
+        response = storage.update_contact(contact_id, data)
+        load_contact_cache().apply_upserts(response)
         return True
     except Exception as e:
         st.error(f"Failed to update contact: {str(e)}")
-        print(f"Database error details: {str(e)}")
+        log_failure("update_contact", e)
         return False
 
 
-def delete_contact(name: str) -> bool:
+def delete_contact(contact_id: int) -> bool:
     """Delete contact from database"""
     try:
-        response = (
-            supabase.table("contact_info").delete().eq("full_name", name).execute()
-        )
-        print("Delete response:", response)  # For debugging
+        response = storage.delete_contact(contact_id)
+        load_contact_cache().apply_deletes(response)
         return True
     except Exception as e:
         st.error(f"Failed to delete contact: {str(e)}")
-        print(f"Database error details: {str(e)}")
+        log_failure("delete_contact", e)
         return False
 
 
@@ -439,21 +784,19 @@ def main():
         unsafe_allow_html=True,
     )
 
-    # Initialize OCR
-    @st.cache_resource
-    def load_ocr():
-        try:
-            return easyocr.Reader(["en"], gpu=True)
-        except:
-            return easyocr.Reader(["en"], gpu=False)
-
-    scanner = load_ocr()
+    # Start loading the OCR model; only scanning waits for it
+    ocr_reader = load_ocr()
+    ocr_cache = load_ocr_cache()
+    ocr_queue = load_ocr_queue()
+    start_metrics()
+    if st.query_params.get("debug") == "1":
+        render_debug_panel()
 
     # Menu
     menu_choice = option_menu(
         None,
-        ["Scan Card", "View & Manage Contacts"],
-        icons=["camera", "person-rolodex"],
+        ["Scan Card", "Batch Scan", "View & Manage Contacts"],
+        icons=["camera", "collection", "person-rolodex"],
         default_index=0,
         orientation="horizontal",
         styles={
@@ -470,42 +813,127 @@ def main():
     )
 
     if menu_choice == "Scan Card":
+        languages = choose_languages("scan_languages", ocr_reader)
         st.markdown('<div class="upload-section">', unsafe_allow_html=True)
         uploaded_file = st.file_uploader(
             "Upload Business Card Image (Demo Version - Please use non-sensitive/test data only)",
             type=["png", "jpg", "jpeg"],
             help="Supported formats: PNG, JPG, JPEG",
         )
+        split_cards = st.checkbox(
+            "Photo holds several cards",
+            value=env_flag("OCR_SPLIT_CARDS"),
+            help="Find each card in the photo and read it as its own contact",
+        )
         st.markdown("</div>", unsafe_allow_html=True)
 
         if uploaded_file:
             try:
-                # Create directory for uploads
-                upload_dir = os.path.join(os.getcwd(), "scanned_cards")
-                os.makedirs(upload_dir, exist_ok=True)
-
-                # Save and process image
-                file_path = os.path.join(upload_dir, uploaded_file.name)
-                with open(file_path, "wb") as f:
-                    f.write(uploaded_file.getbuffer())
-
-                with st.spinner("Processing image..."):
-                    # Process image and show it
-                    image = cv2.imread(file_path)
-                    if image is None:
-                        st.error(
-                            "Failed to load image. Please ensure it's a valid image file."
+                image_bytes = uploaded_file.getbuffer()
+
+                # Decode in memory and hand the image to the OCR workers
+                image = decode_image(image_bytes)
+                if image is None:
+                    st.error(
+                        "Failed to load image. Please ensure it's a valid image file."
+                    )
+                    return
+                image_key = ocr_cache.key(image, languages)
+
+                # A photo of several cards becomes one OCR job per card
+                regions = card_regions(image_key, image) if split_cards else []
+                if regions:
+                    scanned = st.session_state.get("multi_card")
+                    if not scanned or scanned[0] != image_key:
+                        results = scan_card_regions(
+                            image_key,
+                            image,
+                            regions,
+                            uploaded_file.name,
+                            ocr_reader,
+                            ocr_queue,
+                            languages,
                         )
-                        return
-                    detected_text = scanner.readtext(file_path)
-                    fig = process_card_image(image, detected_text)
-                    st.pyplot(fig)
+                        scanned = (image_key, results, batch_duplicates(results))
+                        st.session_state.multi_card = scanned
+                    _, results, duplicates = scanned
+
+                    # Numbered to match the "card N" names in the review below
+                    outlines = [(corners, "", 1.0) for corners in regions]
+                    st.image(
+                        card_preview(
+                            f"{image_key}:cards", image, outlines, numbered=True
+                        ),
+                        use_column_width=True,
+                    )
+                    st.caption(f"Found {len(regions)} cards in this photo")
+                    failed = [r for r in results if not r.ok]
+                    if failed:
+                        st.warning(
+                            f"{len(failed)} card(s) could not be read: "
+                            + ", ".join(r.name for r in failed)
+                        )
+                    unsaved = review_scanned_contacts(
+                        results,
+                        duplicates,
+                        f"cards_{image_key[:16]}",
+                        ocr_cache.config_key,
+                    )
+                    if unsaved is not None:
+                        st.session_state.multi_card = (
+                            image_key,
+                            [r for r in results if r.ok and r.name in unsaved],
+                            duplicates,
+                        )
+                    return
+
+                try:
+                    job = ocr_queue.submit(
+                        image,
+                        owner=session_id(),
+                        cache_key=image_key,
+                        languages=languages,
+                    )
+                except QueueFull:
+                    st.warning(
+                        "The scanner is busy right now. Please try again in a moment."
+                    )
+                    return
+
+                if not job.finished:
+                    ahead = ocr_queue.position(job.id)
+                    if ahead:
+                        st.info(f"Waiting for the scanner ({ahead} card(s) ahead)...")
+                    elif not ocr_reader.loaded(languages):
+                        st.info("Loading the OCR model, this only happens once...")
+                    else:
+                        st.info("Processing image...")
+                    # Poll until a worker has finished the job
+                    time.sleep(0.5)
+                    st.rerun()
+                if job.status == FAILED:
+                    st.error(f"Failed to read the card: {job.error}")
+                    return
+
+                ocr_result = job.result
+                st.image(
+                    card_preview(image_key, image, ocr_result.detections),
+                    use_column_width=True,
+                )
+                stats = ocr_cache.stats()
+                st.caption(
+                    f"OCR cache: {stats['hits']} hits, {stats['misses']} misses"
+                )
+                if ocr_result.provisional:
+                    st.caption(
+                        "Other language readers are still loading; this card is "
+                        "read again once they are ready"
+                    )
 
-                text_only = scanner.readtext(file_path, detail=0)
-                contact_df = extract_card_info(text_only)
+                contact_df = extract_layout_fields(ocr_result.detections).to_frame()
 
                 # Store raw text for display
-                raw_text = "\n".join(text_only)
+                raw_text = "\n".join(ocr_result.texts)
 
                 # Allow manual editing of extracted information
                 st.subheader("Review and Edit Information")
@@ -534,15 +962,34 @@ def main():
                                 key=f"edit_{field}",
                             )
 
+                    keep_image = st.checkbox(
+                        "Keep a copy of the card image", value=False
+                    )
+                    save_anyway = st.checkbox(
+                        "Save even if it looks like an existing contact", value=False
+                    )
                     submit = st.form_submit_button("Save Contact")
 
                 if submit:
-                    edited_df = pd.DataFrame([edited_info])
-                    if save_to_database(edited_df):
+                    duplicates = []
+                    if not save_anyway:
+                        duplicates = find_contact_duplicates(edited_info)
+                    if duplicates:
+                        st.warning(
+                            "This card looks like a contact you already saved: "
+                            + "; ".join(
+                                f"{match.label} ({match.score:.0%} match on "
+                                f"{', '.join(match.reasons)})"
+                                for match in duplicates
+                            )
+                            + ". Tick the box above to save it anyway."
+                        )
+                    elif save_to_database(
+                        data_frame([edited_info]), ocr_result, ocr_cache.config_key
+                    ):
                         st.success("Contact saved successfully!")
-                        # Clean up uploaded file
-                        if os.path.exists(file_path):
-                            os.remove(file_path)
+                        if keep_image:
+                            save_card_image(image_bytes, uploaded_file.name)
 
                     # Show raw OCR text in an expander
                     with st.expander("View Raw OCR Text", expanded=False):
@@ -550,8 +997,98 @@ def main():
 
             except Exception as e:
                 st.error(f"An error occurred: {str(e)}")
-                if os.path.exists(file_path):
-                    os.remove(file_path)
+
+    elif menu_choice == "Batch Scan":
+        st.markdown('<div class="upload-section">', unsafe_allow_html=True)
+        uploaded_files = st.file_uploader(
+            "Upload Business Card Images or a Zip Archive",
+            type=["png", "jpg", "jpeg", "zip"],
+            accept_multiple_files=True,
+            help="Supported formats: PNG, JPG, JPEG, ZIP",
+        )
+        st.markdown("</div>", unsafe_allow_html=True)
+
+        cpu_count = os.cpu_count() or 1
+        workers = st.slider(
+            "Worker processes", 1, cpu_count, value=max(1, cpu_count // 2)
+        )
+        languages = choose_languages("batch_languages", ocr_reader)
+
+        if uploaded_files and st.button("Start Batch Scan"):
+            cards = list(
+                iter_card_files((f.name, f.getvalue()) for f in uploaded_files)
+            )
+            if not cards:
+                st.error("No card images found in the upload.")
+            else:
+                progress = st.progress(0.0, text="Loading OCR workers...")
+                live_table = st.empty()
+                results = []
+                # A picked language applies to every card; otherwise each
+                # worker detects it per card like the single-card scanner
+                auto_languages = [] if languages else ocr_reader.auto_languages
+                for result in scan_batch(
+                    cards,
+                    workers=workers,
+                    languages=languages,
+                    auto_languages=auto_languages,
+                ):
+                    results.append(result)
+                    progress.progress(
+                        len(results) / len(cards),
+                        text=f"Scanned {len(results)} of {len(cards)}: {result.name}",
+                    )
+                    live_table.dataframe(
+                        data_frame(
+                            [
+                                {
+                                    "File": r.name,
+                                    "Name": r.contact.get("full_name", ""),
+                                    "Email": r.contact.get("business_email", ""),
+                                    "Error": r.error or "",
+                                }
+                                for r in results
+                            ]
+                        ),
+                        use_container_width=True,
+                        hide_index=True,
+                    )
+                live_table.empty()
+                st.session_state.batch_results = sorted(results, key=lambda r: r.index)
+                st.session_state.batch_duplicates = batch_duplicates(
+                    st.session_state.batch_results
+                )
+                # scan_batch's defaults: CPU workers with the configured recognizer
+                st.session_state.batch_reader = describe_reader(
+                    reader_config(
+                        languages or OCR_LANGUAGES,
+                        "cpu",
+                        RecognizerConfig.from_env(),
+                        auto_languages,
+                    ),
+                    PreprocessConfig.from_env(),
+                )
+
+        batch_results = st.session_state.get("batch_results")
+        if batch_results:
+            failed = [r for r in batch_results if not r.ok]
+            if failed:
+                st.warning(
+                    f"{len(failed)} card(s) could not be scanned: "
+                    + ", ".join(r.name for r in failed)
+                )
+
+            duplicates = st.session_state.get("batch_duplicates", {})
+            unsaved = review_scanned_contacts(
+                batch_results,
+                duplicates,
+                "batch_editor",
+                st.session_state.get("batch_reader", ""),
+            )
+            if unsaved is not None:
+                st.session_state.batch_results = [
+                    r for r in batch_results if r.ok and r.name in unsaved
+                ]
 
     else:  # View & Manage Contacts section
         st.subheader("View & Manage Contacts")
@@ -560,20 +1097,25 @@ def main():
         col1, col2 = st.columns([3, 1])
         with col1:
             search_term = st.text_input("🔍 Search contacts", "")
+        with col2:
+            page_size = st.selectbox("Rows per page", [25, 50, 100], index=1)
 
-        contacts_df = get_all_contacts()
+        # Start from the first page whenever the query changes
+        query_key = (search_term, page_size)
+        if st.session_state.get("contacts_query") != query_key:
+            st.session_state.contacts_query = query_key
+            st.session_state.contacts_page = 1
 
-        if not contacts_df.empty:
-            # Filter contacts based on search
-            if search_term:
-                mask = contacts_df.apply(
-                    lambda x: x.astype(str).str.contains(search_term, case=False).any(),
-                    axis=1,
-                )
-                filtered_df = contacts_df[mask]
-            else:
-                filtered_df = contacts_df
+        filtered_df, total = get_contacts_page(
+            search_term, st.session_state.contacts_page, page_size
+        )
+        page_count = max(1, -(-total // page_size))
+        if st.session_state.contacts_page > page_count:
+            # Rows were deleted since the page was picked
+            st.session_state.contacts_page = page_count
+            st.rerun()
 
+        if total:
             st.markdown('<div class="dataframe-container">', unsafe_allow_html=True)
             st.dataframe(
                 filtered_df,
@@ -581,16 +1123,161 @@ def main():
                 height=450,
                 hide_index=True,
             )
+            col1, col2 = st.columns([1, 3])
+            with col1:
+                st.number_input(
+                    "Page", min_value=1, max_value=page_count, key="contacts_page"
+                )
+            with col2:
+                st.caption(
+                    f"{total} contacts · page "
+                    f"{st.session_state.contacts_page} of {page_count}"
+                )
+                cache_stats = load_contact_cache().stats()
+                if cache_stats["age_seconds"] is not None:
+                    st.caption(
+                        f"Contact cache: {cache_stats['hits']} hits, "
+                        f"{cache_stats['stale_hits']} stale, "
+                        f"{cache_stats['misses']} misses · "
+                        f"refreshed {cache_stats['age_seconds']:.0f}s ago"
+                    )
             st.markdown("</div>", unsafe_allow_html=True)
+
+            with st.expander("Export contacts"):
+                col1, col2 = st.columns([3, 1])
+                with col1:
+                    export_format = st.selectbox(
+                        "Format", EXPORT_FORMATS, format_func=EXPORT_LABELS.get
+                    )
+                with col2:
+                    compress = st.checkbox("gzip")
+                if st.button("Prepare export"):
+                    discard_export()
+                    with st.spinner("Exporting contacts..."):
+                        prepared = prepare_export(export_format, compress)
+                    if prepared:
+                        st.session_state.contact_export = prepared + (
+                            export_format,
+                            compress,
+                        )
+                export = st.session_state.get("contact_export")
+                if export and os.path.exists(export[0]):
+                    path, count, exported_format, exported_gzip = export
+                    with open(path, "rb") as f:
+                        st.download_button(
+                            f"Download {count} contacts "
+                            f"({EXPORT_LABELS[exported_format]})",
+                            f,
+                            file_name=export_filename(exported_format, exported_gzip),
+                            mime=(
+                                "application/gzip"
+                                if exported_gzip
+                                else MEDIA_TYPES[exported_format]
+                            ),
+                            on_click=discard_export,
+                        )
+                elif export:
+                    # Swept before it was downloaded
+                    st.session_state.pop("contact_export", None)
+
+            with st.expander("Find duplicates"):
+                threshold = st.slider(
+                    "Match threshold",
+                    0.5,
+                    1.0,
+                    value=DEFAULT_THRESHOLD,
+                    step=0.01,
+                    help="Lower values find more, less certain duplicates",
+                )
+                if st.button("Find duplicates"):
+                    start = time.perf_counter()
+                    with st.spinner("Comparing contacts..."):
+                        groups = find_all_duplicates(threshold)
+                    if groups is not None:
+                        st.session_state.duplicate_groups = (
+                            groups,
+                            time.perf_counter() - start,
+                        )
+                found = st.session_state.get("duplicate_groups")
+                if found:
+                    groups, seconds = found
+                    st.caption(
+                        f"{len(groups)} groups of likely duplicates "
+                        f"found in {seconds:.1f}s"
+                    )
+                    if groups:
+                        st.dataframe(
+                            data_frame(
+                                [
+                                    {
+                                        "Contacts": " | ".join(group.labels),
+                                        "IDs": ", ".join(map(str, group.ids)),
+                                        "Score": group.score,
+                                        "Matched on": ", ".join(
+                                            sorted(
+                                                {
+                                                    reason
+                                                    for match in group.matches
+                                                    for reason in match.reasons
+                                                }
+                                            )
+                                        ),
+                                    }
+                                    for group in groups
+                                ]
+                            ),
+                            use_container_width=True,
+                            hide_index=True,
+                        )
+
+            with st.expander("Re-extract fields"):
+                st.caption(
+                    "Run the current field extractor over the stored OCR output of "
+                    "every contact, without rescanning. Fields you edited by hand "
+                    "are left alone."
+                )
+                dry_run = st.checkbox("Only show what would change", value=True)
+                if st.button("Re-extract"):
+                    with st.spinner("Re-extracting contacts..."):
+                        report = reextract_all_contacts(dry_run)
+                    if report is not None:
+                        verb = "would change" if dry_run else "changed"
+                        st.success(
+                            f"Re-extracted {report.with_ocr} of {report.scanned} "
+                            f"contacts in {report.seconds:.1f}s; {verb} "
+                            f"{report.changed}"
+                        )
+                        if report.fields:
+                            st.caption(
+                                ", ".join(
+                                    f"{CONTACT_COLUMNS[name]}: {count}"
+                                    for name, count in sorted(report.fields.items())
+                                )
+                            )
+
             st.subheader("Contact Management")
 
-            selected_contact = st.selectbox(
+            def contact_label(contact_id) -> str:
+                if contact_id is None:
+                    return ""
+                row = filtered_df.loc[contact_id]
+                parts = [
+                    value
+                    for value in (row["Name"], row["Email"])
+                    if isinstance(value, str) and value
+                ]
+                return " · ".join(parts) or f"Contact #{contact_id}"
+
+            selected_id = st.selectbox(
                 "Select a contact to manage:",
-                options=[""] + filtered_df["Name"].tolist(),
+                options=[None] + filtered_df.index.tolist(),
                 index=0,
+                format_func=contact_label,
             )
 
-            if selected_contact:
+            if selected_id is not None:
+                contact_data = filtered_df.loc[selected_id]
+                selected_contact = contact_label(selected_id)
                 col1, col2 = st.columns(2)
 
                 with col1:
@@ -607,21 +1294,19 @@ def main():
                 if getattr(st.session_state, "show_edit", False):
                     st.markdown("### Edit Contact Information")
                     with st.form("edit_contact_form"):
-                        contact_data = filtered_df[
-                            filtered_df["Name"] == selected_contact
-                        ].iloc[0]
                         updated_data = {}
                         cols = st.columns(2)
 
                         for idx, (column, value) in enumerate(contact_data.items()):
-                            if column != "Name":
-                                with cols[idx % 2]:
-                                    updated_data[column] = st.text_input(
-                                        column, value=value, key=f"update_{column}"
-                                    )
+                            with cols[idx % 2]:
+                                updated_data[column] = st.text_input(
+                                    column,
+                                    value=value,
+                                    key=f"update_{column}_{selected_id}",
+                                )
 
                         if st.form_submit_button("Update Contact"):
-                            if update_contact(selected_contact, updated_data):
+                            if update_contact(selected_id, updated_data):
                                 st.success("Contact updated successfully!")
                                 st.session_state.show_edit = False
                                 time.sleep(1)
@@ -635,7 +1320,7 @@ def main():
                     col1, col2 = st.columns(2)
                     with col1:
                         if st.button("Yes, Delete", use_container_width=True):
-                            if delete_contact(selected_contact):
+                            if delete_contact(selected_id):
                                 st.success("Contact deleted successfully!")
                                 st.session_state.show_delete = False
                                 time.sleep(1)
@@ -645,6 +1330,8 @@ def main():
                             st.session_state.show_delete = False
                             st.rerun()
 
+        elif search_term:
+            st.info("No contacts match your search.")
         else:
             st.info("No contacts saved yet. Start by scanning some business cards!")
 
@@ -0,0 +1,14 @@
+import pytest
+
+from bizscan import storage
+from bizscan.storage.sql import SQLiteBackend
+
+
+@pytest.fixture
+def sqlite_storage():
+    """A fresh in-memory SQLite store installed as the shared backend"""
+    backend = SQLiteBackend(":memory:")
+    storage.set_backend(backend)
+    yield backend
+    storage.set_backend(None)
+    backend.close()
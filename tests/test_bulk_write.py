@@ -0,0 +1,116 @@
+import pytest
+
+from bizscan import storage
+from bizscan.storage.sql import SQLiteBackend
+
+
+class FlakyBackend(SQLiteBackend):
+    """SQLite store whose first writes time out and which rejects some rows"""
+
+    def __init__(self, failures: int = 0, reject: str = ""):
+        super().__init__(":memory:")
+        self.failures = failures
+        self.reject = reject
+        self.calls = 0
+
+    def _write(self, rows):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TimeoutError("timed out")
+        if any(row["full_name"] == self.reject for row in rows):
+            raise ValueError("rejected")
+
+    def insert_contacts(self, rows):
+        self._write(rows)
+        return super().insert_contacts(rows)
+
+    def upsert_contacts(self, rows, on_conflict):
+        self._write(rows)
+        return super().upsert_contacts(rows, on_conflict)
+
+    def is_transient(self, error):
+        return isinstance(error, TimeoutError)
+
+
+@pytest.fixture
+def flaky():
+    def install(**kwargs):
+        backend = FlakyBackend(**kwargs)
+        storage.set_backend(backend)
+        return backend
+
+    yield install
+    storage.set_backend(None)
+
+
+def names():
+    return sorted(row["full_name"] for row in storage.iter_contacts())
+
+
+def test_bulk_insert_batches_every_row(sqlite_storage):
+    contacts = ({"full_name": f"Person {i}"} for i in range(25))
+    outcomes = storage.bulk_write_contacts(contacts, batch_size=4, concurrency=2)
+    assert [outcome.index for outcome in outcomes] == list(range(25))
+    assert all(outcome.ok and outcome.row["id"] for outcome in outcomes)
+    assert len(names()) == 25
+
+
+def test_upsert_updates_matching_contacts_and_inserts_the_rest(sqlite_storage):
+    storage.insert_contacts([{"full_name": "Jane", "business_email": "j@x.com"}])
+    outcomes = storage.bulk_write_contacts(
+        [
+            {"full_name": "Jane Doe", "business_email": "j@x.com"},
+            {"full_name": "No Email", "business_email": ""},
+            {"full_name": "Also None", "business_email": ""},
+        ],
+        upsert_on="business_email",
+    )
+    assert all(outcome.ok for outcome in outcomes)
+    # Blank keys are written as NULL and never match each other
+    assert names() == ["Also None", "Jane Doe", "No Email"]
+
+
+def test_upsert_on_must_be_a_natural_key(sqlite_storage):
+    with pytest.raises(ValueError):
+        storage.bulk_write_contacts([{"full_name": "x"}], upsert_on="full_name")
+
+
+def test_missing_values_are_stored_blank(sqlite_storage):
+    pd = pytest.importorskip("pandas")
+    frame = pd.DataFrame(
+        {"full_name": ["Jane", None], "job_title": [float("nan"), pd.NA]}
+    )
+    storage.bulk_write_contacts(frame)
+    rows = sorted(storage.iter_contacts(), key=lambda row: row["id"])
+    assert [row["full_name"] for row in rows] == ["Jane", ""]
+    assert [row["job_title"] for row in rows] == ["", ""]
+
+
+def test_transient_upsert_failures_are_retried(flaky):
+    backend = flaky(failures=2)
+    outcomes = storage.bulk_write_contacts(
+        [{"full_name": "Jane", "business_email": "j@x.com"}],
+        upsert_on="business_email",
+        backoff=0,
+    )
+    assert outcomes[0].ok
+    assert outcomes[0].attempts == 3
+    assert backend.calls == 3
+
+
+def test_transient_insert_failures_are_not_retried(flaky):
+    backend = flaky(failures=1)
+    outcomes = storage.bulk_write_contacts([{"full_name": "Jane"}], backoff=0)
+    assert not outcomes[0].ok
+    assert "may already be saved" in outcomes[0].error
+    assert backend.calls == 1
+    assert names() == []
+
+
+def test_rejected_rows_are_isolated_by_splitting_the_batch(flaky):
+    flaky(reject="Bad")
+    contacts = [{"full_name": name} for name in ("A", "B", "Bad", "C", "D")]
+    outcomes = storage.bulk_write_contacts(contacts, batch_size=5)
+    assert [outcome.ok for outcome in outcomes] == [True, True, False, True, True]
+    assert outcomes[2].error == "rejected"
+    assert names() == ["A", "B", "C", "D"]
@@ -0,0 +1,120 @@
+from bizscan import storage
+from bizscan.dedup import (
+    DedupIndex,
+    _Record,
+    find_duplicates,
+    match_in_storage,
+    normalize_domain,
+    normalize_name,
+    normalize_organization,
+    normalize_phone,
+    score_pair,
+)
+
+
+def record(**row):
+    return _Record.from_row(row)
+
+
+def test_normalization():
+    assert normalize_phone("+1 (555) 123-4567") == "5551234567"
+    assert normalize_phone("12-34") == ""
+    assert normalize_domain("https://www.Acme.com:443/about") == "acme.com"
+    assert normalize_domain("jane@mail.acme.com") == "mail.acme.com"
+    assert normalize_name("Doe, Jane") == normalize_name("jane DOE") == "doe jane"
+    assert normalize_name("José Núñez") == "jose nunez"
+    assert normalize_organization("Acme, Inc.") == "acme"
+
+
+def test_blocking_keys_ignore_free_mail_domains():
+    keys = record(full_name="Jane Doe", business_email="jane@gmail.com").keys
+    assert keys == ("e:jane@gmail.com", "n:doe jane")
+    keys = record(full_name="Jane Doe", business_email="jane@acme.com").keys
+    assert "c:acme.com:do" in keys
+
+
+def test_scores():
+    jane = record(full_name="Jane Doe", business_email="jane@acme.com")
+    same_email = record(full_name="Doe, Jane", business_email="JANE@acme.com")
+    assert score_pair(jane, same_email) == (1.0, ["email", "name"])
+
+    # A shared inbox with a clearly different name is not a duplicate
+    shared = record(full_name="Bob Smith", business_email="jane@acme.com")
+    assert score_pair(jane, shared)[0] < 0.85
+
+    colleague = record(full_name="Jane Doe", business_url="https://acme.com")
+    assert score_pair(jane, colleague) == (0.9, ["company", "name"])
+
+    # A name alone never reaches the default threshold
+    namesake = record(full_name="Jane Doe", business_email="jd@other.org")
+    assert score_pair(jane, namesake)[0] < 0.85
+
+
+def test_score_pair_stops_early_below_threshold():
+    a = record(full_name="Al")
+    b = record(full_name="Bartholomew Montgomery")
+    assert score_pair(a, b, threshold=0.85) == (0.0, [])
+
+
+def test_match_finds_block_mates_and_skips_itself():
+    index = DedupIndex.build(
+        [
+            {"id": 1, "full_name": "Jane Doe", "contact_number": "555-123-4567"},
+            {"id": 2, "full_name": "John Roe", "contact_number": "555-987-6543"},
+        ]
+    )
+    matches = index.match(
+        {"id": 3, "full_name": "Jane Doe", "contact_number": "+1 555 123 4567"}
+    )
+    assert [(m.duplicate_id, m.reasons) for m in matches] == [(1, ["phone", "name"])]
+    assert index.match({"id": 1, "full_name": "Jane Doe"}) == []
+
+
+def test_find_duplicates_groups_transitive_matches():
+    groups = find_duplicates(
+        [
+            {"id": 1, "full_name": "Jane Doe", "business_email": "jane@acme.com"},
+            {
+                "id": 2,
+                "full_name": "Jane Doe",
+                "business_email": "jane@acme.com",
+                "contact_number": "5551234567",
+            },
+            {"id": 3, "full_name": "J. Doe", "contact_number": "555-123-4567"},
+            {"id": 4, "full_name": "Someone Else", "contact_number": "5550000000"},
+        ]
+    )
+    assert [group.ids for group in groups] == [[1, 2, 3]]
+    pairs = [(m.contact_id, m.duplicate_id) for m in groups[0].matches]
+    assert len(pairs) == len(set(pairs)) == 2
+
+
+def test_oversized_blocks_are_skipped():
+    rows = [
+        {"id": i, "full_name": "Jane Doe", "business_email": "info@acme.com"}
+        for i in range(5)
+    ]
+    assert find_duplicates(rows, max_block=3) == []
+    assert len(find_duplicates(rows)[0].ids) == 5
+
+
+def test_index_updates_move_contacts_between_blocks():
+    jane = {"id": 1, "full_name": "Jane", "business_email": "jane@gmail.com"}
+    index = DedupIndex.build([jane])
+    index.add(dict(jane, business_email="jane@yahoo.com"))
+    assert index.match(dict(jane, id=2)) == []
+    index.remove(1)
+    assert len(index) == 0
+
+
+def test_match_in_storage_searches_the_database(sqlite_storage):
+    storage.insert_contacts(
+        [
+            {"full_name": "Jane Doe", "business_email": "jane@acme.com"},
+            {"full_name": "John Roe", "business_email": "john@acme.com"},
+        ]
+    )
+    matches = match_in_storage(
+        {"full_name": "Jane Doe", "business_email": "jane@acme.com"}
+    )
+    assert [match.label for match in matches] == ["Jane Doe · jane@acme.com"]
@@ -0,0 +1,98 @@
+import csv
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from bizscan import storage
+from bizscan.export import export_contacts, iter_export, sweep_export_files, vcard
+
+JANE = {
+    "id": 7,
+    "full_name": "Jane Doe",
+    "organization": "Acme, Inc.",
+    "job_title": "CTO; Founder",
+    "contact_number": "5551234567",
+    "business_email": "jane@acme.com",
+    "business_url": "www.acme.com",
+    "street_address": "1 Main St",
+    "location_city": "Springfield",
+    "location_state": "IL",
+    "postal_code": "62704",
+}
+
+
+def exported(export_format, rows, **kwargs):
+    return b"".join(iter_export(export_format, rows=rows, **kwargs)).decode("utf-8")
+
+
+def test_csv_has_a_header_and_one_record_per_row():
+    text = exported("csv", [JANE, {"id": 8, "full_name": 'Bob "B" Lee'}])
+    records = list(csv.DictReader(io.StringIO(text)))
+    assert [record["full_name"] for record in records] == ["Jane Doe", 'Bob "B" Lee']
+    assert records[0]["organization"] == "Acme, Inc."
+    assert records[1]["job_title"] == ""
+
+
+def test_jsonl_is_one_object_per_line():
+    text = exported("jsonl", [JANE, {"id": 8, "full_name": "東京 太郎"}])
+    lines = text.splitlines()
+    records = [json.loads(line) for line in lines]
+    assert records[0]["job_title"] == "CTO; Founder"
+    assert records[1]["full_name"] == "東京 太郎"
+    assert records[1]["organization"] is None
+
+
+def test_vcard_escapes_values_and_splits_the_name():
+    card = vcard(JANE)
+    lines = card.split("\r\n")
+    assert lines[:4] == ["BEGIN:VCARD", "VERSION:3.0", "FN:Jane Doe", "N:Doe;Jane;;;"]
+    assert "ORG:Acme\\, Inc." in lines
+    assert "TITLE:CTO\\; Founder" in lines
+    assert "URL:https://www.acme.com" in lines
+    assert "ADR;TYPE=WORK:;;1 Main St;Springfield;IL;62704;" in lines
+    assert "UID:bizscan-contact-7" in lines
+    assert card.endswith("END:VCARD\r\n")
+    assert 'TEL;VALUE=uri;TYPE="work,voice":tel:5551234567' in vcard(JANE, "4.0")
+
+
+@pytest.mark.parametrize("name", ["A" * 200, "東" * 100, "é" * 120])
+def test_vcard_lines_fold_at_75_octets_between_characters(name):
+    card = vcard({"full_name": name})
+    physical = card.split("\r\n")[:-1]
+    assert all(len(line.encode("utf-8")) <= 75 for line in physical)
+    assert any(line.startswith(" ") for line in physical)
+    # Unfolding (dropping CRLF plus one space) restores the content line
+    unfolded = card.replace("\r\n ", "").split("\r\n")
+    assert f"FN:{name}" in unfolded
+
+
+def test_gzip_export_matches_plain_export():
+    rows = [dict(JANE, id=i) for i in range(50)]
+    plain = b"".join(iter_export("csv", rows=rows, chunk_size=256))
+    packed = b"".join(iter_export("csv", compress=True, rows=rows, chunk_size=256))
+    assert gzip.decompress(packed) == plain
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        list(iter_export("xml", rows=[]))
+
+
+def test_export_contacts_streams_storage(sqlite_storage):
+    storage.insert_contacts([{"full_name": f"Person {i}"} for i in range(5)])
+    stream = io.BytesIO()
+    assert export_contacts(stream, "jsonl", page_size=2) == 5
+    assert len(stream.getvalue().splitlines()) == 5
+
+
+def test_sweep_removes_only_old_exports(tmp_path):
+    old, fresh = tmp_path / "old.csv", tmp_path / "fresh.csv"
+    old.write_text("x")
+    fresh.write_text("x")
+    os.utime(old, (0, 0))
+    assert sweep_export_files(str(tmp_path), max_age=60) == 1
+    assert not old.exists() and fresh.exists()
+    assert sweep_export_files(str(tmp_path / "missing"), max_age=60) == 0
@@ -0,0 +1,76 @@
+from bizscan.extraction import CONTACT_FIELDS, extract_fields, extract_layout_fields
+
+CARD_LINES = [
+    "Jane Doe",
+    "Senior Engineer",
+    "jane.doe@example.com",
+    "(555) 123-4567",
+    "www.example.com",
+    "123 Main Street Springfield, IL 62704",
+]
+
+
+def box(left, top, right, bottom):
+    return [[left, top], [right, top], [right, bottom], [left, bottom]]
+
+
+def test_extract_fields_reads_every_field_in_one_pass():
+    info = extract_fields(CARD_LINES).to_dict()
+    assert info == {
+        "full_name": "Jane Doe",
+        "organization": "",
+        "job_title": "Senior Engineer",
+        "contact_number": "5551234567",
+        "business_email": "jane.doe@example.com",
+        "business_url": "www.example.com",
+        "street_address": "123 Main Street",
+        "location_city": "Springfield",
+        "location_state": "IL",
+        "postal_code": "62704",
+    }
+
+
+def test_extract_fields_first_email_and_last_phone_win():
+    info = extract_fields(
+        ["a@example.com", "b@example.com", "555-111-2222", "555-333-4444"]
+    ).to_dict()
+    assert info["business_email"] == "a@example.com"
+    assert info["contact_number"] == "5553334444"
+
+
+def test_extract_fields_confidence_scales_with_ocr_confidence():
+    result = extract_fields(["jane@example.com"], confidences=[0.5])
+    match = result.fields["business_email"]
+    assert match.line == 0
+    assert match.confidence == 0.475
+
+
+def test_extract_fields_blank_input_gives_empty_contact():
+    assert extract_fields(["", "   "]).to_dict() == dict.fromkeys(CONTACT_FIELDS, "")
+
+
+def test_layout_picks_name_by_font_size_not_line_order():
+    detections = [
+        (box(0, 0, 300, 20), "ACME Corporation", 0.9),
+        (box(0, 40, 300, 100), "Jane Doe", 0.95),
+        (box(0, 105, 300, 125), "Sales Director", 0.9),
+        (box(0, 140, 300, 160), "jane@acme.com", 0.9),
+        (box(0, 170, 300, 190), "555-123-4567", 0.9),
+    ]
+    result = extract_layout_fields(detections)
+    info = result.to_dict()
+    assert info["full_name"] == "Jane Doe"
+    assert info["job_title"] == "Sales Director"
+    assert info["organization"] == "ACME Corporation"
+    assert info["business_email"] == "jane@acme.com"
+    assert info["contact_number"] == "5551234567"
+    assert result.fields["full_name"].line == 1
+
+
+def test_layout_leaves_name_blank_without_a_plausible_candidate():
+    detections = [
+        (box(0, 0, 300, 20), "jane@acme.com", 0.9),
+        (box(0, 30, 300, 50), "555-123-4567", 0.9),
+    ]
+    info = extract_layout_fields(detections).to_dict()
+    assert info["full_name"] == info["job_title"] == info["organization"] == ""
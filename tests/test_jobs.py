@@ -0,0 +1,118 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from bizscan.jobs import DONE, FAILED, RUNNING, OCRJobQueue, QueueFull  # noqa: E402
+from bizscan.ocr import OCRCache  # noqa: E402
+
+
+class GatedReader:
+    """Fake reader that records what it read and waits for the gate to open"""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.read = []
+
+    def readtext(self, image):
+        self.gate.wait(5)
+        value = int(image[0, 0])
+        if value == 255:
+            raise RuntimeError("unreadable")
+        self.read.append(value)
+        return [([[0, 0], [1, 0], [1, 1], [0, 1]], f"card {value}", 0.9)]
+
+
+def card(value):
+    return np.full((4, 4), value, dtype=np.uint8)
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def reader():
+    reader = GatedReader()
+    yield reader
+    reader.gate.set()
+
+
+def make_queue(reader, **kwargs):
+    return OCRJobQueue(OCRCache(reader, {"backend": "fake"}), **kwargs)
+
+
+def test_submit_rejects_work_beyond_max_queue(reader):
+    queue = make_queue(reader, max_queue=2)
+    running = queue.submit(card(0))
+    wait_until(lambda: running.status == RUNNING)
+    queue.submit(card(1))
+    queue.submit(card(2))
+    with pytest.raises(QueueFull):
+        queue.submit(card(3))
+    assert queue.stats()["rejected"] == 1
+
+    reader.gate.set()
+    wait_until(lambda: queue.stats()["completed"] == 3)
+    assert queue.submit(card(3)).id
+
+
+def test_resubmitting_returns_the_tracked_job(reader):
+    queue = make_queue(reader)
+    job = queue.submit(card(1))
+    assert queue.submit(card(1)) is job
+
+    reader.gate.set()
+    wait_until(lambda: job.finished)
+    assert job.status == DONE
+    assert job.result.texts == ["card 1"]
+    assert reader.read == [1]
+
+
+def test_cached_results_skip_the_queue(reader):
+    reader.gate.set()
+    queue = make_queue(reader)
+    first = queue.submit(card(1))
+    wait_until(lambda: first.finished)
+    queue._jobs.clear()
+
+    again = queue.submit(card(1))
+    assert again.status == DONE
+    assert again is not first
+    assert reader.read == [1]
+
+
+def test_owners_are_served_round_robin(reader):
+    queue = make_queue(reader, max_queue=8)
+    blocker = queue.submit(card(0), owner="a")
+    wait_until(lambda: blocker.status == RUNNING)
+    bursts = [queue.submit(card(value), owner="a") for value in (1, 2, 3)]
+    other = queue.submit(card(9), owner="b")
+    assert queue.position(bursts[0].id) == 0
+    assert queue.position(other.id) == 1
+    assert queue.position(bursts[2].id) == 3
+
+    reader.gate.set()
+    wait_until(lambda: queue.stats()["completed"] == 5)
+    # The single job of b goes before the rest of a's burst
+    assert reader.read == [0, 1, 9, 2, 3]
+
+
+def test_reader_errors_fail_the_job(reader):
+    reader.gate.set()
+    queue = make_queue(reader)
+    job = queue.submit(card(255))
+    wait_until(lambda: job.finished)
+    assert job.status == FAILED
+    assert job.error == "unreadable"
+    assert job.image is None
+    assert queue.stats()["failed"] == 1
+
+    # A failed job is retried on resubmission rather than returned as is
+    assert queue.submit(card(255)) is not job
@@ -0,0 +1,38 @@
+import os
+
+import pytest
+
+# bizscan.recognizers needs numpy too, so skip before importing it
+np = pytest.importorskip("numpy")
+
+from bizscan.recognizers import (  # noqa: E402
+    RecognizerConfig,
+    create_recognizer,
+    onnx_paths,
+)
+
+LANGUAGES = ["en"]
+
+
+@pytest.fixture(scope="module")
+def onnx_recognizer():
+    pytest.importorskip("easyocr")
+    pytest.importorskip("onnxruntime")
+    cv2 = pytest.importorskip("cv2")
+    config = RecognizerConfig(
+        backend="onnx", onnx_dir=os.getenv("OCR_ONNX_DIR", "models/onnx")
+    )
+    if not all(map(os.path.exists, onnx_paths(config.onnx_dir, LANGUAGES).values())):
+        pytest.skip("ONNX models missing; run python -m bizscan export-onnx")
+    return cv2, create_recognizer(LANGUAGES, config=config)
+
+
+def test_readtext_runs_on_onnx_reader(onnx_recognizer):
+    cv2, recognizer = onnx_recognizer
+    image = np.full((200, 600, 3), 255, dtype=np.uint8)
+    cv2.putText(
+        image, "Jane Doe", (30, 120), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 4
+    )
+    detections = recognizer.readtext(image)
+    assert detections
+    assert all(len(detection) == 3 for detection in detections)
@@ -0,0 +1,71 @@
+import json
+
+from bizscan import storage
+from bizscan.batch import BatchResult
+from bizscan.ocr import OCRResult
+from bizscan.reextract import ocr_record, reextract_contacts, save_scan_ocr
+from bizscan.storage import RowOutcome
+
+OCR = OCRResult.from_readtext(
+    [
+        ([[0, 0], [300, 0], [300, 60], [0, 60]], "Jane Doe", 0.95),
+        ([[0, 80], [300, 80], [300, 100], [0, 100]], "jane@acme.com", 0.9),
+    ]
+)
+# What an older extractor read from OCR
+OLD = {"full_name": "JANE D0E", "business_email": "jane@acme.com"}
+
+
+def store(contact, extracted=OLD):
+    (row,) = storage.insert_contacts([contact])
+    storage.save_ocr_results([ocr_record(row["id"], OCR, "reader-v1", extracted)])
+    return row["id"]
+
+
+def contact(contact_id):
+    return next(row for row in storage.iter_contacts() if row["id"] == contact_id)
+
+
+def test_reextract_rewrites_fields_the_user_never_edited(sqlite_storage):
+    untouched = store(dict(OLD))
+    edited = store(dict(OLD, full_name="Janet Doe"))
+    (no_ocr,) = storage.insert_contacts([{"full_name": "Paper Only"}])
+
+    report = reextract_contacts(page_size=2)
+    assert (report.scanned, report.with_ocr, report.changed) == (3, 2, 1)
+    assert report.fields == {"full_name": 1}
+    assert contact(untouched)["full_name"] == "Jane Doe"
+    assert contact(edited)["full_name"] == "Janet Doe"
+    assert contact(no_ocr["id"])["full_name"] == "Paper Only"
+
+    # The new extraction is the baseline now, so a second pass is a no-op
+    (row,) = storage.fetch_ocr_results([edited])
+    assert json.loads(row["extracted"])["full_name"] == "Jane Doe"
+    assert row["reader"] == "reader-v1"
+    assert reextract_contacts().changed == 0
+
+
+def test_dry_run_reports_without_writing(sqlite_storage):
+    contact_id = store(dict(OLD))
+    assert reextract_contacts(dry_run=True).changed == 1
+    assert contact(contact_id)["full_name"] == "JANE D0E"
+    (row,) = storage.fetch_ocr_results([contact_id])
+    assert json.loads(row["extracted"])["full_name"] == "JANE D0E"
+
+
+def test_save_scan_ocr_stores_ocr_for_saved_contacts_only(sqlite_storage):
+    scanned, typed_in = storage.insert_contacts([OLD, OLD])
+    outcomes = [
+        RowOutcome(0, True, row=scanned),
+        RowOutcome(1, False, error="rejected"),
+        RowOutcome(2, True, row=typed_in),
+    ]
+    results = [
+        BatchResult(0, "a.jpg", OLD, OCR),
+        BatchResult(1, "b.jpg", OLD, OCR),
+        BatchResult(2, "typed in", OLD),
+    ]
+    assert save_scan_ocr(outcomes, results, "reader-v1") == 1
+    stored = storage.fetch_ocr_results([scanned["id"], typed_in["id"]])
+    assert [row["contact_id"] for row in stored] == [scanned["id"]]
+    assert OCRResult.from_json(stored[0]["payload"]) == OCR
@@ -0,0 +1,52 @@
+import pytest
+
+from bizscan.search import ContactSearchIndex
+
+ROWS = [
+    {"id": 1, "full_name": "Jane Doe", "organization": "Acme Corp"},
+    {"id": 2, "full_name": "John Smith", "business_email": "john@globex.com"},
+    {"id": 3, "full_name": "Ana Lima", "location_city": "Lisbon"},
+]
+
+
+@pytest.fixture
+def index():
+    return ContactSearchIndex.build(ROWS)
+
+
+def test_search_is_case_insensitive_substring_match(index):
+    assert index.search("ACME") == {1}
+    assert index.search("globex.com") == {2}
+    assert index.search("  lisb ") == {3}
+
+
+def test_short_and_empty_terms(index):
+    assert index.search("do") == {1}
+    assert index.search("") == {1, 2, 3}
+    assert index.search("zzz") == set()
+
+
+def test_grams_never_span_two_fields(index):
+    # "doe" ends full_name and "acme" starts organization
+    assert index.search("doeacme") == set()
+    assert index.search("doe acme") == set()
+
+
+def test_candidates_sharing_every_gram_are_verified():
+    # "abcab" holds every trigram of "bcabc" but not the term itself
+    index = ContactSearchIndex.build([{"id": 1, "full_name": "abcab xbcabc"}])
+    index.add({"id": 2, "full_name": "abcab"})
+    assert index.search("bcabc") == {1}
+
+
+def test_update_and_remove_patch_the_postings(index):
+    index.add({"id": 1, "full_name": "Jane Roe", "organization": "Initech"})
+    assert index.search("acme") == set()
+    assert index.search("initech") == {1}
+    assert len(index) == 3
+
+    index.remove(1)
+    index.remove(1)
+    assert index.search("initech") == set()
+    assert len(index) == 2
+    assert not any(1 in posting for posting in index._postings.values())
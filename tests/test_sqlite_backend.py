@@ -0,0 +1,86 @@
+import pytest
+
+from bizscan import storage
+from bizscan.storage.base import StorageBackend
+
+
+def add(*names, **fields):
+    return storage.insert_contacts([{"full_name": name, **fields} for name in names])
+
+
+def test_pages_are_newest_first_with_the_total(sqlite_storage):
+    add("A", "B", "C", "D", "E")
+    page = storage.fetch_contacts_page(limit=2, offset=1)
+    assert [row["full_name"] for row in page.rows] == ["D", "C"]
+    assert (page.total, page.limit, page.offset) == (5, 2, 1)
+
+
+def test_search_filters_in_the_database(sqlite_storage):
+    add("Jane Doe", organization="Acme")
+    add("John Smith", organization="Globex")
+    page = storage.fetch_contacts_page(search="acme")
+    assert [row["full_name"] for row in page.rows] == ["Jane Doe"]
+    assert page.total == 1
+    # Wildcards are search text, not LIKE syntax
+    assert storage.fetch_contacts_page(search="%").total == 2
+
+
+def test_keyset_paging_visits_every_row_once(sqlite_storage):
+    add(*(f"Person {i:02}" for i in range(25)))
+    rows = list(storage.iter_contacts(page_size=10))
+    ids = [row["id"] for row in rows]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 25
+
+
+def test_keyset_paging_is_not_shifted_by_deletes(sqlite_storage):
+    stored = add(*(f"Person {i:02}" for i in range(6)))
+    seen = []
+    for row in storage.iter_contacts(page_size=2):
+        seen.append(row["id"])
+        if len(seen) == 2:
+            # Offset paging would now skip a row
+            storage.delete_contact(stored[0]["id"])
+    assert seen == [row["id"] for row in stored]
+
+
+def test_update_and_delete_by_id(sqlite_storage):
+    jane, john = add("Jane", "John")
+    updated = storage.update_contact(jane["id"], {"job_title": "CTO", "bogus": 1})
+    assert updated[0]["job_title"] == "CTO"
+    assert storage.delete_contact(john["id"])[0]["full_name"] == "John"
+    assert [row["full_name"] for row in storage.iter_contacts()] == ["Jane"]
+
+
+def test_bulk_partial_updates(sqlite_storage):
+    a, b, c = add("A", "B", "C")
+    storage.update_contacts(
+        [
+            {"id": a["id"], "job_title": "CEO"},
+            {"id": b["id"], "job_title": "CTO", "organization": "Acme"},
+            {"id": c["id"]},
+        ]
+    )
+    rows = {row["full_name"]: row for row in storage.iter_contacts()}
+    assert (rows["A"]["job_title"], rows["A"]["organization"]) == ("CEO", None)
+    assert (rows["B"]["job_title"], rows["B"]["organization"]) == ("CTO", "Acme")
+    assert rows["C"]["job_title"] is None
+
+
+def test_ocr_results_are_replaced_and_deleted_with_the_contact(sqlite_storage):
+    (jane,) = add("Jane")
+    storage.save_ocr_results([{"contact_id": jane["id"], "payload": "[]"}])
+    storage.save_ocr_results([{"contact_id": jane["id"], "payload": "[1]"}])
+    stored = storage.fetch_ocr_results([jane["id"]])
+    assert [row["payload"] for row in stored] == ["[1]"]
+    storage.delete_contact(jane["id"])
+    assert storage.fetch_ocr_results([jane["id"]]) == []
+
+
+def test_incomplete_backends_fail_at_instantiation():
+    class Partial(StorageBackend):
+        def insert_contacts(self, rows):
+            return rows
+
+    with pytest.raises(TypeError):
+        Partial()